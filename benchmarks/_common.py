@@ -0,0 +1,90 @@
+"""
+Shared helpers for the gengo-python benchmarks.
+
+Benchmarks are plain scripts; run them from the repository root with the
+library importable, e.g:
+
+    PYTHONPATH=. python benchmarks/bench_keepalive.py
+"""
+from __future__ import absolute_import, print_function
+
+import json
+import threading
+import time
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+OK_BODY = json.dumps({'opstat': 'ok', 'response': {}}).encode('utf-8')
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+
+    # HTTP/1.1 so that clients can keep the connection alive.
+    protocol_version = 'HTTP/1.1'
+    # Send headers and body in one segment; otherwise Nagle plus delayed
+    # ACKs add ~40ms to every keep-alive round trip.
+    disable_nagle_algorithm = True
+    wbufsize = 64 * 1024
+
+    def _reply(self):
+        # Drain the body in chunks so that large uploads don't show up in
+        # the client's memory measurements.
+        length = int(self.headers.get('Content-Length') or 0)
+        while length > 0:
+            chunk = self.rfile.read(min(length, 64 * 1024))
+            if not chunk:
+                break
+            length -= len(chunk)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(OK_BODY)))
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(OK_BODY)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _reply
+
+    def log_message(self, *args):
+        pass
+
+
+class _ThreadingServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class StubServer(object):
+
+    """
+    A local HTTP server answering every request with {"opstat": "ok"}.
+    """
+    def __init__(self):
+        self.server = _ThreadingServer(('127.0.0.1', 0), _StubHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+
+    @property
+    def api_url(self):
+        return 'http://127.0.0.1:{0}/{{version}}'.format(
+            self.server.server_address[1])
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def rate(fn, calls):
+    """Run fn() `calls` times and return calls per second."""
+    start = time.time()
+    for _ in range(calls):
+        fn()
+    return calls / (time.time() - start)
@@ -0,0 +1,58 @@
+"""
+Per-call client overhead with the network stubbed out: endpoint lookup,
+payload building, URL templating, signing and response handling, and
+what a registered hook adds to that.
+"""
+from __future__ import absolute_import, print_function
+
+import time
+
+from gengo import Gengo
+
+CALLS = 20000
+
+
+class _Response(object):
+    status_code = 200
+    headers = {}
+    content = b'{"opstat":"ok","response":{}}'
+    text = content.decode('utf-8')
+
+    def json(self):
+        return {'opstat': 'ok', 'response': {}}
+
+
+def _stubbed_client():
+    gengo = Gengo(public_key='pub', private_key='priv')
+    response = _Response()
+    gengo._send = lambda method, url, **kwargs: response
+    return gengo
+
+
+def run(calls=CALLS):
+    gengo = _stubbed_client()
+    hooked = _stubbed_client()
+    hooked.addHook('after', lambda trace: None)
+    scenarios = {
+        'getAccountBalance': lambda: gengo.getAccountBalance(),
+        'getTranslationJob': lambda: gengo.getTranslationJob(id=42),
+        'getTranslationJobRevision': lambda: gengo.getTranslationJobRevision(
+            id=42, revision_id=3),
+        'postTranslationJobComment': lambda: gengo.postTranslationJobComment(
+            id=42, comment={'body': 'hello'}),
+        # The same call with a hook registered, which builds a trace.
+        'getTranslationJob_hooked': lambda: hooked.getTranslationJob(id=42),
+    }
+    results = {}
+    for name, fn in scenarios.items():
+        start = time.time()
+        for _ in range(calls):
+            fn()
+        results[name + '_us_per_call'] = \
+            (time.time() - start) / calls * 1e6
+    return results
+
+
+if __name__ == '__main__':
+    for name, value in sorted(run().items()):
+        print('{0:45s} {1:8.2f}'.format(name, value))
@@ -0,0 +1,73 @@
+"""
+Job lookups per second against gengo.fakeserver with a realistic
+per-request latency: one at a time, from a thread pool sharing one Gengo,
+and through AsyncGengo (Python 3.7+).
+"""
+from __future__ import absolute_import, print_function
+
+from concurrent.futures import ThreadPoolExecutor
+import sys
+import time
+
+from gengo import Gengo
+from gengo.fakeserver import FakeGengo
+
+CALLS = 400
+LATENCY = 0.01
+WORKERS = 16
+
+
+def _jobIds(gengo, jobs):
+    order = gengo.postTranslationJobs(jobs={'jobs': dict(
+        ('job_{0}'.format(i), {'type': 'text', 'body_src': 'hello world',
+                               'lc_src': 'en', 'lc_tgt': 'ja',
+                               'tier': 'standard'})
+        for i in range(jobs))})
+    order = gengo.getTranslationOrderJobs(id=order['response']['order_id'])
+    return order['response']['order']['jobs_available']
+
+
+def _async(api_url, job_ids):
+    import asyncio
+    from gengo import AsyncGengo
+
+    async def lookups():
+        async with AsyncGengo(public_key='pub', private_key='priv',
+                              api_url=api_url,
+                              max_concurrency=WORKERS) as gengo:
+            await asyncio.gather(*[gengo.getTranslationJob(id=job_id)
+                                   for job_id in job_ids])
+    asyncio.run(lookups())
+
+
+def run(calls=CALLS, latency=LATENCY):
+    results = {}
+    with FakeGengo(latency=latency) as fake:
+        gengo = Gengo(public_key='pub', private_key='priv',
+                      api_url=fake.api_url, pool_maxsize=WORKERS)
+        job_ids = _jobIds(gengo, 50)
+        job_ids = [job_ids[i % len(job_ids)] for i in range(calls)]
+
+        start = time.time()
+        for job_id in job_ids[:calls // 10]:
+            gengo.getTranslationJob(id=job_id)
+        results['sequential_calls_per_sec'] = \
+            (calls // 10) / (time.time() - start)
+
+        with ThreadPoolExecutor(WORKERS) as pool:
+            start = time.time()
+            list(pool.map(lambda job_id: gengo.getTranslationJob(id=job_id),
+                          job_ids))
+            results['threads_calls_per_sec'] = calls / (time.time() - start)
+        gengo.close()
+
+        if sys.version_info >= (3, 7):
+            start = time.time()
+            _async(fake.api_url, job_ids)
+            results['async_calls_per_sec'] = calls / (time.time() - start)
+    return results
+
+
+if __name__ == '__main__':
+    for name, value in sorted(run().items()):
+        print('{0:35s} {1:10.1f}'.format(name, value))
@@ -0,0 +1,39 @@
+"""
+Cold `import gengo` time, as reported by `python -X importtime` in fresh
+interpreters (median of several runs), and whether heavy dependencies
+were pulled in.
+"""
+from __future__ import absolute_import, print_function
+
+import os
+import subprocess
+import sys
+
+RUNS = 10
+HEAVY = ('requests', 'urllib3', 'asyncio', 'mimetypes', 'aiohttp')
+
+
+def _import_us(root):
+    code = ('import sys; import gengo; '
+            'print(sum(m in sys.modules for m in {0!r}))'.format(HEAVY))
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code], cwd=root,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True, check=True)
+    for line in result.stderr.splitlines():
+        if line.split('|')[-1].strip() == 'gengo':
+            return int(line.split('|')[1]), int(result.stdout)
+
+
+def run(runs=RUNS):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    samples = sorted(_import_us(root) for _ in range(runs))
+    return {
+        'import_gengo_ms': samples[len(samples) // 2][0] / 1e3,
+        'heavy_modules_loaded': max(heavy for _, heavy in samples),
+    }
+
+
+if __name__ == '__main__':
+    for name, value in sorted(run().items()):
+        print('{0:30s} {1:10.3f}'.format(name, value))
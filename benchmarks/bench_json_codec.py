@@ -0,0 +1,78 @@
+"""
+Encode and decode time per JSON backend on realistic payloads: a
+1,000-job order as sent by postTranslationJobs and a 200-job
+getTranslationJobBatch response. Backends that are not installed are
+skipped.
+"""
+from __future__ import absolute_import, print_function
+
+import time
+
+from gengo.codec import BACKENDS, getCodec
+
+ROUNDS = 20
+
+
+def make_order(jobs=1000):
+    return {
+        'jobs': dict(
+            ('job_{0}'.format(i), {
+                'type': 'text',
+                'slug': 'Product description {0}'.format(i),
+                'body_src': u'Lorem ipsum dolor sit amet, \u3053\u3093\u306b'
+                            u'\u3061\u306f {0}. '.format(i) * 20,
+                'lc_src': 'en',
+                'lc_tgt': 'ja',
+                'tier': 'standard',
+                'auto_approve': 1,
+                'custom_data': 'sku-{0}'.format(i),
+                'callback_url': 'https://example.com/callbacks/gengo',
+            }) for i in range(jobs)
+        ),
+        'comment': 'Please keep product names in English.',
+        'as_group': 0,
+    }
+
+
+def make_job_batch(jobs=200):
+    return {'opstat': 'ok', 'response': {'jobs': [{
+        'job_id': str(1000000 + i),
+        'order_id': '55555',
+        'slug': 'Product description {0}'.format(i),
+        'body_src': 'Lorem ipsum dolor sit amet. ' * 40,
+        'body_tgt': u'\u30ed\u30fc\u30ec\u30e0\u30fb\u30a4\u30d7\u30b5'
+                    u'\u30e0\u3002' * 60,
+        'lc_src': 'en', 'lc_tgt': 'ja', 'unit_count': 240,
+        'tier': 'standard', 'credits': 14.4, 'currency': 'USD',
+        'status': 'reviewable', 'eta': -1, 'ctime': 1500000000 + i,
+        'auto_approve': 0, 'custom_data': 'sku-{0}'.format(i),
+        'preview_url': 'https://gengo.com/preview/{0}'.format(i),
+    } for i in range(jobs)]}}
+
+
+def _time(fn, rounds):
+    start = time.time()
+    for _ in range(rounds):
+        fn()
+    return (time.time() - start) / rounds * 1e3
+
+
+def run(rounds=ROUNDS):
+    order = make_order()
+    response = getCodec('json').dumps(make_job_batch()).encode('utf-8')
+    results = {}
+    for name in BACKENDS:
+        try:
+            codec = getCodec(name)
+        except ImportError:
+            continue
+        results[name + '_encode_order_ms'] = _time(
+            lambda: codec.dumps(order), rounds)
+        results[name + '_decode_jobs_ms'] = _time(
+            lambda: codec.loads(response), rounds)
+    return results
+
+
+if __name__ == '__main__':
+    for name, value in sorted(run().items()):
+        print('{0:30s} {1:10.3f}'.format(name, value))
@@ -0,0 +1,28 @@
+"""
+Calls per second against a local stub server, with and without connection
+reuse.
+"""
+from __future__ import absolute_import, print_function
+
+from _common import StubServer, rate
+
+from gengo import Gengo
+
+CALLS = 500
+
+
+def run(calls=CALLS):
+    results = {}
+    with StubServer() as stub:
+        for label, keep_alive in (('fresh_connection', False),
+                                  ('keep_alive', True)):
+            with Gengo(public_key='pub', private_key='priv',
+                       api_url=stub.api_url, keep_alive=keep_alive) as gengo:
+                results[label + '_calls_per_sec'] = rate(
+                    gengo.getAccountBalance, calls)
+    return results
+
+
+if __name__ == '__main__':
+    for name, value in sorted(run().items()):
+        print('{0:35s} {1:10.1f}'.format(name, value))
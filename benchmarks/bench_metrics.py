@@ -0,0 +1,89 @@
+"""
+Cost of recording call metrics with gengo.metrics.ClientMetrics: per
+call from one thread and from eight at once (next to the same recording
+behind a shared lock, for comparison), per stubbed-out client call, and
+the time render() takes for every endpoint.
+"""
+from __future__ import absolute_import, print_function
+
+import threading
+import time
+
+from bench_dispatch import _stubbed_client
+
+from gengo import Gengo
+from gengo.hooks import RequestTrace
+from gengo.metrics import ClientMetrics
+
+CALLS = 50000
+THREADS = 8
+
+
+def _trace(name='getTranslationJob'):
+    trace = RequestTrace(Gengo.getTranslationJob.endpoint)
+    trace.endpoint = name
+    trace.status = 200
+    trace.elapsed = 0.042
+    return trace
+
+
+def _us_per_record(record, threads, calls):
+    trace = _trace()
+    per_thread = calls // threads
+
+    def work():
+        for _ in range(per_thread):
+            record(trace)
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    start = time.time()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return (time.time() - start) / (per_thread * threads) * 1e6
+
+
+def run(calls=CALLS, threads=THREADS):
+    metrics = ClientMetrics()
+    lock = threading.Lock()
+
+    def record(trace):
+        metrics._before(trace)
+        metrics._after(trace)
+
+    def locked(trace):
+        with lock:
+            metrics._before(trace)
+        with lock:
+            metrics._after(trace)
+
+    results = {
+        'record_us': _us_per_record(record, 1, calls),
+        'record_{0}_threads_us'.format(threads):
+            _us_per_record(record, threads, calls),
+        'record_locked_{0}_threads_us'.format(threads):
+            _us_per_record(locked, threads, calls),
+    }
+
+    plain, measured = _stubbed_client(), _stubbed_client()
+    ClientMetrics().attach(measured)
+    for label, gengo in (('call_us', plain), ('call_with_metrics_us',
+                                              measured)):
+        gengo.getTranslationJob(id=0)
+        start = time.time()
+        for i in range(calls // 10):
+            gengo.getTranslationJob(id=i)
+        results[label] = (time.time() - start) / (calls // 10) * 1e6
+
+    for name in Gengo.__dict__:
+        if hasattr(getattr(Gengo, name), 'endpoint'):
+            record(_trace(name))
+    start = time.time()
+    metrics.render()
+    results['render_ms'] = (time.time() - start) * 1e3
+    return results
+
+
+if __name__ == '__main__':
+    for name, value in sorted(run().items()):
+        print('{0:30s} {1:10.3f}'.format(name, value))
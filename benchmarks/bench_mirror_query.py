@@ -0,0 +1,66 @@
+"""
+Time to answer "reviewable ja->en jobs older than two days" from a
+JobMirror holding a large account.
+"""
+from __future__ import absolute_import, print_function
+
+import random
+import time
+
+from gengo.mirror import JobMirror
+
+JOBS = 100000
+QUERIES = 100
+STATUSES = ('available', 'pending', 'reviewable', 'approved', 'revising')
+PAIRS = (('ja', 'en'), ('en', 'ja'), ('en', 'de'), ('fr', 'en'))
+TIERS = ('standard', 'pro')
+
+
+def make_jobs(jobs=JOBS, now=2000000000):
+    rnd = random.Random(42)
+    result = []
+    for i in range(jobs):
+        lc_src, lc_tgt = rnd.choice(PAIRS)
+        result.append({
+            'job_id': str(i), 'order_id': str(i // 50),
+            'status': rnd.choice(STATUSES), 'lc_src': lc_src,
+            'lc_tgt': lc_tgt, 'tier': rnd.choice(TIERS),
+            'ctime': now - rnd.randint(0, 30 * 86400),
+            'body_src': 'x' * 200,
+        })
+    return result
+
+
+def run(jobs=JOBS, queries=QUERIES):
+    now = 2000000000
+    listed = make_jobs(jobs, now)
+    mirror = JobMirror()
+    results = {}
+
+    start = time.time()
+    for i in range(0, len(listed), 1000):
+        mirror.ingest('getTranslationJobBatch', {}, {
+            'opstat': 'ok', 'response': {'jobs': listed[i:i + 1000]}})
+    results['ingest_seconds'] = time.time() - start
+
+    cutoff = now - 2 * 86400
+    start = time.time()
+    for _ in range(queries):
+        found = mirror.jobs(status='reviewable', lc_src='ja', lc_tgt='en',
+                            created_before=cutoff)
+    results['mirror_query_ms'] = (time.time() - start) / queries * 1e3
+
+    results['mirror_query_rows'] = len(found)
+
+    start = time.time()
+    for _ in range(queries):
+        mirror.count(status='reviewable', lc_src='ja', lc_tgt='en',
+                     created_before=cutoff)
+    results['mirror_count_ms'] = (time.time() - start) / queries * 1e3
+    mirror.close()
+    return results
+
+
+if __name__ == '__main__':
+    for name, value in sorted(run().items()):
+        print('{0:30s} {1:10.3f}'.format(name, value))
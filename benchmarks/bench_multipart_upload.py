@@ -0,0 +1,122 @@
+"""
+Uploads a many-file order to a local stub server and reports the peak
+number of open file descriptors, the peak memory (tracemalloc) while the
+request is built and sent, and the process' maximum RSS afterwards.
+
+`streamed` is the client as it is; `all_open` hands requests a dict of
+open files, which is what the client used to do. `streamed` runs first, as
+maximum RSS only ever grows.
+"""
+from __future__ import absolute_import, print_function
+
+import os
+import resource
+import shutil
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import requests
+
+from gengo import Gengo
+
+from _common import StubServer
+
+FILES = 5000
+FILE_SIZE = 16 * 1024
+
+
+def _open_fds():
+    return len(os.listdir('/proc/self/fd'))
+
+
+class _FdSampler(object):
+
+    def __init__(self, interval=0.001):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample)
+        self._thread.daemon = True
+
+    def _sample(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, _open_fds())
+            time.sleep(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+
+def make_files(directory, files=FILES, size=FILE_SIZE):
+    paths = []
+    for i in range(files):
+        path = os.path.join(directory, 'file_{0}.txt'.format(i))
+        with open(path, 'wb') as f:
+            f.write(b'x' * size)
+        paths.append(path)
+    return paths
+
+
+def _measure(fn):
+    baseline = _open_fds()
+    tracemalloc.start()
+    start = time.time()
+    with _FdSampler() as sampler:
+        fn()
+    elapsed = time.time() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, sampler.peak - baseline
+
+
+def run(files=FILES):
+    directory = tempfile.mkdtemp()
+    try:
+        paths = make_files(directory, files)
+        jobs = dict(
+            ('job_{0}'.format(i), {'type': 'file', 'file_path': path,
+                                   'lc_src': 'en', 'lc_tgt': 'ja',
+                                   'tier': 'standard'})
+            for i, path in enumerate(paths)
+        )
+        results = {}
+        with StubServer() as server:
+            gengo = Gengo(public_key='pub', private_key='priv',
+                          api_url=server.api_url)
+
+            def streamed():
+                gengo.determineTranslationCost(jobs=jobs)
+
+            def all_open():
+                handles = dict(('file_{0}'.format(i), open(path, 'rb'))
+                               for i, path in enumerate(paths))
+                try:
+                    requests.post(server.api_url.format(version='v2'),
+                                  data={'api_key': 'pub'}, files=handles)
+                finally:
+                    for f in handles.values():
+                        f.close()
+
+            for name, fn in (('streamed', streamed), ('all_open', all_open)):
+                elapsed, peak, fds = _measure(fn)
+                results[name + '_seconds'] = elapsed
+                results[name + '_peak_mb'] = peak / 1e6
+                results[name + '_peak_open_files'] = fds
+                results[name + '_max_rss_mb'] = resource.getrusage(
+                    resource.RUSAGE_SELF).ru_maxrss / 1024.0
+            gengo.close()
+        return results
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    for name, value in sorted(run().items()):
+        print('{0:35s} {1:10.3f}'.format(name, value))
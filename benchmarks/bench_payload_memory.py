@@ -0,0 +1,60 @@
+"""
+Peak memory (tracemalloc) and time spent preparing a 10k-job order for
+postTranslationJobs, with the network stubbed out.
+"""
+from __future__ import absolute_import, print_function
+
+import time
+import tracemalloc
+
+from gengo import Gengo
+
+JOBS = 10000
+
+
+def make_order(jobs=JOBS, body_size=1024):
+    return {
+        'jobs': dict(
+            ('job_{0}'.format(i), {
+                'type': 'text',
+                'slug': 'job {0}'.format(i),
+                'body_src': 'x' * body_size + str(i),
+                'lc_src': 'en',
+                'lc_tgt': 'ja',
+                'tier': 'standard',
+                'custom_data': 'id-{0}'.format(i),
+            }) for i in range(jobs)
+        ),
+        'comment': 'bulk order',
+        'as_group': 0,
+    }
+
+
+def _measure(fn):
+    tracemalloc.start()
+    start = time.time()
+    fn()
+    elapsed = time.time() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def run(jobs=JOBS):
+    gengo = Gengo(public_key='pub', private_key='priv')
+    order = make_order(jobs)
+    endpoint = Gengo.postTranslationJobs.endpoint
+    results = {}
+
+    def prepare():
+        gengo._prepareRequest(endpoint, {'jobs': order})
+
+    elapsed, peak = _measure(prepare)
+    results['prepare_seconds'] = elapsed
+    results['prepare_peak_mb'] = peak / 1e6
+    return results
+
+
+if __name__ == '__main__':
+    for name, value in sorted(run().items()):
+        print('{0:30s} {1:10.3f}'.format(name, value))
@@ -0,0 +1,47 @@
+"""
+Time Gengo._handleResponse takes to decode and check responses: an empty
+one, as most calls get, and a 200-job getTranslationJobBatch response.
+Uses whichever JSON codec the client picks by default.
+"""
+from __future__ import absolute_import, print_function
+
+import json
+import time
+
+from bench_json_codec import make_job_batch
+
+from gengo import Gengo
+
+ROUNDS = 200
+
+
+class _Response(object):
+    status_code = 200
+    headers = {}
+
+    def __init__(self, content):
+        self.content = content
+        self.text = content.decode('utf-8')
+
+
+def _ms(fn, rounds):
+    start = time.time()
+    for _ in range(rounds):
+        fn()
+    return (time.time() - start) / rounds * 1e3
+
+
+def run(rounds=ROUNDS):
+    gengo = Gengo(public_key='pub', private_key='priv')
+    empty = _Response(b'{"opstat":"ok","response":{}}')
+    batch = _Response(json.dumps(make_job_batch()).encode('utf-8'))
+    return {
+        'empty_response_us': _ms(
+            lambda: gengo._handleResponse(empty), rounds * 100) * 1e3,
+        'job_batch_ms': _ms(lambda: gengo._handleResponse(batch), rounds),
+    }
+
+
+if __name__ == '__main__':
+    for name, value in sorted(run().items()):
+        print('{0:30s} {1:10.3f}'.format(name, value))
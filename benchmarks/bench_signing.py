@@ -0,0 +1,40 @@
+"""
+Cost of signing one request: a freshly keyed HMAC per call (what the
+client used to do) against Signer, for a new timestamp and for one
+already signed within the same second.
+"""
+from __future__ import absolute_import, print_function
+
+from hashlib import sha1
+import hmac
+import time
+
+from gengo.signing import Signer
+
+CALLS = 200000
+KEY = b'0123456789abcdef0123456789abcdef0123456789abcdef0123456789abcdef'
+
+
+def _us_per_call(fn, calls):
+    start = time.time()
+    for i in range(calls):
+        fn(i)
+    return (time.time() - start) / calls * 1e6
+
+
+def run(calls=CALLS):
+    signer = Signer(KEY)
+    return {
+        'hmac_new_us': _us_per_call(
+            lambda i: hmac.new(KEY, str(i).encode('utf-8'),
+                               sha1).hexdigest(), calls),
+        'signer_new_ts_us': _us_per_call(
+            lambda i: signer.sign(str(i)), calls),
+        'signer_same_ts_us': _us_per_call(
+            lambda i: signer.sign('1500000000'), calls),
+    }
+
+
+if __name__ == '__main__':
+    for name, value in sorted(run().items()):
+        print('{0:30s} {1:8.3f}'.format(name, value))
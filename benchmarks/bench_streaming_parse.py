@@ -0,0 +1,89 @@
+"""
+Time to first job and peak memory (tracemalloc) for a large
+getTranslationJobs-style response, decoded whole versus parsed
+incrementally. The body is produced chunk by chunk so that it does not
+count towards either peak.
+"""
+from __future__ import absolute_import, print_function
+
+import json
+import time
+import tracemalloc
+
+from gengo.codec import getCodec
+from gengo.streaming import CHUNK_SIZE, iterResponse
+
+JOBS = 50000
+
+
+def _job(i):
+    return {'job_id': str(1000000 + i), 'ctime': 1500000000 + i,
+            'status': 'approved', 'lc_src': 'en', 'lc_tgt': 'ja',
+            'slug': 'Product description {0}'.format(i),
+            'body_src': 'Lorem ipsum dolor sit amet. ' * 10}
+
+
+def body_chunks(jobs=JOBS, size=CHUNK_SIZE):
+    """Yields the encoded response in chunks of about `size` bytes."""
+    pending = [b'{"opstat":"ok","response":[']
+    length = len(pending[0])
+    for i in range(jobs):
+        part = (b',' if i else b'') + json.dumps(_job(i)).encode('utf-8')
+        pending.append(part)
+        length += len(part)
+        if length >= size:
+            yield b''.join(pending)
+            pending, length = [], 0
+    pending.append(b']}')
+    yield b''.join(pending)
+
+
+def _measure(consume, jobs):
+    # Timed without tracemalloc, which slows allocations down a lot.
+    start = time.time()
+    first, count = consume(jobs, start)
+    elapsed = time.time() - start
+    assert count == jobs
+
+    tracemalloc.start()
+    consume(jobs, time.time())
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return first, elapsed, peak
+
+
+def _whole(jobs, start):
+    codec = getCodec()
+    results = codec.loads(b''.join(body_chunks(jobs)))
+    first = None
+    count = 0
+    for job in results['response']:
+        if first is None:
+            first = time.time() - start
+        count += 1
+    return first, count
+
+
+def _streamed(jobs, start):
+    first = None
+    count = 0
+    for _ in iterResponse(body_chunks(jobs), (), lambda top: None):
+        if first is None:
+            first = time.time() - start
+        count += 1
+    return first, count
+
+
+def run(jobs=JOBS):
+    results = {}
+    for name, consume in (('whole', _whole), ('streamed', _streamed)):
+        first, elapsed, peak = _measure(consume, jobs)
+        results[name + '_first_job_ms'] = first * 1e3
+        results[name + '_total_seconds'] = elapsed
+        results[name + '_peak_mb'] = peak / 1e6
+    return results
+
+
+if __name__ == '__main__':
+    for name, value in sorted(run().items()):
+        print('{0:30s} {1:10.3f}'.format(name, value))
@@ -0,0 +1,49 @@
+"""
+Calls per second from N threads sharing one Gengo against a local stub
+server. The stub answers immediately, so this measures client overhead
+and contention (session pool, signer, stats) rather than the network.
+"""
+from __future__ import absolute_import, print_function
+
+import threading
+import time
+
+from _common import StubServer
+
+from gengo import Gengo
+
+CALLS = 2000
+THREADS = (1, 4, 16)
+
+
+def _throughput(gengo, threads, calls):
+    per_thread = calls // threads
+
+    def work():
+        for i in range(per_thread):
+            gengo.getTranslationJob(id=i)
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    start = time.time()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return per_thread * threads / (time.time() - start)
+
+
+def run(calls=CALLS, threads=THREADS):
+    results = {}
+    with StubServer() as stub:
+        with Gengo(public_key='pub', private_key='priv',
+                   api_url=stub.api_url, pool_maxsize=max(threads)) as gengo:
+            # Open the pool's connections before timing.
+            _throughput(gengo, max(threads), max(threads))
+            for n in threads:
+                results['threads_{0}_calls_per_sec'.format(n)] = \
+                    _throughput(gengo, n, calls)
+    return results
+
+
+if __name__ == '__main__':
+    for name, value in sorted(run().items()):
+        print('{0:35s} {1:10.1f}'.format(name, value))
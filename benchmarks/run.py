@@ -0,0 +1,211 @@
+"""
+Runs the benchmarks and records their results as JSON, optionally
+comparing them with an earlier run:
+
+    python benchmarks/run.py --output before.json
+    ... change things ...
+    python benchmarks/run.py --output after.json --baseline before.json
+
+Every bench_*.py script is run (or just the ones named on the command
+line, e.g. `signing threads`), each in a fresh interpreter so that memory
+and import measurements don't leak into one another. The output holds the
+commit, interpreter and machine next to every benchmark's results. Use
+--repeat to run each benchmark several times and keep the best value of
+every metric, which makes comparisons much less noisy.
+
+Metrics ending in `_per_sec` are better when higher, all others when
+lower. With --baseline, any metric that got worse by more than
+--threshold (a fraction) is reported and the exit status is 1.
+"""
+from __future__ import absolute_import, print_function
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+
+def available():
+    return sorted(name[len('bench_'):-len('.py')]
+                  for name in os.listdir(HERE)
+                  if name.startswith('bench_') and name.endswith('.py'))
+
+
+def _git(*args):
+    try:
+        return subprocess.check_output(
+            ('git',) + args, cwd=ROOT, stderr=subprocess.DEVNULL,
+            universal_newlines=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadata():
+    commit = _git('rev-parse', 'HEAD')
+    return {
+        'commit': commit,
+        'dirty': bool(_git('status', '--porcelain', '--untracked-files=no'))
+        if commit else None,
+        'timestamp': datetime.datetime.utcnow().replace(
+            microsecond=0).isoformat() + 'Z',
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def run_one(name):
+    """
+    Runs bench_<name>.py in a fresh interpreter and returns its results.
+    Raises RuntimeError with the benchmark's output when it fails.
+    """
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [ROOT, HERE] + [p for p in [env.get('PYTHONPATH')] if p])
+    process = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), '--child', name],
+        cwd=ROOT, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True)
+    out, err = process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError(err.strip() or out.strip())
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def _child(name):
+    module = __import__('bench_' + name)
+    print(json.dumps(module.run(), sort_keys=True))
+
+
+def higher_is_better(metric):
+    return metric.endswith('_per_sec')
+
+
+def compare(results, baseline, threshold):
+    """
+    Returns (benchmark, metric, old, new, change, regressed) for every
+    numeric metric found in both runs. `change` is the relative
+    difference, positive when the metric got worse.
+    """
+    rows = []
+    for bench, metrics in sorted(results.items()):
+        old_metrics = baseline.get(bench) or {}
+        for metric, new in sorted(metrics.items()):
+            old = old_metrics.get(metric)
+            if not _numeric(new) or not _numeric(old):
+                continue
+            if old:
+                change = (new - old) / abs(old)
+            else:
+                change = 0.0 if new == old else float('inf')
+            if higher_is_better(metric):
+                change = -change
+            rows.append((bench, metric, old, new, change,
+                         change > threshold))
+    return rows
+
+
+def best(runs):
+    """
+    Merges the results of several runs of a benchmark, keeping the best
+    value of every numeric metric and the last value of any other.
+    """
+    merged = {}
+    for results in runs:
+        for metric, value in results.items():
+            old = merged.get(metric)
+            if _numeric(value) and _numeric(old):
+                pick = max if higher_is_better(metric) else min
+                value = pick(old, value)
+            merged[metric] = value
+    return merged
+
+
+def _numeric(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Runs the gengo-python benchmarks.')
+    parser.add_argument('benchmarks', nargs='*', metavar='name',
+                        help='benchmarks to run (default: all of them)')
+    parser.add_argument('--output', help='write the results to this file')
+    parser.add_argument('--baseline',
+                        help='compare with the results in this file')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='relative slowdown reported as a regression '
+                             '(default: %(default)s)')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='runs per benchmark, keeping the best '
+                             '(default: %(default)s)')
+    parser.add_argument('--list', action='store_true',
+                        help='list the benchmarks and exit')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        _child(args.child)
+        return 0
+    if args.list:
+        print('\n'.join(available()))
+        return 0
+
+    names = args.benchmarks or available()
+    unknown = sorted(set(names) - set(available()))
+    if unknown:
+        parser.error('unknown benchmarks: {0}'.format(', '.join(unknown)))
+
+    report = {'meta': metadata(), 'results': {}, 'errors': {}}
+    report['meta']['repeat'] = args.repeat
+    for name in names:
+        print(name, file=sys.stderr)
+        try:
+            results = best(run_one(name) for _ in range(args.repeat))
+        except RuntimeError as e:
+            report['errors'][name] = str(e)
+            print('  failed: {0}'.format(str(e).splitlines()[-1]),
+                  file=sys.stderr)
+            continue
+        report['results'][name] = results
+        for metric, value in sorted(results.items()):
+            print('  {0:40s} {1:>12}'.format(metric, _format(value)),
+                  file=sys.stderr)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write('\n')
+
+    status = 1 if report['errors'] else 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print('\nCompared with {0} ({1}):'.format(
+            args.baseline, (baseline.get('meta') or {}).get('commit')))
+        for bench, metric, old, new, change, regressed in compare(
+                report['results'], baseline.get('results') or {},
+                args.threshold):
+            print('{0} {1:50s} {2:>12} {3:>12} {4:>+8.1%}'.format(
+                '!' if regressed else ' ', bench + '.' + metric,
+                _format(old), _format(new), change))
+            if regressed:
+                status = 1
+    return status
+
+
+def _format(value):
+    return '{0:.3f}'.format(value) if isinstance(value, float) \
+        else str(value)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -32,6 +32,27 @@
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 from __future__ import absolute_import, print_function
 
+import logging
+import sys
+
 from .gengo import Gengo, GengoError, GengoAuthError
 
 __all__ = ['Gengo', 'GengoError', 'GengoAuthError']
+
+# Logging is left for the application to configure.
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+if sys.version_info >= (3, 7):
+    __all__.append('AsyncGengo')
+
+    def __getattr__(name):
+        # AsyncGengo pulls in asyncio, so it is only imported when used.
+        if name == 'AsyncGengo':
+            from .aio import AsyncGengo  # NOQA
+            return AsyncGengo
+        raise AttributeError(
+            "module {0!r} has no attribute {1!r}".format(__name__, name))
+elif sys.version_info >= (3, 6):
+    # gengo.aio uses async generators, which need Python 3.6.
+    from .aio import AsyncGengo  # NOQA
+    __all__.append('AsyncGengo')
@@ -0,0 +1,286 @@
+# All code provided from the http://gengo.com site, such as API example code
+# and libraries, is provided under the New BSD license unless otherwise
+# noted. Details are below.
+#
+# New BSD License
+# Copyright (c) 2009-2020, Gengo, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# Neither the name of Gengo, Inc. nor the names of its contributors may
+# be used to endorse or promote products derived from this software
+# without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+# IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+# PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+asyncio flavour of the Gengo client (Python 3.6+, requires aiohttp).
+
+Every endpoint in mockdb.apihash is exposed as a coroutine:
+
+    async with AsyncGengo(public_key, private_key) as gengo:
+        jobs = await asyncio.gather(*[
+            gengo.getTranslationJob(id=job_id) for job_id in job_ids
+        ])
+
+Request building, signing and error handling are shared with Gengo; only
+the transport differs.
+The helpers Gengo builds from several blocking calls (the *Bulk, iter*
+and stream* methods) raise TypeError here.
+
+asgiCallbackApp serves a gengo.callbacks.CallbackApp from an ASGI server.
+"""
+from __future__ import absolute_import
+
+import asyncio
+import json
+from time import time
+
+from .gengo import Gengo, _clock
+from .multipart import MultipartEncoder
+
+
+class _AsyncResponse(object):
+
+    """
+    The parts of a requests.Response that Gengo._handleResponse relies on.
+    """
+    def __init__(self, status_code, content, headers):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', 'replace')
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class AsyncGengo(Gengo):
+
+    def __init__(self, public_key=None, private_key=None,
+                 max_concurrency=100, **kwargs):
+        """
+        AsyncGengo(public_key=None, private_key=None, max_concurrency=100,
+        **kwargs)
+
+        Takes the same arguments as Gengo, plus:
+        max_concurrency - maximum number of requests in flight at once.
+        Calls beyond that wait for a free slot instead of opening more
+        connections.
+
+        The aiohttp session is created on first use, inside the running
+        event loop. Close it with `await gengo.close()` or use the instance
+        as an async context manager.
+        """
+        self.max_concurrency = max_concurrency
+        self._semaphore = None
+        super(AsyncGengo, self).__init__(public_key=public_key,
+                                         private_key=private_key, **kwargs)
+
+    async def _throttle(self, endpoint, sleep):
+        # Gengo._throttle returns whatever `sleep` returns, which is a
+        # coroutine for asyncio.sleep.
+        waiting = super(AsyncGengo, self)._throttle(endpoint, sleep)
+        if waiting is not None:
+            await waiting
+
+    def _createSession(self, pool_connections, pool_maxsize):
+        # The aiohttp session has to be created inside the event loop, so
+        # defer it to the first request.
+        return None
+
+    async def _ensureSession(self):
+        if self.session is None:
+            import aiohttp
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+            self.session = aiohttp.ClientSession(connector=connector)
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self.session
+
+    async def close(self):
+        """
+        Closes the underlying aiohttp session.
+        """
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def __enter__(self):
+        raise TypeError("Use 'async with' with AsyncGengo")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def _call(self, endpoint, kwargs, trace=None):
+        import aiohttp
+        if self._hooks and trace is None:
+            trace = self._startTrace(endpoint)
+            try:
+                results = await self._call(endpoint, kwargs, trace)
+            except Exception as e:
+                self._finishTrace(trace, e)
+                raise
+            self._finishTrace(trace)
+            return results
+
+        cache_key, ttl, cached = self._cacheLookup(endpoint, kwargs)
+        if cached is not None:
+            if trace is not None:
+                trace.cached = True
+            return cached
+
+        if trace is not None:
+            start = _clock()
+        fn, base, query_params, post_data, file_data = \
+            self._prepareRequest(endpoint, kwargs)
+        if trace is not None:
+            trace.phases['build'] += _clock() - start
+
+        attempt = 0
+        while True:
+            await self._throttle(endpoint, asyncio.sleep)
+            try:
+                # _send is a coroutine here, so signAndRequestAPILatest
+                # hands back an awaitable instead of a response.
+                response = await self.signAndRequestAPILatest(
+                    fn, base, query_params, post_data, file_data,
+                    trace=trace)
+                error = None
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                response, error = None, e
+            if trace is not None:
+                trace.received(response)
+                trace.retries = attempt
+
+            delay = self._retryDelay(endpoint, attempt, response, error)
+            if delay is None:
+                if error is not None:
+                    raise error
+                break
+            attempt += 1
+            await asyncio.sleep(delay)
+            query_params['ts'] = str(int(time()))
+
+        if trace is None:
+            results = self._handleResponse(response)
+        else:
+            start = _clock()
+            try:
+                results = self._handleResponse(response)
+            finally:
+                trace.phases['decode'] += _clock() - start
+        if cache_key is not None:
+            self.cache.set(cache_key, results, ttl)
+        if self.mirror is not None:
+            self._ingest(endpoint.name, kwargs, results)
+        return results
+
+    async def _send(self, method, url, headers=None, data=None,
+                    verify=True):
+        session = await self._ensureSession()
+        encoder = data if isinstance(data, MultipartEncoder) else None
+        if encoder is not None:
+            headers = dict(headers or {})
+            headers['Content-Length'] = str(len(encoder))
+            data = _stream(encoder)
+        try:
+            async with self._semaphore:
+                async with session.request(
+                        method, url, headers=headers, data=data,
+                        ssl=None if verify else False) as resp:
+                    content = await resp.read()
+                    return _AsyncResponse(resp.status, content, resp.headers)
+        finally:
+            if encoder is not None:
+                encoder.close()
+
+
+def _syncOnly(name):
+    def method(self, *args, **kwargs):
+        raise TypeError('{0} is only available on Gengo, not on AsyncGengo'
+                        .format(name))
+    method.__name__ = name
+    return method
+
+
+# Helpers Gengo builds on top of blocking calls; AsyncGengo's calls are
+# coroutines, so these would fail half way through.
+for _name in ('postTranslationJobsBulk', 'updateTranslationJobsBulk',
+              'iterTranslationJobs', 'iterTranslationJobComments',
+              'iterOrderComments', 'streamTranslationJobs',
+              'streamTranslationJobBatch', 'streamTranslationOrderJobs'):
+    setattr(AsyncGengo, _name, _syncOnly(_name))
+
+
+async def _stream(encoder):
+    # File reads are small and sequential, so they are done inline rather
+    # than in an executor.
+    for chunk in encoder:
+        yield chunk
+
+
+def asgiCallbackApp(callback_app):
+    """
+    Wraps a gengo.callbacks.CallbackApp as an ASGI application. Queueing
+    never blocks, so requests are handled right in the event loop.
+    """
+    async def app(scope, receive, send):
+        if scope['type'] == 'lifespan':
+            while True:
+                message = await receive()
+                await send({'type': message['type'] + '.complete'})
+                if message['type'] == 'lifespan.shutdown':
+                    return
+        if scope['type'] != 'http':
+            return
+
+        headers = dict(scope.get('headers') or [])
+        content_type = headers.get(b'content-type', b'').decode('latin-1')
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if size <= callback_app.max_body:
+                chunks.append(chunk)
+            if not message.get('more_body'):
+                break
+        if size > callback_app.max_body:
+            from .callbacks import _reply
+            status, headers, body = _reply(413, 'Request body too large')
+        else:
+            status, headers, body = callback_app.respond(
+                scope['method'], content_type, b''.join(chunks))
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(k.lower().encode('latin-1'), v.encode('latin-1'))
+                        for k, v in headers],
+        })
+        await send({'type': 'http.response.body', 'body': body})
+    return app
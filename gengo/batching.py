@@ -0,0 +1,154 @@
+# All code provided from the http://gengo.com site, such as API example code
+# and libraries, is provided under the New BSD license unless otherwise
+# noted. Details are below.
+#
+# New BSD License
+# Copyright (c) 2009-2020, Gengo, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# Neither the name of Gengo, Inc. nor the names of its contributors may
+# be used to endorse or promote products derived from this software
+# without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+# IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+# PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Coalesces individual job lookups into getTranslationJobBatch calls.
+
+Code paths that each need one job can share a JobLoader; lookups made
+within a short window (or until max_batch_size distinct IDs are waiting)
+go out as a single request:
+
+    loader = JobLoader(gengo)
+    job = loader.get(1234)              # blocks until the batch returns
+    future = loader.load(5678)          # or collect a Future
+"""
+from __future__ import absolute_import
+
+from concurrent.futures import Future, ThreadPoolExecutor
+import threading
+
+from .gengo import GengoError
+
+
+class JobLoader(object):
+
+    def __init__(self, gengo, max_batch_size=50, wait=0.005,
+                 max_workers=4):
+        """
+        gengo - the Gengo instance used for getTranslationJobBatch.
+        max_batch_size - number of distinct job IDs that triggers an
+        immediate request.
+        wait - seconds a lookup may wait for others to join its batch.
+        max_workers - number of batch requests in flight at once.
+        """
+        self.gengo = gengo
+        self.max_batch_size = max_batch_size
+        self.wait = wait
+        self.loads = 0
+        self.batches = 0
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._timer = None
+        self._closed = False
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def load(self, job_id):
+        """
+        Queues a lookup and returns a Future resolving to the job dict
+        (the `job` of a getTranslationJob response). IDs missing from the
+        batch response resolve to a GengoError. Raises RuntimeError once
+        the loader is closed.
+        """
+        future = Future()
+        batch = None
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('JobLoader is closed')
+            self.loads += 1
+            self._pending.setdefault(str(job_id), []).append(future)
+            if len(self._pending) >= self.max_batch_size:
+                batch = self._takeBatch()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.wait, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if batch:
+            self._executor.submit(self._dispatch, batch)
+        return future
+
+    def loadMany(self, job_ids):
+        return [self.load(job_id) for job_id in job_ids]
+
+    def get(self, job_id, timeout=None):
+        return self.load(job_id).result(timeout)
+
+    def flush(self):
+        """
+        Sends whatever is waiting right away, from the calling thread.
+        """
+        with self._lock:
+            batch = self._takeBatch()
+        if batch:
+            self._dispatch(batch)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+        self.flush()
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _takeBatch(self):
+        # Called with the lock held.
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, {}
+        return batch
+
+    def _dispatch(self, batch):
+        with self._lock:
+            self.batches += 1
+        try:
+            resp = self.gengo.getTranslationJobBatch(id=','.join(batch))
+            jobs = (resp.get('response') or {}).get('jobs') or []
+        except Exception as e:
+            for futures in batch.values():
+                for future in futures:
+                    future.set_exception(e)
+            return
+
+        found = dict((str(job.get('job_id')), job) for job in jobs)
+        for job_id, futures in batch.items():
+            job = found.get(job_id)
+            for future in futures:
+                if job is None:
+                    future.set_exception(GengoError(
+                        'Job {0} not found'.format(job_id), 404))
+                else:
+                    future.set_result(job)
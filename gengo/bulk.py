@@ -0,0 +1,299 @@
+# All code provided from the http://gengo.com site, such as API example code
+# and libraries, is provided under the New BSD license unless otherwise
+# noted. Details are below.
+#
+# New BSD License
+# Copyright (c) 2009-2020, Gengo, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# Neither the name of Gengo, Inc. nor the names of its contributors may
+# be used to endorse or promote products derived from this software
+# without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+# IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+# PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Helpers for submitting very large orders and bulk job actions.
+
+A single postTranslationJobs call carries the whole order in one
+form-encoded `data` field; past a few thousand jobs that request gets slow
+or rejected outright. postTranslationJobsBulk splits the jobs into batches
+bounded by job count and encoded size, submits the batches concurrently
+and merges the results. updateTranslationJobsBulk does the same for the
+`job_ids` of an updateTranslationJobs action, retrying failed batches.
+"""
+from __future__ import absolute_import
+
+from concurrent.futures import ThreadPoolExecutor
+import json
+from time import sleep
+
+import requests
+
+from .gengo import GengoAuthError, GengoError
+from .ratelimit import RetryPolicy
+
+# Order level options accepted next to the jobs by postTranslationJobs.
+ORDER_KEYS = ('as_group', 'comment', 'url_attachments', 'reference_id')
+
+
+def splitOrder(jobs):
+    """
+    Splits a postTranslationJobs `jobs` argument into (jobs, options),
+    accepting both the {'jobs': {...}, 'comment': ...} shape and the flat
+    shape where order options sit next to the jobs.
+    """
+    options = dict((k, jobs[k]) for k in ORDER_KEYS if k in jobs)
+    if 'jobs' in jobs:
+        return jobs['jobs'], options
+    return dict((k, v) for k, v in jobs.items()
+                if k not in ORDER_KEYS), options
+
+
+def chunkJobs(jobs, max_jobs=50, max_bytes=1000000):
+    """
+    Yields dicts of at most `max_jobs` jobs whose JSON encoding stays under
+    `max_bytes`, preserving the order of `jobs`. A single job larger than
+    `max_bytes` is sent on its own rather than dropped.
+    """
+    batch = {}
+    size = 2
+    for key, job in jobs.items():
+        # "key":{...}, -- matches the compact encoding used on the wire.
+        job_size = len(json.dumps({key: job}, separators=(',', ':')))
+        if batch and (len(batch) >= max_jobs or size + job_size > max_bytes):
+            yield batch
+            batch = {}
+            size = 2
+        batch[key] = job
+        size += job_size - 1
+    if batch:
+        yield batch
+
+
+def chunkJobIds(job_ids, max_jobs=100, max_bytes=1000000):
+    """
+    Yields lists of at most `max_jobs` entries of an updateTranslationJobs
+    `job_ids` list (IDs or dicts) whose JSON encoding stays under
+    `max_bytes`, preserving their order. A single entry larger than
+    `max_bytes` is sent on its own.
+    """
+    batch = []
+    size = 2
+    for entry in job_ids:
+        entry_size = len(json.dumps(entry, separators=(',', ':'))) + 1
+        if batch and (len(batch) >= max_jobs or
+                      size + entry_size > max_bytes):
+            yield batch
+            batch = []
+            size = 2
+        batch.append(entry)
+        size += entry_size
+    if batch:
+        yield batch
+
+
+def runConcurrently(fn, items, max_workers):
+    """
+    Calls fn(item) for every item on a pool of `max_workers` threads and
+    returns a list of (item, result, exception) in the order of `items`.
+    Only API and transport errors are returned; anything else, such as a
+    TypeError from bad input, is raised.
+    """
+    def attempt(item):
+        try:
+            return item, fn(item), None
+        except (GengoError, requests.RequestException) as e:
+            # Keep going: other items may already have gone through and
+            # their results must not be lost.
+            return item, None, e
+
+    if max_workers <= 1:
+        return [attempt(item) for item in items]
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(attempt, items))
+
+
+def postTranslationJobsBulk(gengo, jobs, max_jobs=50, max_bytes=1000000,
+                            max_workers=4):
+    """
+    Submits `jobs` (anything postTranslationJobs accepts as `jobs`) in
+    batches and returns a merged result:
+
+    {
+        'order_ids': [...],       # one order per successful batch
+        'job_count': 123,
+        'credits_used': 45.6,
+        'currency': 'USD',
+        'responses': [...],       # raw `response` of each batch, in order
+        'errors': {job_key: exception},
+    }
+
+    `comment`, `as_group`, `reference_id` and order level
+    `url_attachments` are sent with every batch, so each resulting order
+    carries them; with `as_group` the jobs are grouped per batch. A batch
+    rejected by the API reports the error for each of its jobs, using the
+    per-job error from the API where it gives one.
+    """
+    jobs, options = splitOrder(jobs)
+
+    def submit(batch):
+        order = dict(options)
+        order['jobs'] = batch
+        return gengo.postTranslationJobs(jobs=order)
+
+    batches = list(chunkJobs(jobs, max_jobs=max_jobs, max_bytes=max_bytes))
+    result = {
+        'order_ids': [],
+        'job_count': 0,
+        'credits_used': 0,
+        'currency': None,
+        'responses': [],
+        'errors': {},
+    }
+    for batch, resp, error in runConcurrently(submit, batches, max_workers):
+        if error is not None:
+            for key in batch:
+                result['errors'][key] = _jobError(error, key)
+            continue
+        response = resp.get('response') or {}
+        result['responses'].append(response)
+        if 'order_id' in response:
+            result['order_ids'].append(response['order_id'])
+        result['job_count'] += int(response.get('job_count', len(batch)))
+        result['credits_used'] += float(response.get('credits_used', 0))
+        result['currency'] = response.get('currency', result['currency'])
+    return result
+
+
+def updateTranslationJobsBulk(gengo, action, max_jobs=100, max_bytes=1000000,
+                              max_workers=4, max_retries=2,
+                              backoff_factor=0.5):
+    """
+    Applies an updateTranslationJobs `action` ({'action': 'approve',
+    'job_ids': [...], ...}) in batches of `job_ids` and returns:
+
+    {
+        'succeeded': [...],       # job IDs in batches that went through
+        'failed': {job_id: exception},
+        'unknown': [...],         # see below
+        'responses': [...],       # raw `response` of each batch
+        'batches': 12,
+        'retried': 1,             # batches sent again
+    }
+
+    Entries of `job_ids` may be plain IDs or dicts with a `job_id` and
+    per-job fields such as `comment` or `reason`; every other key of
+    `action` is sent with each batch.
+
+    Failed batches are sent again, up to `max_retries` times with
+    exponential backoff, when the failure looks temporary: a connection
+    error, a timeout, a 429 or a 5xx. Batches the API rejected are not
+    retried and report the error for each of their jobs. When the API
+    reported errors per job, the other jobs of the batch go to `unknown`:
+    the response doesn't say whether the action was applied to them, so
+    re-read them before acting again. A batch that timed out may still
+    have been applied, in which case its retry fails with the error the
+    API gives for jobs already in that state.
+    """
+    options = dict((k, v) for k, v in action.items() if k != 'job_ids')
+    policy = RetryPolicy(max_retries=max_retries,
+                         backoff_factor=backoff_factor, methods=('PUT',))
+
+    def submit(batch):
+        chunk = dict(options)
+        chunk['job_ids'] = batch
+        return gengo.updateTranslationJobs(action=chunk)
+
+    pending = list(chunkJobIds(action.get('job_ids') or [],
+                               max_jobs=max_jobs, max_bytes=max_bytes))
+    result = {
+        'succeeded': [],
+        'failed': {},
+        'unknown': [],
+        'responses': [],
+        'batches': len(pending),
+        'retried': 0,
+    }
+    attempt = 0
+    while pending:
+        retry = []
+        delay = 0
+        for batch, resp, error in runConcurrently(submit, pending,
+                                                  max_workers):
+            if error is None:
+                result['succeeded'].extend(_jobId(entry) for entry in batch)
+                result['responses'].append(resp.get('response'))
+                continue
+            wait = policy.delay('PUT', attempt, error=error) \
+                if _isTemporary(error) else None
+            if wait is not None:
+                retry.append(batch)
+                delay = max(delay, wait)
+                continue
+            errors = getattr(error, 'errors', None)
+            for entry in batch:
+                job_id = _jobId(entry)
+                if errors and str(job_id) not in errors:
+                    result['unknown'].append(job_id)
+                else:
+                    result['failed'][job_id] = _jobError(error, str(job_id))
+        if retry:
+            result['retried'] += len(retry)
+            sleep(delay)
+        pending = retry
+        attempt += 1
+    return result
+
+
+def _jobId(entry):
+    return entry['job_id'] if isinstance(entry, dict) else entry
+
+
+def _isTemporary(error):
+    if isinstance(error, requests.RequestException):
+        # Connection errors and timeouts.
+        return True
+    if isinstance(error, GengoAuthError) or error.errors:
+        return False
+    code = error.error_code
+    # 1 is what the client reports for a response that isn't JSON, e.g.
+    # an error page from a proxy.
+    return code in (1, 429) or isinstance(code, int) and 500 <= code < 600
+
+
+def _jobError(error, key):
+    """
+    Narrows a batch-wide GengoError down to one job when the API reported
+    errors per job.
+    """
+    errors = getattr(error, 'errors', None)
+    if not errors or key not in errors:
+        return error
+    first = errors[key][0]
+    try:
+        job_error = GengoError(first.get('msg'), first.get('code'))
+    except GengoAuthError as e:
+        # GengoError turns code 1000 into a GengoAuthError on its own.
+        job_error = e
+    job_error.errors = {key: errors[key]}
+    return job_error
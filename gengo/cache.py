@@ -0,0 +1,235 @@
+# All code provided from the http://gengo.com site, such as API example code
+# and libraries, is provided under the New BSD license unless otherwise
+# noted. Details are below.
+#
+# New BSD License
+# Copyright (c) 2009-2020, Gengo, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# Neither the name of Gengo, Inc. nor the names of its contributors may
+# be used to endorse or promote products derived from this software
+# without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+# IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+# PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Opt-in response cache for slow-changing endpoints.
+
+Endpoints flagged with a 'cache_ttl' in mockdb.apihash (language pairs,
+glossaries, preferred translators, ...) are served from the cache while
+their entry is fresh:
+
+    cache = ResponseCache(max_bytes=5 * 1024 * 1024)
+    gengo = Gengo(public_key, private_key, cache=cache)
+    gengo.getServiceLanguagePairs()   # network
+    gengo.getServiceLanguagePairs()   # cache hit
+    cache.invalidate('getServiceLanguagePairs')
+
+Entries are stored JSON-encoded, which bounds memory by their encoded size
+and hands every caller a fresh copy it is free to modify. Passing
+DiskCache(path) as `backend` persists entries so that newly started
+workers can skip the refetch.
+"""
+from __future__ import absolute_import
+
+from collections import OrderedDict
+from hashlib import sha1
+import json
+import os
+import re
+import tempfile
+import threading
+from time import time
+
+# DiskCache file names: entries, and temporary files being written.
+_ENTRY_NAME = re.compile(r'^[0-9a-f]{40}\.json$')
+_TMP_PREFIX = '.gengo-cache-'
+# Temporary files older than this (in seconds) were left by a writer
+# that died.
+_TMP_MAX_AGE = 60
+
+
+class ResponseCache(object):
+
+    def __init__(self, max_bytes=10 * 1024 * 1024, ttls=None, backend=None):
+        """
+        max_bytes - upper bound on the encoded size of the entries held in
+        memory; least recently used entries are evicted past it.
+        ttls - per endpoint TTL overrides in seconds, e.g.
+        {'getGlossary': 60}. A TTL of 0 or None disables caching for that
+        endpoint. Defaults come from 'cache_ttl' in mockdb.apihash.
+        backend - optional second level store such as DiskCache.
+        """
+        self.max_bytes = max_bytes
+        self.ttls = ttls or {}
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def ttlFor(self, endpoint):
+        if endpoint.name in self.ttls:
+            return self.ttls[endpoint.name]
+        return endpoint.fn.get('cache_ttl')
+
+    def key(self, gengo, endpoint, kwargs):
+        """
+        Cache key for a call: the account and API it goes to, the endpoint
+        name and its arguments.
+        """
+        return json.dumps([gengo.public_key, gengo._baseURL(), endpoint.name,
+                           kwargs], sort_keys=True, default=str)
+
+    def get(self, key):
+        """
+        Returns the cached response for `key` or None.
+        """
+        now = time()
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None and entry[0] <= now:
+                self._size -= len(entry[1])
+                entry = None
+            if entry is not None:
+                # Re-insert to mark as most recently used.
+                self._entries[key] = entry
+        if entry is None and self.backend is not None:
+            entry = self.backend.get(key)
+            if entry is not None and entry[0] > now:
+                with self._lock:
+                    self._store(key, entry)
+            else:
+                entry = None
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(entry[1])
+
+    def set(self, key, results, ttl):
+        entry = (time() + ttl, json.dumps(results, separators=(',', ':')))
+        with self._lock:
+            self._store(key, entry)
+        if self.backend is not None:
+            self.backend.set(key, entry)
+
+    def invalidate(self, api_call=None):
+        """
+        Drops every entry, or only those of one endpoint.
+        """
+        with self._lock:
+            for key in list(self._entries):
+                if api_call is None or json.loads(key)[2] == api_call:
+                    self._size -= len(self._entries.pop(key)[1])
+        if self.backend is not None:
+            self.backend.invalidate(api_call)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._size,
+            }
+
+    def _store(self, key, entry):
+        # Called with the lock held.
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._size -= len(old[1])
+        if len(entry[1]) > self.max_bytes:
+            return
+        self._entries[key] = entry
+        self._size += len(entry[1])
+        while self._size > self.max_bytes:
+            evicted = self._entries.popitem(last=False)[1]
+            self._size -= len(evicted[1])
+            self.evictions += 1
+
+
+class DiskCache(object):
+
+    """
+    Keeps cache entries as one small JSON file per key under `path`.
+    Only files named like the entries (<sha1>.json) and the backend's own
+    temporary files are ever read or removed, so `path` may be shared.
+    """
+    def __init__(self, path):
+        self.path = path
+        if not os.path.isdir(path):
+            os.makedirs(path)
+
+    def _file(self, key):
+        return os.path.join(
+            self.path, sha1(key.encode('utf-8')).hexdigest() + '.json')
+
+    def get(self, key):
+        try:
+            with open(self._file(key)) as f:
+                stored = json.load(f)
+        except (IOError, OSError, ValueError):
+            return None
+        if stored.get('key') != key:
+            return None
+        return stored['expires'], stored['body']
+
+    def set(self, key, entry):
+        # Write to a temporary file first so that concurrent readers never
+        # see a half written entry.
+        fd, tmp = tempfile.mkstemp(dir=self.path, prefix=_TMP_PREFIX)
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'key': key, 'expires': entry[0], 'body': entry[1]}, f)
+        getattr(os, 'replace', os.rename)(tmp, self._file(key))
+
+    def invalidate(self, api_call=None):
+        """
+        Removes the entries of `api_call` (all of them when None), and
+        temporary files left behind by writers that died mid-write.
+        """
+        for name in os.listdir(self.path):
+            filename = os.path.join(self.path, name)
+            if name.startswith(_TMP_PREFIX):
+                try:
+                    if os.path.getmtime(filename) > time() - _TMP_MAX_AGE:
+                        # Probably still being written.
+                        continue
+                except OSError:
+                    continue
+            elif not _ENTRY_NAME.match(name):
+                continue
+            elif api_call is not None:
+                try:
+                    with open(filename) as f:
+                        if json.loads(json.load(f)['key'])[2] != api_call:
+                            continue
+                except (IOError, OSError, ValueError, KeyError):
+                    continue
+            try:
+                os.remove(filename)
+            except OSError:
+                pass
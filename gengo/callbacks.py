@@ -0,0 +1,292 @@
+# All code provided from the http://gengo.com site, such as API example code
+# and libraries, is provided under the New BSD license unless otherwise
+# noted. Details are below.
+#
+# New BSD License
+# Copyright (c) 2009-2020, Gengo, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# Neither the name of Gengo, Inc. nor the names of its contributors may
+# be used to endorse or promote products derived from this software
+# without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+# IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+# PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Receiver for the callbacks Gengo sends to a job's `callback_url`, so that
+status changes and new comments arrive without polling.
+
+CallbackApp is a WSGI application (and, through asgi(), an ASGI one).
+Every delivery is parsed, checked against recently seen deliveries (Gengo
+retries until it gets a 200) and queued; worker threads then call your
+handler with one event per delivery:
+
+    def handler(event):
+        if event['type'] == 'job':
+            print(event['job_id'], event['status'])
+
+    app = CallbackApp(handler)
+    serve(app, port=8080)       # or mount `app` in any WSGI server
+
+When the queue is full the delivery is refused with a 503 and Gengo
+delivers it again later. A delivery is acknowledged once queued, so an
+exception in the handler is logged and the event is not retried.
+"""
+from __future__ import absolute_import
+
+from collections import OrderedDict
+from hashlib import sha1
+import json
+import logging
+import threading
+try:
+    from queue import Full, Queue
+    from socketserver import ThreadingMixIn
+    from urllib.parse import parse_qs
+except ImportError:
+    from Queue import Full, Queue
+    from SocketServer import ThreadingMixIn
+    from urlparse import parse_qs
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, \
+    make_server
+
+from .gengo import ClientStats
+
+logger = logging.getLogger(__name__)
+
+# Form fields Gengo posts the JSON payload in, by callback type.
+CALLBACK_TYPES = ('job', 'comment')
+
+_STOP = object()
+
+
+def parseCallback(body, content_type=None):
+    """
+    Returns (type, payload) for a callback request body: form encoded
+    with a `job` or `comment` field holding JSON, as Gengo sends them,
+    or a JSON object with one of those keys.
+
+    Raises ValueError for anything else.
+    """
+    if isinstance(body, bytes):
+        body = body.decode('utf-8')
+    if content_type and content_type.split(';')[0].strip() == \
+            'application/json':
+        fields = json.loads(body)
+        if not isinstance(fields, dict):
+            raise ValueError('Expected a JSON object')
+    else:
+        fields = dict((k, v[0]) for k, v in parse_qs(body).items())
+    for kind in CALLBACK_TYPES:
+        if kind in fields:
+            payload = fields[kind]
+            if not isinstance(payload, dict):
+                payload = json.loads(payload)
+            if not isinstance(payload, dict):
+                raise ValueError('Expected a JSON object in ' + kind)
+            return kind, payload
+    raise ValueError('Not a Gengo callback')
+
+
+def deliveryKey(kind, payload):
+    """
+    Identifies a delivery: retries of the same callback carry the same
+    payload, so they get the same key.
+    """
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+    return kind + ':' + sha1(canonical.encode('utf-8')).hexdigest()
+
+
+class CallbackApp(object):
+
+    def __init__(self, handler, workers=2, max_queue=1000,
+                 dedupe_size=10000, max_body=1024 * 1024):
+        """
+        handler - called as handler(event) from a worker thread for each
+        new delivery. Events are dicts:
+
+        {
+            'type': 'job' or 'comment',
+            'job_id': str or None,
+            'status': the job's status (job callbacks only),
+            'payload': the decoded callback payload
+        }
+
+        workers - number of threads calling `handler`.
+        max_queue - deliveries waiting for a worker before new ones are
+        refused with a 503.
+        dedupe_size - number of recent delivery keys remembered.
+        max_body - largest request body accepted, in bytes.
+        """
+        self.handler = handler
+        self.max_body = max_body
+        self.dedupe_size = dedupe_size
+        self.stats = ClientStats()
+        self._queue = Queue(maxsize=max_queue)
+        self._seen = OrderedDict()
+        self._lock = threading.Lock()
+        self._workers = []
+        for _ in range(workers):
+            worker = threading.Thread(target=self._work)
+            worker.daemon = True
+            worker.start()
+            self._workers.append(worker)
+
+    def respond(self, method, content_type, body):
+        """
+        Handles one request; returns (status, headers, body) for the
+        server. Shared by the WSGI and ASGI entry points.
+        """
+        if method != 'POST':
+            return _reply(405, 'Method not allowed', [('Allow', 'POST')])
+        if len(body) > self.max_body:
+            return _reply(413, 'Request body too large')
+        try:
+            kind, payload = parseCallback(body, content_type)
+        except ValueError:
+            self.stats.incr('invalid')
+            return _reply(400, 'Not a Gengo callback')
+        self.stats.incr('received')
+
+        key = deliveryKey(kind, payload)
+        with self._lock:
+            if key in self._seen:
+                self.stats.incr('duplicates')
+                return _reply(200, 'OK')
+            try:
+                self._queue.put_nowait(_event(kind, payload))
+            except Full:
+                self.stats.incr('rejected')
+                return _reply(503, 'Busy', [('Retry-After', '30')])
+            self._seen[key] = True
+            if len(self._seen) > self.dedupe_size:
+                self._seen.popitem(last=False)
+        return _reply(200, 'OK')
+
+    def __call__(self, environ, start_response):
+        try:
+            length = int(environ.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            length = 0
+        if length > self.max_body:
+            status, headers, body = _reply(413, 'Request body too large')
+        else:
+            body = environ['wsgi.input'].read(length) if length else b''
+            status, headers, body = self.respond(
+                environ['REQUEST_METHOD'], environ.get('CONTENT_TYPE'),
+                body)
+        start_response('{0} {1}'.format(status, _REASONS[status]), headers)
+        return [body]
+
+    def asgi(self):
+        """
+        Returns an ASGI application serving this receiver (Python 3).
+        """
+        from .aio import asgiCallbackApp
+        return asgiCallbackApp(self)
+
+    def join(self):
+        """
+        Blocks until every queued delivery has been handled.
+        """
+        self._queue.join()
+
+    def close(self):
+        """
+        Handles what is queued, then stops the workers.
+        """
+        for _ in self._workers:
+            self._queue.put(_STOP)
+        for worker in self._workers:
+            worker.join()
+        self._workers = []
+
+    def _work(self):
+        while True:
+            event = self._queue.get()
+            try:
+                if event is _STOP:
+                    return
+                self.handler(event)
+                self.stats.incr('processed')
+            except Exception:
+                self.stats.incr('failed')
+                logger.exception('Callback handler failed for %r', event)
+            finally:
+                self._queue.task_done()
+
+
+class _ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class _QuietHandler(WSGIRequestHandler):
+
+    def log_message(self, *args):
+        logger.debug(*args)
+
+
+def makeServer(app, host='127.0.0.1', port=8080):
+    """
+    Returns a threaded wsgiref server for `app`; call serve_forever() on
+    it. Pass port=0 to pick a free port (see server.server_port).
+    """
+    return make_server(host, port, app, server_class=_ThreadingWSGIServer,
+                       handler_class=_QuietHandler)
+
+
+def serve(app, host='127.0.0.1', port=8080):
+    """
+    Serves `app` until interrupted. Fine for moderate callback volumes;
+    put a production WSGI server in front for more.
+    """
+    server = makeServer(app, host, port)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+_REASONS = {
+    200: 'OK',
+    400: 'Bad Request',
+    405: 'Method Not Allowed',
+    413: 'Request Entity Too Large',
+    503: 'Service Unavailable',
+}
+
+
+def _reply(status, message, headers=()):
+    body = message.encode('utf-8')
+    headers = [('Content-Type', 'text/plain; charset=utf-8'),
+               ('Content-Length', str(len(body)))] + list(headers)
+    return status, headers, body
+
+
+def _event(kind, payload):
+    job_id = payload.get('job_id')
+    return {
+        'type': kind,
+        'job_id': None if job_id is None else str(job_id),
+        'status': payload.get('status') if kind == 'job' else None,
+        'payload': payload,
+    }
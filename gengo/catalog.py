@@ -0,0 +1,195 @@
+# All code provided from the http://gengo.com site, such as API example code
+# and libraries, is provided under the New BSD license unless otherwise
+# noted. Details are below.
+#
+# New BSD License
+# Copyright (c) 2009-2020, Gengo, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# Neither the name of Gengo, Inc. nor the names of its contributors may
+# be used to endorse or promote products derived from this software
+# without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+# IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+# PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Indexed view of the language pairs and languages Gengo supports.
+
+    catalog = LanguageCatalog.fromClient(gengo)
+    catalog.price('en', 'ja', 'standard')   # (0.05, 'USD')
+    catalog.targetsFor('en')                # frozenset(['ja', 'de', ...])
+    catalog.validateJobs(jobs)              # {job_key: problem}
+    catalog.refresh(gengo)                  # apply upstream changes
+
+Lookups are dictionary hits keyed by (lc_src, lc_tgt, tier) instead of
+scans over the getServiceLanguagePairs list.
+"""
+from __future__ import absolute_import
+
+try:
+    from sys import intern
+except ImportError:
+    # Python 2 has intern() as a builtin.
+    pass
+
+from .bulk import splitOrder
+
+
+class LanguageCatalog(object):
+
+    def __init__(self, pairs=(), languages=()):
+        """
+        pairs - the `response` list of getServiceLanguagePairs.
+        languages - the `response` list of getServiceLanguages.
+        """
+        # (lc_src, lc_tgt, tier) -> (unit_price, currency)
+        self._prices = {}
+        # lc_src -> set of lc_tgt
+        self._targets = {}
+        # (lc_src, lc_tgt) -> set of tiers
+        self._tiers = {}
+        # lc -> (language name, unit_type)
+        self._languages = {}
+        self._applyPairs(self._indexPairs(pairs))
+        self._languages = self._indexLanguages(languages)
+
+    @classmethod
+    def fromResponses(cls, pairs_response, languages_response=None):
+        return cls((pairs_response or {}).get('response') or (),
+                   (languages_response or {}).get('response') or ())
+
+    @classmethod
+    def fromClient(cls, gengo):
+        catalog = cls()
+        catalog.refresh(gengo)
+        return catalog
+
+    def refresh(self, gengo):
+        """
+        Re-reads both endpoints through `gengo` and applies only what
+        changed. Returns counts of added, removed and changed pairs.
+        """
+        pairs = gengo.getServiceLanguagePairs().get('response') or ()
+        languages = gengo.getServiceLanguages().get('response') or ()
+        changes = self._applyPairs(self._indexPairs(pairs))
+        self._languages = self._indexLanguages(languages)
+        return changes
+
+    def __len__(self):
+        return len(self._prices)
+
+    def __contains__(self, key):
+        return key in self._prices
+
+    def price(self, lc_src, lc_tgt, tier):
+        """
+        Returns (unit_price, currency) for a pair and tier, or None.
+        """
+        return self._prices.get((lc_src, lc_tgt, tier))
+
+    def targetsFor(self, lc_src):
+        return frozenset(self._targets.get(lc_src, ()))
+
+    def tiersFor(self, lc_src, lc_tgt):
+        return frozenset(self._tiers.get((lc_src, lc_tgt), ()))
+
+    def unitType(self, lc):
+        """
+        Returns 'word' or 'character' for a language code, or None.
+        """
+        language = self._languages.get(lc)
+        return language[1] if language else None
+
+    def languageName(self, lc):
+        language = self._languages.get(lc)
+        return language[0] if language else None
+
+    def validateJobs(self, jobs):
+        """
+        Checks lc_src/lc_tgt/tier of every job in a postTranslationJobs
+        style `jobs` argument. Returns {job_key: problem} for the jobs that
+        would be rejected; an empty dict means all of them are supported.
+        """
+        jobs = splitOrder(jobs)[0]
+        prices = self._prices
+        problems = {}
+        for key, job in jobs.items():
+            if not isinstance(job, dict):
+                problems[key] = 'job must be a dict'
+                continue
+            pair = (job.get('lc_src'), job.get('lc_tgt'), job.get('tier'))
+            if pair in prices:
+                continue
+            if None in pair:
+                problems[key] = 'lc_src, lc_tgt and tier are required'
+            elif pair[:2] not in self._tiers:
+                problems[key] = 'unsupported language pair {0}-{1}'.format(
+                    *pair[:2])
+            else:
+                problems[key] = 'tier {2} not offered for {0}-{1}'.format(
+                    *pair)
+        return problems
+
+    @staticmethod
+    def _indexPairs(pairs):
+        index = {}
+        for pair in pairs:
+            key = (intern(str(pair['lc_src'])), intern(str(pair['lc_tgt'])),
+                   intern(str(pair['tier'])))
+            index[key] = (float(pair['unit_price']),
+                          intern(str(pair.get('currency', 'USD'))))
+        return index
+
+    @staticmethod
+    def _indexLanguages(languages):
+        return dict(
+            (intern(str(language['lc'])),
+             (language.get('language'),
+              intern(str(language.get('unit_type', 'word')))))
+            for language in languages)
+
+    def _applyPairs(self, prices):
+        old = self._prices
+        removed = [key for key in old if key not in prices]
+        added = [key for key in prices if key not in old]
+        changed = [key for key in prices
+                   if key in old and old[key] != prices[key]]
+
+        for lc_src, lc_tgt, tier in removed:
+            del old[(lc_src, lc_tgt, tier)]
+            tiers = self._tiers[(lc_src, lc_tgt)]
+            tiers.discard(tier)
+            if not tiers:
+                del self._tiers[(lc_src, lc_tgt)]
+                self._targets[lc_src].discard(lc_tgt)
+                if not self._targets[lc_src]:
+                    del self._targets[lc_src]
+        for key in added:
+            lc_src, lc_tgt, tier = key
+            old[key] = prices[key]
+            self._targets.setdefault(lc_src, set()).add(lc_tgt)
+            self._tiers.setdefault((lc_src, lc_tgt), set()).add(tier)
+        for key in changed:
+            old[key] = prices[key]
+
+        return {'added': len(added), 'removed': len(removed),
+                'changed': len(changed)}
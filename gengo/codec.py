@@ -0,0 +1,153 @@
+# All code provided from the http://gengo.com site, such as API example code
+# and libraries, is provided under the New BSD license unless otherwise
+# noted. Details are below.
+#
+# New BSD License
+# Copyright (c) 2009-2020, Gengo, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# Neither the name of Gengo, Inc. nor the names of its contributors may
+# be used to endorse or promote products derived from this software
+# without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+# IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+# PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+JSON encoding of request payloads and decoding of responses.
+
+Gengo uses the fastest JSON library it finds, in the order of BACKENDS,
+falling back to the standard library:
+
+    Gengo(public_key, private_key)                     # best available
+    Gengo(public_key, private_key, json_codec='json')  # force stdlib
+
+All codecs produce compact JSON (no whitespace) that decodes to the same
+value; orjson writes non-ASCII characters as UTF-8 where the others use
+\\u escapes. Request signatures cover only the timestamp, so they do not
+depend on the codec. simdjson only decodes; it encodes with the standard
+library.
+"""
+from __future__ import absolute_import
+
+import json
+
+# Preferred backends, fastest first.
+BACKENDS = ('orjson', 'ujson', 'simdjson', 'json')
+
+
+class JSONCodec(object):
+
+    """
+    The standard library codec; the others override dumps and/or loads.
+    """
+    name = 'json'
+
+    def dumps(self, obj):
+        """
+        Returns obj as compact JSON text.
+        """
+        return json.dumps(obj, separators=(',', ':'))
+
+    def loads(self, data):
+        """
+        Decodes JSON from bytes or text. Raises ValueError on bad input.
+        """
+        if isinstance(data, bytes):
+            data = data.decode('utf-8')
+        return json.loads(data)
+
+    def __repr__(self):
+        return '<{0} codec>'.format(self.name)
+
+
+class OrjsonCodec(JSONCodec):
+
+    name = 'orjson'
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+        # Job dicts may be keyed by integers, which the stdlib accepts.
+        self._options = orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj):
+        return self._orjson.dumps(obj, option=self._options).decode('utf-8')
+
+    def loads(self, data):
+        return self._orjson.loads(data)
+
+
+class UjsonCodec(JSONCodec):
+
+    name = 'ujson'
+
+    def __init__(self):
+        import ujson
+        self._ujson = ujson
+
+    def dumps(self, obj):
+        return self._ujson.dumps(obj, escape_forward_slashes=False)
+
+    def loads(self, data):
+        return self._ujson.loads(data)
+
+
+class SimdjsonCodec(JSONCodec):
+
+    name = 'simdjson'
+
+    def __init__(self):
+        import simdjson
+        self._simdjson = simdjson
+
+    def loads(self, data):
+        return self._simdjson.loads(data)
+
+
+_CODECS = {
+    'orjson': OrjsonCodec,
+    'ujson': UjsonCodec,
+    'simdjson': SimdjsonCodec,
+    'json': JSONCodec,
+}
+
+
+def getCodec(codec=None):
+    """
+    Returns a codec: `codec` itself when it already is one, the named
+    backend ('orjson', 'ujson', 'simdjson' or 'json'), or the first
+    installed one of BACKENDS when `codec` is None.
+
+    Raises ImportError when a named backend is not installed.
+    """
+    if codec is None:
+        for name in BACKENDS:
+            try:
+                return _CODECS[name]()
+            except ImportError:
+                continue
+    if isinstance(codec, JSONCodec):
+        return codec
+    if codec not in _CODECS:
+        raise ValueError('Unknown JSON codec {0!r}; use one of {1}'.format(
+            codec, ', '.join(BACKENDS)))
+    return _CODECS[codec]()
@@ -0,0 +1,160 @@
+# All code provided from the http://gengo.com site, such as API example code
+# and libraries, is provided under the New BSD license unless otherwise
+# noted. Details are below.
+#
+# New BSD License
+# Copyright (c) 2009-2020, Gengo, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# Neither the name of Gengo, Inc. nor the names of its contributors may
+# be used to endorse or promote products derived from this software
+# without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+# IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+# PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Local cost estimates for draft orders.
+
+determineTranslationCost costs a round trip per draft and is rate limited.
+CostEstimator prices text jobs from a LanguageCatalog instead: unit counts
+are words for languages whose unit_type is 'word' and non-whitespace
+characters for 'character' languages (Japanese, Chinese, ...), multiplied
+by the pair's unit price.
+
+    estimator = CostEstimator.fromClient(gengo)
+    draft = estimator.estimate(jobs)           # no network
+    final = estimator.confirm(gengo, jobs)     # server quote
+
+File jobs cannot be counted locally; they are listed under 'needs_quote',
+or quoted through the API when estimate() is given a client.
+"""
+from __future__ import absolute_import
+
+import re
+
+from .bulk import splitOrder
+from .catalog import LanguageCatalog
+
+_whitespace = re.compile(r'\s+', re.UNICODE)
+
+
+def countWords(text):
+    return len(text.split())
+
+
+def countCharacters(text):
+    return len(_whitespace.sub('', text))
+
+
+class CostEstimator(object):
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+
+    @classmethod
+    def fromClient(cls, gengo):
+        return cls(LanguageCatalog.fromClient(gengo))
+
+    def estimate(self, jobs, gengo=None):
+        """
+        Estimates the cost of a postTranslationJobs style `jobs` argument.
+
+        Returns:
+        {
+            'credits': 12.3,                # sum over priced jobs
+            'currency': 'USD',
+            'unit_count': 246,
+            'jobs': {job_key: {'unit_count': n, 'credits': x,
+                               'currency': 'USD'}},
+            'unpriced': {job_key: problem},
+            'needs_quote': [job_key, ...],  # file jobs
+        }
+
+        With `gengo` given, file jobs are quoted through
+        determineTranslationCost and merged into 'jobs'.
+        """
+        jobs = splitOrder(jobs)[0]
+        result = {
+            'credits': 0.0,
+            'currency': None,
+            'unit_count': 0,
+            'jobs': {},
+            'unpriced': {},
+            'needs_quote': [],
+        }
+
+        # Group the text jobs per (lc_src, lc_tgt, tier) so that the price
+        # and counting function are looked up once per group rather than
+        # once per job.
+        groups = {}
+        for key, job in jobs.items():
+            if not isinstance(job, dict):
+                result['unpriced'][key] = 'job must be a dict'
+            elif job.get('type') == 'file':
+                result['needs_quote'].append(key)
+            else:
+                pair = (job.get('lc_src'), job.get('lc_tgt'), job.get('tier'))
+                groups.setdefault(pair, []).append(key)
+
+        estimates = result['jobs']
+        for pair, keys in groups.items():
+            price = self.catalog.price(*pair)
+            if price is None:
+                for key in keys:
+                    result['unpriced'][key] = \
+                        'no price for {0}-{1} {2}'.format(*pair)
+                continue
+            unit_price, currency = price
+            count = countCharacters \
+                if self.catalog.unitType(pair[0]) == 'character' \
+                else countWords
+            units = [count(jobs[key].get('body_src') or '') for key in keys]
+            for key, unit_count in zip(keys, units):
+                estimates[key] = {
+                    'unit_count': unit_count,
+                    'credits': round(unit_count * unit_price, 2),
+                    'currency': currency,
+                }
+            result['unit_count'] += sum(units)
+            result['credits'] += sum(units) * unit_price
+            result['currency'] = currency
+
+        if gengo is not None and result['needs_quote']:
+            quote = self.confirm(gengo, {'jobs': dict(
+                (key, jobs[key]) for key in result['needs_quote'])})
+            quoted = (quote.get('response') or {}).get('jobs') or {}
+            for key, job in quoted.items():
+                estimates[key] = job
+                result['unit_count'] += int(job.get('unit_count') or 0)
+                result['credits'] += float(job.get('credits') or 0)
+                result['currency'] = job.get('currency', result['currency'])
+            result['needs_quote'] = [key for key in result['needs_quote']
+                                     if key not in quoted]
+
+        result['credits'] = round(result['credits'], 2)
+        return result
+
+    def confirm(self, gengo, jobs):
+        """
+        Asks the API for the authoritative quote.
+        """
+        return gengo.determineTranslationCost(jobs=jobs)
@@ -0,0 +1,685 @@
+# All code provided from the http://gengo.com site, such as API example code
+# and libraries, is provided under the New BSD license unless otherwise
+# noted. Details are below.
+#
+# New BSD License
+# Copyright (c) 2009-2020, Gengo, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# Neither the name of Gengo, Inc. nor the names of its contributors may
+# be used to endorse or promote products derived from this software
+# without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+# IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+# PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+A stateful stand-in for the Gengo API that runs on localhost, for load
+tests and benchmarks that need a real network round trip without the
+real service:
+
+    with FakeGengo(latency=0.02) as fake:
+        gengo = Gengo(public_key=fake.public_key,
+                      private_key=fake.private_key, api_url=fake.api_url)
+        order = gengo.postTranslationJobs(jobs={'jobs': {...}})
+        fake.advance()      # every open job moves one step on
+
+Routes are generated from mockdb.apihash, so every endpoint the client
+knows about answers; the job, order and comment endpoints keep state and
+the rest return an empty response. Requests are authenticated like the
+real API: a missing key or a wrong api_sig gets error 1000.
+
+Jobs move through available -> pending -> reviewable, either explicitly
+with advance() or on their own every `auto_advance` seconds, and are
+approved (or revised, rejected, archived) through updateTranslationJob(s).
+
+From a shell, `python -m gengo.fakeserver --port 8000` serves until
+interrupted.
+"""
+from __future__ import absolute_import, print_function
+
+from collections import Counter
+from hashlib import sha1
+import hmac
+import json
+import logging
+import random
+import re
+import threading
+import time
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import parse_qsl, urlsplit
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urlparse import parse_qsl, urlsplit
+
+from .mockdb import apihash
+
+logger = logging.getLogger(__name__)
+
+AUTH_ERROR = 1000
+
+# Statuses a job leaves on its own, and where it goes next.
+NEXT_STATUS = {
+    'available': 'pending',
+    'pending': 'reviewable',
+    'revising': 'reviewable',
+}
+
+UNIT_PRICES = {
+    'machine': 0.0,
+    'standard': 0.06,
+    'pro': 0.12,
+    'ultra': 0.18,
+}
+
+LANGUAGES = [
+    {'lc': 'en', 'language': 'English', 'localized_name': 'English',
+     'unit_type': 'word'},
+    {'lc': 'ja', 'language': 'Japanese',
+     'localized_name': u'\u65e5\u672c\u8a9e', 'unit_type': 'character'},
+    {'lc': 'es', 'language': 'Spanish (Spain)',
+     'localized_name': u'Espa\xf1ol', 'unit_type': 'word'},
+    {'lc': 'fr', 'language': 'French', 'localized_name': u'Fran\xe7ais',
+     'unit_type': 'word'},
+]
+
+
+class _ApiError(Exception):
+
+    def __init__(self, http_status, err):
+        self.http_status = http_status
+        self.err = err
+
+
+def _error(http_status, msg, code=None):
+    # Without a code, the client reports the HTTP status instead.
+    err = {'msg': msg}
+    if code is not None:
+        err['code'] = code
+    return _ApiError(http_status, err)
+
+
+def _routes():
+    routes = []
+    for name, fn in apihash.items():
+        pattern = []
+        for i, part in enumerate(re.split(r'{{(\w+)}}', fn['url'])):
+            pattern.append('(?P<{0}>[^/]+)'.format(part) if i % 2
+                           else re.escape(part))
+        regex = re.compile(r'^/v[^/]+' + ''.join(pattern) + '$')
+        routes.append((fn['method'], regex, name))
+    return routes
+
+
+class FakeGengo(object):
+
+    """
+    The fake API: its state, the request handling and the HTTP server
+    serving it in a background thread.
+
+    `jobs` and `orders` hold the state as the API would return it and may
+    be inspected (or seeded) directly; `calls` counts requests per
+    endpoint name.
+    """
+    def __init__(self, public_key='pub', private_key='priv',
+                 host='127.0.0.1', port=0, latency=0.0, jitter=0.0,
+                 auto_advance=None, credits=100000.0, clock=time.time):
+        """
+        public_key, private_key - the credentials clients must use.
+        host, port - where to listen; port 0 picks a free port.
+        latency - seconds every response is delayed by.
+        jitter - up to this many seconds are added to `latency` at
+        random.
+        auto_advance - when set, a job moves one status on after spending
+        this many seconds in the previous one.
+        credits - the starting account balance, charged for every order.
+        clock - returns the current time; handy for tests.
+        """
+        self.public_key = public_key
+        self.private_key = private_key
+        self.latency = latency
+        self.jitter = jitter
+        self.auto_advance = auto_advance
+        self.credits = credits
+        self.clock = clock
+        self.jobs = {}
+        self.orders = {}
+        self.calls = Counter()
+        self._lock = threading.Lock()
+        self._next_id = 1
+        self._routes = _routes()
+        self._server = _ThreadingServer((host, port), _Handler)
+        self._server.fake = self
+        self._thread = None
+
+    @property
+    def api_url(self):
+        """The `api_url` to hand to Gengo or AsyncGengo."""
+        host, port = self._server.server_address[:2]
+        return 'http://{0}:{1}/{{version}}'.format(host, port)
+
+    def start(self):
+        """
+        Starts serving in a daemon thread.
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def serve(self):
+        """
+        Serves in the calling thread until interrupted.
+        """
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def stop(self):
+        """
+        Stops the server and closes its socket.
+        """
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def advance(self, job_id=None):
+        """
+        Moves open jobs (or just `job_id`) one status on: available to
+        pending, pending or revising to reviewable. Returns the IDs of the
+        jobs that moved.
+        """
+        with self._lock:
+            if job_id is None:
+                jobs = list(self.jobs.values())
+            else:
+                jobs = [self._job(job_id)]
+            moved = []
+            for job in jobs:
+                self._refresh(job)
+                if job['status'] in NEXT_STATUS:
+                    self._setStatus(job, NEXT_STATUS[job['status']])
+                    moved.append(job['job_id'])
+            return moved
+
+    def handle(self, method, target, body=b'', content_type=''):
+        """
+        Answers one request without going through HTTP. Returns the HTTP
+        status and the response as a dict.
+        """
+        url = urlsplit(target)
+        for route_method, regex, name in self._routes:
+            match = regex.match(url.path)
+            if match is not None and route_method == method:
+                break
+        else:
+            return 404, {'opstat': 'error',
+                         'err': {'msg': 'Not found: {0} {1}'.format(
+                             method, url.path)}}
+
+        with self._lock:
+            self.calls[name] += 1
+        if method in ('GET', 'DELETE'):
+            params = dict(parse_qsl(url.query))
+        else:
+            params = _parseForm(body, content_type)
+        try:
+            self._authenticate(params)
+            data = params.get('data')
+            if data is not None:
+                try:
+                    params['data'] = json.loads(data)
+                except ValueError:
+                    raise _error(400, 'data is not valid JSON')
+            handler = getattr(self, '_' + name, None)
+            with self._lock:
+                if handler is None:
+                    response = {}
+                else:
+                    response = handler(params, **match.groupdict())
+        except _ApiError as e:
+            return e.http_status, {'opstat': 'error', 'err': e.err}
+        return 200, {'opstat': 'ok', 'response': response}
+
+    def _authenticate(self, params):
+        if params.get('api_key') != self.public_key:
+            raise _error(401, 'api_key is missing or unknown', AUTH_ERROR)
+        ts = params.get('ts', '')
+        if not ts.isdigit():
+            raise _error(401, 'ts is missing or not a timestamp', AUTH_ERROR)
+        expected = hmac.new(self.private_key.encode('utf-8'),
+                            ts.encode('utf-8'), sha1).hexdigest()
+        if not hmac.compare_digest(expected, params.get('api_sig', '')):
+            raise _error(401, 'api_sig does not match', AUTH_ERROR)
+
+    # State. Everything below runs with self._lock held.
+
+    def _newId(self):
+        new_id = self._next_id
+        self._next_id += 1
+        return str(new_id)
+
+    def _job(self, job_id):
+        job = self.jobs.get(str(job_id))
+        if job is None:
+            raise _error(404, 'Job {0} not found'.format(job_id))
+        return self._refresh(job)
+
+    def _order(self, order_id):
+        order = self.orders.get(str(order_id))
+        if order is None:
+            raise _error(404, 'Order {0} not found'.format(order_id))
+        for job_id in order['jobs']:
+            self._refresh(self.jobs[job_id])
+        return order
+
+    def _refresh(self, job):
+        # Statuses advance lazily, when a job is looked at.
+        if self.auto_advance is None:
+            return job
+        now = self.clock()
+        while job['status'] in NEXT_STATUS and \
+                now - job['_since'] >= self.auto_advance:
+            since = job['_since'] + self.auto_advance
+            self._setStatus(job, NEXT_STATUS[job['status']])
+            job['_since'] = since
+        return job
+
+    def _setStatus(self, job, status):
+        job['status'] = status
+        job['_since'] = self.clock()
+        if status == 'reviewable':
+            job['body_tgt'] = u'[{0}] {1}'.format(job['lc_tgt'],
+                                                  job.get('body_src', ''))
+            job['_revisions'].append({
+                'rev_id': str(len(job['_revisions']) + 1),
+                'ctime': int(job['_since']),
+                'body_tgt': job['body_tgt'],
+            })
+
+    def _public(self, job):
+        return dict((k, v) for k, v in job.items() if not k.startswith('_'))
+
+    def _quote(self, spec):
+        body = spec.get('body_src') or ''
+        if spec.get('lc_src') == 'ja':
+            units = len(body.replace(' ', ''))
+        else:
+            units = len(body.split())
+        tier = spec.get('tier', 'standard')
+        credits = round(units * UNIT_PRICES.get(tier, 0.0), 2)
+        return units, credits, units * 10
+
+    def _validate(self, jobs, files=()):
+        errors = {}
+        for key, spec in jobs.items():
+            missing = [field for field in ('lc_src', 'lc_tgt', 'tier')
+                       if not spec.get(field)]
+            if spec.get('type') == 'file':
+                if spec.get('file_key') not in files and \
+                        not spec.get('identifier'):
+                    missing.append('file_key')
+            elif not spec.get('body_src'):
+                missing.append('body_src')
+            if missing:
+                errors[key] = [{'code': 400, 'msg': '{0} required'.format(
+                    ', '.join(missing))}]
+            elif spec['tier'] not in UNIT_PRICES:
+                errors[key] = [{'code': 400, 'msg': 'unknown tier {0}'.format(
+                    spec['tier'])}]
+        if errors:
+            raise _ApiError(400, errors)
+
+    def _comment(self, thread, body):
+        if not isinstance(body, dict) or not body.get('body'):
+            raise _error(400, 'body required')
+        thread.append({'body': body['body'], 'author': 'customer',
+                       'ctime': int(self.clock())})
+
+    def _act(self, job, action):
+        name = action.get('action')
+        status = job['status']
+        if name == 'approve' and status == 'reviewable':
+            job['status'] = 'approved'
+            job['_rating'] = action.get('rating')
+            job['_feedback'] = action.get('for_translator')
+        elif name == 'revise' and status == 'reviewable':
+            self._setStatus(job, 'revising')
+            if action.get('comment'):
+                self._comment(job['_thread'], {'body': action['comment']})
+        elif name == 'reject' and status == 'reviewable':
+            job['status'] = 'rejected'
+            if action.get('comment'):
+                self._comment(job['_thread'], {'body': action['comment']})
+        elif name == 'archive' and status == 'approved':
+            job['_archived'] = True
+        else:
+            raise _error(400, 'Cannot {0} a job that is {1}'.format(
+                name, status))
+
+    # Endpoints, named after their mockdb.apihash entries.
+
+    def _getAccountStats(self, params):
+        spent = sum(order['total_credits'] for order in self.orders.values())
+        return {'credits_spent': '{0:.2f}'.format(spent),
+                'currency': 'USD', 'user_since': 1262304000,
+                'billing_type': 'Pre-pay', 'customer_type': 'Retail'}
+
+    def _getAccountBalance(self, params):
+        return {'credits': '{0:.2f}'.format(self.credits),
+                'currency': 'USD'}
+
+    def _getAccountMe(self, params):
+        return {'email': 'customer@example.com', 'full_name': 'Fake Customer',
+                'display_name': 'fake', 'language_code': 'en'}
+
+    def _getServiceLanguages(self, params):
+        return LANGUAGES
+
+    def _getServiceLanguagePairs(self, params):
+        pairs = []
+        for src in LANGUAGES:
+            for tgt in LANGUAGES:
+                if src is tgt:
+                    continue
+                for tier, price in sorted(UNIT_PRICES.items()):
+                    if tier == 'machine':
+                        continue
+                    if params.get('lc_src') in (None, src['lc']):
+                        pairs.append({'lc_src': src['lc'],
+                                      'lc_tgt': tgt['lc'], 'tier': tier,
+                                      'unit_price': price,
+                                      'currency': 'USD'})
+        return pairs
+
+    def _postTranslationJobs(self, params):
+        payload = params.get('data') or {}
+        jobs = payload.get('jobs') or {}
+        if not jobs:
+            raise _error(400, 'jobs required')
+        self._validate(jobs)
+        order_id = self._newId()
+        now = self.clock()
+        order = {'order_id': order_id, 'jobs': [], 'total_credits': 0.0,
+                 'total_units': 0, 'thread': []}
+        for key, spec in sorted(jobs.items()):
+            units, credits, eta = self._quote(spec)
+            job_id = self._newId()
+            job = dict(spec)
+            job.update({
+                'job_id': job_id, 'order_id': order_id,
+                'status': 'available', 'ctime': int(now),
+                'unit_count': units, 'credits': credits,
+                'currency': 'USD', 'eta': eta,
+                '_since': now, '_thread': [], '_revisions': [],
+            })
+            self.jobs[job_id] = job
+            order['jobs'].append(job_id)
+            order['total_credits'] += credits
+            order['total_units'] += units
+        if payload.get('comment'):
+            self._comment(order['thread'], {'body': payload['comment']})
+        self.orders[order_id] = order
+        self.credits -= order['total_credits']
+        return {'order_id': order_id, 'job_count': len(order['jobs']),
+                'credits_used': '{0:.2f}'.format(order['total_credits']),
+                'currency': 'USD'}
+
+    def _determineTranslationCost(self, params):
+        payload = params.get('data') or {}
+        jobs = payload.get('jobs') or {}
+        files = params.get('_files', {})
+        self._validate(jobs, files)
+        quotes = {}
+        for key, spec in jobs.items():
+            spec = dict(spec)
+            if spec.get('type') == 'file' and spec.get('file_key') in files:
+                filename, content = files[spec['file_key']]
+                spec['body_src'] = content.decode('utf-8', 'replace')
+            units, credits, eta = self._quote(spec)
+            quotes[key] = {'unit_count': units, 'credits': credits,
+                           'eta': eta, 'currency': 'USD',
+                           'lc_src': spec['lc_src']}
+            if spec.get('type') == 'file':
+                quotes[key]['identifier'] = sha1(
+                    spec['body_src'].encode('utf-8')).hexdigest()
+        return {'jobs': quotes}
+
+    def _getTranslationJobs(self, params):
+        count = min(int(params.get('count', 10)), 200)
+        jobs = [self._refresh(job) for job in self.jobs.values()
+                if not job.get('_archived')]
+        if params.get('status'):
+            jobs = [job for job in jobs if job['status'] == params['status']]
+        if 'timestamp_after' in params:
+            after = int(params['timestamp_after'])
+            jobs = [job for job in jobs if job['ctime'] >= after]
+        # The most recent jobs, newest first, as documented.
+        jobs = sorted(jobs, reverse=True,
+                      key=lambda job: (job['ctime'], int(job['job_id'])))
+        return [{'job_id': job['job_id'], 'ctime': job['ctime']}
+                for job in jobs[:count]]
+
+    def _getTranslationJob(self, params, id):
+        return {'job': self._public(self._job(id))}
+
+    def _getTranslationJobBatch(self, params, id):
+        jobs = []
+        for job_id in id.split(','):
+            if job_id in self.jobs:
+                jobs.append(self._public(self._job(job_id)))
+        return {'jobs': jobs}
+
+    def _updateTranslationJob(self, params, id):
+        job = self._job(id)
+        self._act(job, params.get('data') or {})
+        return {}
+
+    def _updateTranslationJobs(self, params):
+        action = params.get('data') or {}
+        errors = {}
+        for entry in action.get('job_ids') or []:
+            job_id = entry['job_id'] if isinstance(entry, dict) else entry
+            entry = dict(entry) if isinstance(entry, dict) else {}
+            entry['action'] = action.get('action')
+            try:
+                self._act(self._job(job_id), entry)
+            except _ApiError as e:
+                errors[str(job_id)] = [{'code': e.http_status,
+                                        'msg': e.err['msg']}]
+        if errors:
+            raise _ApiError(400, errors)
+        return {}
+
+    def _deleteTranslationJob(self, params, id):
+        job = self._job(id)
+        if job['status'] != 'available':
+            raise _error(400, 'Only available jobs can be cancelled')
+        job['status'] = 'cancelled'
+        return {}
+
+    def _getTranslationJobFeedback(self, params, id):
+        job = self._job(id)
+        return {'feedback': {'rating': job.get('_rating'),
+                             'for_translator': job.get('_feedback')}}
+
+    def _getTranslationJobRevisions(self, params, id):
+        job = self._job(id)
+        return {'job_id': job['job_id'],
+                'revisions': [{'rev_id': rev['rev_id'],
+                               'ctime': rev['ctime']}
+                              for rev in job['_revisions']]}
+
+    def _getTranslationJobRevision(self, params, id, revision_id):
+        for rev in self._job(id)['_revisions']:
+            if rev['rev_id'] == revision_id:
+                return {'revision': {'ctime': rev['ctime'],
+                                     'body_tgt': rev['body_tgt']}}
+        raise _error(404, 'Revision {0} not found'.format(revision_id))
+
+    def _postTranslationJobComment(self, params, id):
+        self._comment(self._job(id)['_thread'], params.get('data'))
+        return {}
+
+    def _getTranslationJobComments(self, params, id):
+        return {'thread': list(self._job(id)['_thread'])}
+
+    def _getTranslationOrderJobs(self, params, id):
+        order = self._order(id)
+        result = {
+            'order_id': order['order_id'],
+            'total_jobs': str(len(order['jobs'])),
+            'total_credits': '{0:.2f}'.format(order['total_credits']),
+            'total_units': str(order['total_units']),
+            'currency': 'USD',
+        }
+        for status in ('queued', 'available', 'pending', 'reviewable',
+                       'approved', 'revising', 'rejected', 'cancelled'):
+            result['jobs_' + status] = [
+                job_id for job_id in order['jobs']
+                if self.jobs[job_id]['status'] == status]
+        return {'order': result}
+
+    def _deleteTranslationOrder(self, params, id):
+        order = self._order(id)
+        jobs = [self.jobs[job_id] for job_id in order['jobs']]
+        if any(job['status'] != 'available' for job in jobs):
+            raise _error(400, 'Only orders with all jobs available can be '
+                              'cancelled')
+        for job in jobs:
+            job['status'] = 'cancelled'
+        return {}
+
+    def _postOrderComment(self, params, id):
+        self._comment(self._order(id)['thread'], params.get('data'))
+        return {}
+
+    def _getOrderComments(self, params, id):
+        return {'thread': list(self._order(id)['thread'])}
+
+
+def _parseForm(body, content_type):
+    if content_type.startswith('multipart/form-data'):
+        return _parseMultipart(body, content_type)
+    return dict((k, v) for k, v in
+                parse_qsl(body.decode('utf-8'), keep_blank_values=True))
+
+
+def _parseMultipart(body, content_type):
+    # The cgi module is gone from newer Pythons; the email package still
+    # parses multipart bodies.
+    import email
+    raw = b'Content-Type: ' + content_type.encode('latin-1') + \
+        b'\r\n\r\n' + body
+    if hasattr(email, 'message_from_bytes'):
+        message = email.message_from_bytes(raw)
+    else:
+        message = email.message_from_string(raw)
+    params = {}
+    files = {}
+    for part in message.get_payload():
+        name = part.get_param('name', header='content-disposition')
+        content = part.get_payload(decode=True)
+        filename = part.get_filename()
+        if filename is None:
+            params[name] = content.decode('utf-8')
+        else:
+            files[name] = (filename, content)
+    params['_files'] = files
+    return params
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+    # See benchmarks/_common.py: without this, Nagle plus delayed ACKs
+    # add ~40ms to keep-alive round trips.
+    disable_nagle_algorithm = True
+
+    def _serve(self):
+        fake = self.server.fake
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        status, result = fake.handle(
+            self.command, self.path, body,
+            self.headers.get('Content-Type') or '')
+        delay = fake.latency + random.uniform(0, fake.jitter)
+        if delay > 0:
+            time.sleep(delay)
+        content = json.dumps(result).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _serve
+
+    def log_message(self, *args):
+        logger.debug(*args)
+
+
+class _ThreadingServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog='python -m gengo.fakeserver',
+        description='Serves a fake Gengo API on localhost.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--public-key', default='pub')
+    parser.add_argument('--private-key', default='priv')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0,
+                        help='up to this many more seconds, at random')
+    parser.add_argument('--auto-advance', type=float, default=None,
+                        help='seconds a job spends in each open status')
+    args = parser.parse_args(argv)
+    fake = FakeGengo(public_key=args.public_key,
+                     private_key=args.private_key, host=args.host,
+                     port=args.port, latency=args.latency,
+                     jitter=args.jitter, auto_advance=args.auto_advance)
+    print('Serving a fake Gengo API at {0}'.format(fake.api_url))
+    try:
+        fake.serve()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
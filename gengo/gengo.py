@@ -35,24 +35,26 @@
 # mockdb is a file with a dictionary of every API endpoint for Gengo.
 from __future__ import absolute_import, print_function
 
-import copy
 import logging
-from hashlib import sha1
+import os
 try:
     from urllib import urlencode, quote
 except ImportError:
     from urllib.parse import urlencode, quote
-import hmac
-import json
-import mimetypes
 from operator import itemgetter
 import re
 import sys
-from time import time
-
-import requests
+import threading
+from time import sleep, time
+try:
+    from time import perf_counter as _clock
+except ImportError:
+    from time import time as _clock
 
+from .codec import getCodec
 from .mockdb import api_urls, apihash
+from .multipart import MultipartEncoder
+from .ratelimit import RateLimiter, RetryPolicy
 from ._version import __version__
 
 """
@@ -60,10 +62,6 @@ Official Python library for interfacing with the Gengo API.
 """
 
 __author__ = 'Gengo <api@gengo.com>'
-logging.basicConfig(format=(
-    "%(asctime)s %(levelname)-5.5s [%(name)s:%(lineno)s][%(threadName)s] "
-    "%(message)s"
-))
 logger = logging.getLogger(__name__)
 
 
@@ -76,7 +74,12 @@ class GengoError(Exception):
     Note: You need to explicitly import them into your code, e.g:
 
     from gengo import GengoError, GengoAuthError
+
+    When the API rejects several jobs at once, `errors` holds the raw
+    per-job error lists keyed by job key.
     """
+    errors = None
+
     def __init__(self, msg, error_code=None):
         self.msg = msg
         self.error_code = error_code
@@ -103,15 +106,44 @@ class GengoAuthError(GengoError):
         return repr(self.msg)
 
 
+class ClientStats(object):
+
+    """
+    Thread-safe counters describing what a client has done, e.g.
+    gengo.stats['retried'] or gengo.stats.snapshot().
+    """
+    def __init__(self):
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def incr(self, name, value=1):
+        with self._lock:
+            self._values[name] = self._values.get(name, 0) + value
+
+    def __getitem__(self, name):
+        return self._values.get(name, 0)
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._values)
+
+
 class Gengo(object):
 
     __supported_api_versions = [2]
 
     def __init__(self, public_key=None, private_key=None, sandbox=False,
-                 api_version=2, headers=None, debug=False, api_url=None):
+                 api_version=2, headers=None, debug=False, api_url=None,
+                 pool_connections=10, pool_maxsize=10, keep_alive=True,
+                 cache=None, rate_limits=None, max_retries=0,
+                 backoff_factor=0.5, backoff_max=30, mirror=None,
+                 json_codec=None):
         """
         Gengo(public_key = None, private_key = None, sandbox = False,
-        headers = None, debug=False, api_url=None)
+        headers = None, debug=False, api_url=None, pool_connections=10,
+        pool_maxsize=10, keep_alive=True, cache=None, rate_limits=None,
+        max_retries=0, backoff_factor=0.5, backoff_max=30, mirror=None,
+        json_codec=None)
 
         Instantiates an instance of Gengo.
 
@@ -128,6 +160,36 @@ class Gengo(object):
         useful debugging info.
         api_url - you can override the API url for calls if needed.
         Version must be either append with '/{version}' or hardcoded ('/v2')
+        pool_connections - number of host connection pools to cache in the
+        underlying HTTP session.
+        pool_maxsize - maximum number of connections kept open per host.
+        Raise this when sharing one instance between many threads.
+        keep_alive - reuse connections between calls. Set to False to send
+        'Connection: close' and do a fresh handshake for every call.
+        cache - a gengo.cache.ResponseCache. Responses of endpoints with a
+        'cache_ttl' in mockdb.apihash are then served from it while fresh.
+        rate_limits - client side rate limits per endpoint class, e.g.
+        {'read': 10, 'write': (2, 5)} for 10 GET calls per second and 2
+        other calls per second with bursts of 5. See gengo/ratelimit.py.
+        max_retries - how often idempotent calls (GET, DELETE) are retried
+        after a connection error, a 429 or a 5xx. Defaults to 0.
+        backoff_factor, backoff_max - exponential backoff with full jitter
+        between retries, in seconds. Retry-After is honoured when sent,
+        up to backoff_max.
+        mirror - a gengo.mirror.JobMirror. Successful job, order and
+        comment responses are then stored in it for local queries.
+        json_codec - JSON backend for payloads and responses: 'orjson',
+        'ujson', 'simdjson', 'json' or a gengo.codec.JSONCodec. Defaults
+        to the fastest one installed; see gengo/codec.py.
+
+        Throttling, retries and request signing are counted in `stats`.
+        For per-call timings, register hooks with addHook().
+
+        A Gengo instance owns a pooled HTTP session; call close() when done
+        with it, or use it as a context manager:
+
+        with Gengo(public_key, private_key) as gengo:
+            gengo.getAccountBalance()
         """
         if api_url is None:
             self.api_url = api_urls['sandbox'] if sandbox is True else \
@@ -149,171 +211,485 @@ class Gengo(object):
                 {'User-agent': 'Gengo Python Library;' +
                     'Version {0}; http://gengo.com/'.format(__version__)}
         self.headers['Accept'] = 'application/json'
+        if not keep_alive:
+            self.headers['Connection'] = 'close'
         self.debug = debug
+        self.cache = cache
+        self.mirror = mirror
+        self.codec = getCodec(json_codec)
+        self.rate_limiter = RateLimiter(rate_limits) if rate_limits else None
+        self.retry = RetryPolicy(max_retries=max_retries,
+                                 backoff_factor=backoff_factor,
+                                 backoff_max=backoff_max)
+        self.stats = ClientStats()
+        self._hooks = {}
+
+        # requests is only imported once the first call needs a session.
+        self._pool = (pool_connections, pool_maxsize)
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._signer = None
+        self._base_key = None
+        self._base_url = None
+
+    @property
+    def session(self):
+        """
+        The pooled HTTP session, created on first use.
+        """
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = self._createSession(*self._pool)
+        return self._session
+
+    @session.setter
+    def session(self, session):
+        self._session = session
+
+    def _createSession(self, pool_connections, pool_maxsize):
+        import requests
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def close(self):
+        """
+        Closes the pooled connections held by this instance.
+        """
+        if self._session is not None:
+            self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def addHook(self, event, fn):
+        """
+        Calls fn(trace) with a gengo.hooks.RequestTrace when a call starts
+        ('before'), succeeds ('after') or raises ('error'). See
+        gengo/hooks.py.
+        """
+        if event not in ('before', 'after', 'error'):
+            raise ValueError("Unknown hook event: {0!r}".format(event))
+        # Replaced rather than modified, so that calls in other threads
+        # never see a half-updated list.
+        hooks = dict(self._hooks)
+        hooks[event] = hooks.get(event, ()) + (fn,)
+        self._hooks = hooks
+
+    def removeHook(self, event, fn):
+        hooks = dict(self._hooks)
+        fns = list(hooks.get(event, ()))
+        fns.remove(fn)
+        if fns:
+            hooks[event] = tuple(fns)
+        else:
+            del hooks[event]
+        self._hooks = hooks
+
+    def _startTrace(self, endpoint):
+        from .hooks import RequestTrace
+        trace = RequestTrace(endpoint)
+        self._fireHooks('before', trace)
+        return trace
+
+    def _finishTrace(self, trace, error=None):
+        trace.finish(error)
+        self._fireHooks('after' if error is None else 'error', trace)
+
+    def _fireHooks(self, event, trace):
+        for fn in self._hooks.get(event, ()):
+            try:
+                fn(trace)
+            except Exception:
+                logger.exception("Gengo %s hook %r failed", event, fn)
+
+    def _ingest(self, api_call, kwargs, results):
+        # The call itself succeeded; a mirror that can't store its
+        # response must not turn it into an error.
+        try:
+            self.mirror.ingest(api_call, kwargs, results)
+        except Exception:
+            logger.exception("Gengo mirror failed to store %s", api_call)
 
     def __getattr__(self, api_call):
         """
-        The most magically awesome block of code you'll ever see.
-
-        Rather than list out 9 million methods for this API, we just
-        keep a table (see above) of every API endpoint and their
-        corresponding function id for this library. This gives flexibility
-        in API support.
-
-        For those who don't get what's going on here, Python classes
-        have a feature known as __getattr__().
-        It's called when an attribute that was called on an object
-        doesn't seem to exist. Since it doesn't exist,
-        we can take over and find the API method in our table. We then
-        return a function that downloads and parses
-        what we're looking for, based on the key/values passed in.
-        """
-        def get(self, **kwargs):
-            # Grab the (hopefully) existing method 'definition' to fire off
-            # from our api hash table.
-            fn = apihash[api_call]
-
-            # don't make any lasting changes to the kwargs dictionary
-            kwargs = copy.deepcopy(kwargs)
-
-            # Do a check here for specific job sets - we need to support
-            # posting multiple jobs
-            # at once, so see if there's an dictionary of jobs passed in,
-            # pop it out, let things go on as normal,
-            # then pick this chain back up below...
-            post_data = {}
-            if 'job' in kwargs:
-                post_data['job'] = {'job': kwargs.pop('job')}
-            if 'jobs' in kwargs:
-                # there are two cases to handle; one where there is
-                # a dictionary passed in with a `jobs` key, the other
-                # where that key is not present.
-                post_data['jobs'] = {'jobs': kwargs.pop('jobs')}
-                jobs_dict = post_data['jobs']['jobs']
-                if 'jobs' in jobs_dict:
-                    post_data['jobs']['jobs'] = jobs_dict['jobs']
-                if 'as_group' in jobs_dict:
-                    post_data['jobs']['as_group'] = jobs_dict.pop('as_group')
-                if 'comment' in jobs_dict:
-                    post_data['jobs']['comment'] = jobs_dict.pop('comment')
-                if 'url_attachments' in jobs_dict:
-                    post_data['jobs']['url_attachments'] =\
-                     jobs_dict.pop('url_attachments')
-                if 'reference_id' in jobs_dict:
-                    post_data['jobs']['reference_id'] =\
-                     jobs_dict.pop('reference_id')
-            if 'comment' in kwargs:
-                post_data['comment'] = kwargs.pop('comment')
-            if 'action' in kwargs:
-                post_data['action'] = kwargs.pop('action')
-            if 'job_ids' in kwargs:
-                post_data['job_ids'] = kwargs.pop('job_ids')
-            if 'file_attachments' in kwargs:
-                post_data['file_attachments'] = kwargs.pop('file_attachments')
-
-            # Set up a true base URL, abstracting away the need to care
-            # about the sandbox mode or API versioning at this stage.
-            base_url = self.api_url.format(
-                version='v{0}'.format(self.api_version)
-            )
-
-            # Go through and replace any mustaches that are in our API url
-            # with their appropriate key/value pairs...
-            # NOTE: We pop() here because we don't want the extra data
-            # included and messing up our hash down the road.
-            base = re.sub(
-                r'\{\{(?P<m>[a-zA-Z_]+)\}\}',
-                lambda m: '{0}'.format(kwargs.pop(m.group(1),
-                                                  # In case of debugging needs
-                                                  'no_argument_specified')),
-                base_url + fn['url']
-            )
-
-            # Build up a proper 'authenticated' url...
-            #
-            # Note: for further information on what's going on here, it's
-            # best to familiarize yourself  with the Gengo authentication
-            # API. (http://developers.gengo.com/)
-            query_params = dict([k, quote(str(v).encode('utf-8'))] for k, v
-                                in kwargs.items())
-            if self.public_key is not None:
-                query_params['api_key'] = self.public_key
-            query_params['ts'] = str(int(time()))
+        Every endpoint in mockdb.apihash is compiled into a real method on
+        this class at import time (see _compileEndpoints below). This hook
+        only catches endpoints added to apihash afterwards: they get
+        compiled on first access and cached on the class the same way.
+        """
+        if api_call.startswith('__') or api_call not in apihash:
+            raise AttributeError(api_call)
+        _compileEndpoint(type(self), api_call)
+        return getattr(self, api_call)
+
+    def postTranslationJobsBulk(self, jobs, max_jobs=50, max_bytes=1000000,
+                                max_workers=4):
+        """
+        Submits a large order as several postTranslationJobs calls.
 
-            # check whether the endpoint supports file uploads and check the
-            # params for file_path and modify the query_params accordingly
-            # needs to be refactored to a more general handling once we
-            # also want to support ie glossary upload. for now it's tied to
-            # jobs payloads
-            file_data = False
-            if 'upload' in fn:
-                file_data = {}
-                jobs = post_data.get('jobs', {}).get('jobs', {})
-                for k, j in jobs.items():
-                    if isinstance(j, dict):
-                        if j.get('type') == 'file' and 'file_path' in j:
-                            file_path = j.get('file_path')
-                            mimetype = j.get('mimetype')
-
-                            mimetype = mimetype if mimetype else \
-                                mimetypes.guess_type(file_path)[0]
-                            mimetype = mimetype if mimetype else \
-                                'application/octet-stream'
-
-                            file_data['file_' + k] = (
-                                file_path, open(file_path, 'rb'), mimetype
-                            )
-                            j['file_key'] = 'file_' + k
-                            del j['file_path']
-
-            # handle order url attachments
-            order = post_data.get('jobs', {})
-            self.replaceURLAttachmentsWithAttachments(order)
+        jobs - the same structure postTranslationJobs takes as `jobs`.
+        max_jobs - maximum number of jobs per request.
+        max_bytes - maximum JSON-encoded size of the jobs in one request.
+        max_workers - number of batches submitted concurrently. Keep it at
+        or below pool_maxsize.
+
+        See gengo.bulk.postTranslationJobsBulk for the result format.
+        """
+        from .bulk import postTranslationJobsBulk
+        return postTranslationJobsBulk(self, jobs, max_jobs=max_jobs,
+                                       max_bytes=max_bytes,
+                                       max_workers=max_workers)
+
+    def updateTranslationJobsBulk(self, action, max_jobs=100,
+                                  max_bytes=1000000, max_workers=4,
+                                  max_retries=2, backoff_factor=0.5):
+        """
+        Applies an updateTranslationJobs action to many jobs as several
+        calls.
+
+        action - the same structure updateTranslationJobs takes as
+        `action`, e.g. {'action': 'approve', 'job_ids': [...]}.
+        max_jobs - maximum number of job IDs per request.
+        max_bytes - maximum JSON-encoded size of the job IDs in one
+        request.
+        max_workers - number of batches sent concurrently. Keep it at or
+        below pool_maxsize.
+        max_retries, backoff_factor - how often and after how long a
+        batch that failed temporarily is sent again.
+
+        See gengo.bulk.updateTranslationJobsBulk for the result format.
+        """
+        from .bulk import updateTranslationJobsBulk
+        return updateTranslationJobsBulk(
+            self, action, max_jobs=max_jobs, max_bytes=max_bytes,
+            max_workers=max_workers, max_retries=max_retries,
+            backoff_factor=backoff_factor)
+
+    def iterTranslationJobs(self, timestamp_after=0, count=200, **params):
+        """
+        Lazily yields the jobs created since `timestamp_after`. Raises
+        gengo.paging.IncompleteListingError when there are more than
+        `count` of them, see gengo.paging.
+
+        timestamp_after - only jobs created at or after this time.
+        count - jobs per request (at most 200).
+        params - further getTranslationJobs filters, e.g. status.
+        """
+        from .paging import iterTranslationJobs
+        return iterTranslationJobs(self, timestamp_after, count=count,
+                                   **params)
+
+    def iterTranslationJobComments(self, id):
+        """
+        Lazily yields the entries of a job's comment thread.
+        """
+        from .paging import iterTranslationJobComments
+        return iterTranslationJobComments(self, id)
+
+    def iterOrderComments(self, id):
+        """
+        Lazily yields the entries of an order's comment thread.
+        """
+        from .paging import iterOrderComments
+        return iterOrderComments(self, id)
+
+    def streamTranslationJobs(self, **params):
+        """
+        Like getTranslationJobs, but yields the listed jobs while the
+        response is still being received instead of returning it whole.
+        """
+        from .streaming import streamTranslationJobs
+        return streamTranslationJobs(self, **params)
+
+    def streamTranslationJobBatch(self, id):
+        """
+        Like getTranslationJobBatch, but yields the jobs one by one as
+        they are parsed.
+        """
+        from .streaming import streamTranslationJobBatch
+        return streamTranslationJobBatch(self, id)
+
+    def streamTranslationOrderJobs(self, id):
+        """
+        Yields {'job_id', 'status'} for every job listed in a
+        getTranslationOrderJobs response, as it is parsed.
+        """
+        from .streaming import streamTranslationOrderJobs
+        return streamTranslationOrderJobs(self, id)
+
+    def _baseURL(self):
+        """
+        Returns the API url with the version filled in, abstracting away
+        the need to care about the sandbox mode or API versioning.
+        Recomputed only when api_url or api_version change.
+        """
+        key = (self.api_url, self.api_version)
+        if self._base_key != key:
+            self._base_url = self.api_url.format(
+                version='v{0}'.format(self.api_version))
+            self._base_key = key
+        return self._base_url
+
+    def _prepareRequest(self, endpoint, kwargs):
+        """
+        Turns the keyword arguments of an API call into the pieces that
+        signAndRequestAPILatest needs: (fn, base, query_params, post_data,
+        file_data).
+        """
+        fn = endpoint.fn
+
+        # Don't make any lasting changes to the caller's arguments. Rather
+        # than deep-copying the whole payload (which can be thousands of
+        # jobs), only the containers modified below get shallow copies.
+        kwargs = dict(kwargs)
+
+        # Do a check here for specific job sets - we need to support
+        # posting multiple jobs
+        # at once, so see if there's an dictionary of jobs passed in,
+        # pop it out, let things go on as normal,
+        # then pick this chain back up below...
+        post_data = {}
+        if 'job' in kwargs:
+            post_data['job'] = {'job': kwargs.pop('job')}
+        if 'jobs' in kwargs:
+            # there are two cases to handle; one where there is
+            # a dictionary passed in with a `jobs` key, the other
+            # where that key is not present.
+            jobs_dict = dict(kwargs.pop('jobs'))
+            post_data['jobs'] = {'jobs': jobs_dict}
+            if 'jobs' in jobs_dict:
+                post_data['jobs']['jobs'] = jobs_dict['jobs']
+            if 'as_group' in jobs_dict:
+                post_data['jobs']['as_group'] = jobs_dict.pop('as_group')
+            if 'comment' in jobs_dict:
+                post_data['jobs']['comment'] = jobs_dict.pop('comment')
+            if 'url_attachments' in jobs_dict:
+                post_data['jobs']['url_attachments'] =\
+                 jobs_dict.pop('url_attachments')
+            if 'reference_id' in jobs_dict:
+                post_data['jobs']['reference_id'] =\
+                 jobs_dict.pop('reference_id')
+        if 'comment' in kwargs:
+            post_data['comment'] = kwargs.pop('comment')
+            if isinstance(post_data['comment'], dict) and \
+                    'url_attachments' in post_data['comment']:
+                post_data['comment'] = dict(post_data['comment'])
+        if 'action' in kwargs:
+            post_data['action'] = kwargs.pop('action')
+        if 'job_ids' in kwargs:
+            post_data['job_ids'] = kwargs.pop('job_ids')
+        if 'file_attachments' in kwargs:
+            post_data['file_attachments'] = kwargs.pop('file_attachments')
+
+        base = self._baseURL() + endpoint.path(kwargs)
+
+        # Build up a proper 'authenticated' url...
+        #
+        # Note: for further information on what's going on here, it's
+        # best to familiarize yourself  with the Gengo authentication
+        # API. (http://developers.gengo.com/)
+        query_params = dict([k, quote(str(v).encode('utf-8'))] for k, v
+                            in kwargs.items())
+        if self.public_key is not None:
+            query_params['api_key'] = self.public_key
+        query_params['ts'] = str(int(time()))
+
+        # check whether the endpoint supports file uploads and check the
+        # params for file_path and modify the query_params accordingly
+        # needs to be refactored to a more general handling once we
+        # also want to support ie glossary upload. for now it's tied to
+        # jobs payloads
+        upload = 'upload' in fn
+        file_data = [] if upload else False
+
+        # Jobs are copied on write: a job gets its own dict only when its
+        # file_path or url_attachments need rewriting, and the container
+        # holding the jobs is copied once if any job was.
+        jobs = post_data.get('jobs', {}).get('jobs', {})
+        rewritten = None
+        for k, j in jobs.items():
+            if not isinstance(j, dict):
+                continue
+            is_upload = upload and j.get('type') == 'file' and \
+                'file_path' in j
+            if not is_upload and 'url_attachments' not in j:
+                continue
+
+            j = dict(j)
+            if is_upload:
+                file_path = j.pop('file_path')
+                mimetype = j.get('mimetype')
+                if not mimetype:
+                    import mimetypes
+                    mimetype = mimetypes.guess_type(file_path)[0]
+                mimetype = mimetype if mimetype else \
+                    'application/octet-stream'
+
+                # Files are only opened while their part of the request
+                # body is being streamed; see gengo.multipart.
+                file_data.append(('file_' + k, file_path,
+                                  ('path', file_path), mimetype))
+                j['file_key'] = 'file_' + k
 
             # handle post jobs url attachments
-            jobs = post_data.get('jobs', {}).get('jobs', {})
-            for k, j in jobs.items():
-                if isinstance(j, dict):
-                    self.replaceURLAttachmentsWithAttachments(j)
+            self.replaceURLAttachmentsWithAttachments(j)
+
+            if rewritten is None:
+                rewritten = dict(jobs)
+            rewritten[k] = j
+        if rewritten is not None:
+            post_data['jobs']['jobs'] = rewritten
 
-            # handle post comment url attachments
-            comments = post_data.get('comment', {})
-            self.replaceURLAttachmentsWithAttachments(comments)
+        # handle order url attachments
+        order = post_data.get('jobs', {})
+        self.replaceURLAttachmentsWithAttachments(order)
 
+        # handle post comment url attachments
+        comments = post_data.get('comment', {})
+        self.replaceURLAttachmentsWithAttachments(comments)
+
+        # If any file_attachments then send the comment body and the
+        # attachments as multipart.
+        if 'file_attachments' in post_data:
+            file_data = self._attachmentFileData(post_data)
+
+        return fn, base, query_params, post_data, file_data
+
+    def _call(self, endpoint, kwargs, trace=None):
+        if self._hooks and trace is None:
+            trace = self._startTrace(endpoint)
             try:
-                # If any file_attachments then modify base url to include
-                # private_key and file_data to include file_attachments as
-                # multipart.
-                tmp_files = []
-                if 'file_attachments' in post_data:
-                    file_data = [
-                        ('body', post_data['comment']['body']),
-                    ]
-
-                    file_attachments = post_data['file_attachments']
-                    for a in file_attachments:
-                        f = open(a, 'rb')
-                        tmp_files.append(f)
-                        file_data.append(('file_attachments', f))
-
-                # If any further APIs require their own special signing needs,
-                # fork here...
-                response = self.signAndRequestAPILatest(fn, base, query_params,
-                                                        post_data, file_data)
-                response.connection.close()
+                results = self._call(endpoint, kwargs, trace)
+            except Exception as e:
+                self._finishTrace(trace, e)
+                raise
+            self._finishTrace(trace)
+            return results
+
+        cache_key, ttl, cached = self._cacheLookup(endpoint, kwargs)
+        if cached is not None:
+            if trace is not None:
+                trace.cached = True
+            return cached
+
+        response = self._request(endpoint, kwargs, trace=trace)
+        if trace is None:
+            results = self._handleResponse(response)
+        else:
+            start = _clock()
+            try:
+                results = self._handleResponse(response)
             finally:
-                for f in tmp_files:
-                    f.close()
+                trace.phases['decode'] += _clock() - start
+        if cache_key is not None:
+            self.cache.set(cache_key, results, ttl)
+        if self.mirror is not None:
+            self._ingest(endpoint.name, kwargs, results)
+        return results
 
-            return self._handleResponse(response)
+    def _request(self, endpoint, kwargs, stream=False, trace=None):
+        """
+        Sends a call, throttled and retried as configured, and returns
+        the HTTP response. With stream=True the body is left unread.
+        Timings and sizes are recorded in `trace` when given.
+        """
+        import requests
+        if trace is not None:
+            start = _clock()
+        fn, base, query_params, post_data, file_data = \
+            self._prepareRequest(endpoint, kwargs)
+        if trace is not None:
+            trace.phases['build'] += _clock() - start
+
+        attempt = 0
+        while True:
+            self._throttle(endpoint, sleep)
+            try:
+                # If any further APIs require their own special signing
+                # needs, fork here...
+                response = self.signAndRequestAPILatest(
+                    fn, base, query_params, post_data, file_data,
+                    stream=stream, trace=trace)
+                error = None
+            except requests.RequestException as e:
+                response, error = None, e
+            if trace is not None:
+                trace.received(response, stream)
+                trace.retries = attempt
+
+            delay = self._retryDelay(endpoint, attempt, response, error)
+            if delay is None:
+                if error is not None:
+                    raise error
+                return response
+            if stream and response is not None:
+                response.close()
+            attempt += 1
+            sleep(delay)
+            # Retries are signed again with a fresh timestamp.
+            query_params['ts'] = str(int(time()))
 
-        if api_call in apihash:
-            return get.__get__(self)
-        else:
-            raise AttributeError
+    def _throttle(self, endpoint, sleep):
+        """
+        Waits for the endpoint's rate limit, if any, using `sleep`.
+        """
+        if self.rate_limiter is None:
+            return
+        wait = self.rate_limiter.reserve(endpoint)
+        if wait > 0:
+            self.stats.incr('throttled')
+            self.stats.incr('throttled_seconds', wait)
+            return sleep(wait)
+
+    def _retryDelay(self, endpoint, attempt, response=None, error=None):
+        """
+        Returns how long to wait before retrying a call, or None when it
+        is done (successfully or not).
+        """
+        delay = self.retry.delay(endpoint.method, attempt, response, error)
+        if delay is not None:
+            self.stats.incr('retried')
+            logger.debug("Retrying %s in %.2fs (attempt %d)",
+                         endpoint.name, delay, attempt + 1)
+        return delay
+
+    def _cacheLookup(self, endpoint, kwargs):
+        """
+        Returns (cache_key, ttl, cached results) for a call; cache_key is
+        None when the call is not cacheable.
+        """
+        if self.cache is None:
+            return None, None, None
+        ttl = self.cache.ttlFor(endpoint)
+        if not ttl or endpoint.method != 'GET':
+            return None, None, None
+        cache_key = self.cache.key(self, endpoint, kwargs)
+        return cache_key, ttl, self.cache.get(cache_key)
+
+    def _attachmentFileData(self, post_data):
+        """
+        Returns the multipart parts (see gengo.multipart) for a comment
+        with file attachments. Nothing is opened here.
+        """
+        body = post_data['comment']['body']
+        if not isinstance(body, bytes):
+            body = body.encode('utf-8')
+        file_data = [('body', 'body', ('data', body), None)]
+        for path in post_data['file_attachments']:
+            file_data.append(('file_attachments', os.path.basename(path),
+                              ('path', path), None))
+        return file_data
 
     def signAndRequestAPILatest(self, fn, base, query_params, post_data={},
-                                file_data=False):
+                                file_data=False, stream=False, trace=None):
         """
         This method signs the request with just the timestamp and
         private key, which is what api v1.1 and 2 rely on.
@@ -323,63 +699,91 @@ class Gengo(object):
         query_params - Dictionary of data eventually getting sent over
         to Gengo.
         post_data - Any extra special post data to get sent over.
+        stream - leave the response body unread (GET only).
+        trace - a gengo.hooks.RequestTrace to record signing and encoding
+        time and the request size in.
         """
+        if trace is not None:
+            start, signed = _clock(), trace.phases['sign']
         # Encoding jobs becomes a bit different than any other method call,
         # so we catch them and do a little
         # JSON-dumping action. Catching them also allows us to provide some
         # sense of portability between the various
         # job-posting methods in that they can all safely rely on passing
         # dictionaries around. Huzzah!
-        req_method = requests.__getattribute__(fn['method'].lower())
         if fn['method'] == 'POST' or fn['method'] == 'PUT':
             if 'job' in post_data:
-                query_params['data'] = json.dumps(post_data['job'],
-                                                  separators=(',', ':'))
+                query_params['data'] = self.codec.dumps(post_data['job'])
             elif 'jobs' in post_data:
-                query_params['data'] = json.dumps(post_data['jobs'],
-                                                  separators=(',', ':'))
+                query_params['data'] = self.codec.dumps(post_data['jobs'])
             elif 'comment' in post_data:
-                query_params['data'] = json.dumps(post_data['comment'],
-                                                  separators=(',', ':'))
+                query_params['data'] = self.codec.dumps(post_data['comment'])
             elif 'action' in post_data:
-                query_params['data'] = json.dumps(post_data['action'],
-                                                  separators=(',', ':'))
+                query_params['data'] = self.codec.dumps(post_data['action'])
 
-            query_hmac = hmac.new(self.private_key,
-                                  Gengo.compatibletext(query_params['ts']),
-                                  sha1)
-            query_params['api_sig'] = query_hmac.hexdigest()
+            query_params['api_sig'] = self._sign(query_params['ts'], trace)
 
             if self.debug is True:
                 print(query_params)
 
+            url = base
             if not file_data:
-                return req_method(base,
-                                  headers=self.headers,
-                                  data=query_params)
+                send = {'headers': self.headers, 'data': query_params}
             else:
-                return req_method(base,
-                                  headers=self.headers,
-                                  files=file_data,
-                                  data=query_params)
+                # The body is streamed with a known length, so neither the
+                # files nor the whole request are ever held in memory.
+                encoder = MultipartEncoder(query_params, file_data)
+                headers = dict(self.headers)
+                headers['Content-Type'] = encoder.content_type
+                send = {'headers': headers, 'data': encoder}
         else:
             query_string = urlencode(sorted(query_params.items(),
                                             key=itemgetter(0)))
             if self.private_key is not None:
-                query_hmac = hmac.new(self.private_key,
-                                      Gengo.compatibletext(query_params['ts']),
-                                      sha1)
-                query_params['api_sig'] = query_hmac.hexdigest()
+                query_params['api_sig'] = self._sign(query_params['ts'],
+                                                     trace)
                 query_string = urlencode(query_params)
 
             if self.debug is True:
                 print(base + '?{0}'.format(query_string))
 
-            return req_method(base + '?{0}'.format(query_string),
-                              headers=self.headers,
-                              # Don't know why but requests is trying to verify
-                              # SSL here ...
-                              verify=False)
+            url = base + '?{0}'.format(query_string)
+            # Don't know why but requests is trying to verify SSL here ...
+            send = {'headers': self.headers, 'verify': False}
+            if stream:
+                send['stream'] = True
+
+        if trace is not None:
+            trace.sending(start, signed, send.get('data'))
+        return self._send(fn['method'], url, **send)
+
+    def _sign(self, ts, trace=None):
+        """
+        Returns the signature for a request timestamp, timing it in
+        stats['signing_seconds'] (and in `trace`, when given).
+        """
+        start = _clock()
+        if self._signer is None or \
+                self._signer.private_key is not self.private_key:
+            from .signing import Signer
+            self._signer = Signer(self.private_key, self.stats)
+        signature = self._signer.sign(ts)
+        elapsed = _clock() - start
+        self.stats.incr('signing_seconds', elapsed)
+        if trace is not None:
+            trace.phases['sign'] += elapsed
+        return signature
+
+    def _send(self, method, url, **kwargs):
+        """
+        Hands a signed request to the HTTP session.
+        """
+        try:
+            return getattr(self.session, method.lower())(url, **kwargs)
+        finally:
+            data = kwargs.get('data')
+            if isinstance(data, MultipartEncoder):
+                data.close()
 
     def replaceURLAttachmentsWithAttachments(self, obj):
         """
@@ -413,7 +817,9 @@ class Gengo(object):
                 )
 
         error_code = error_codes[0] if error_codes else None
-        raise GengoError(' '.join(messages), error_code)
+        error = GengoError(' '.join(messages), error_code)
+        error.errors = results['err']
+        raise error
 
     def _raiseForSingleErrorResponse(self, results, http_code):
 
@@ -435,7 +841,11 @@ class Gengo(object):
         """Return response json as dict.
         """
         try:
-            results = response.json()
+            content = getattr(response, 'content', None)
+            if isinstance(content, bytes):
+                results = self.codec.loads(content)
+            else:
+                results = response.json()
         except ValueError:
             msg = "Internal Server Error"
             if self.debug:
@@ -470,3 +880,66 @@ class Gengo(object):
         except Exception:
             pass
         return text
+
+
+class _Endpoint(object):
+
+    """
+    An apihash entry with its URL template parsed once up front.
+
+    `parts` alternates literal URL pieces and mustache names, e.g.
+    '/translate/job/{{id}}/revision/{{revision_id}}' becomes
+    ['/translate/job/', 'id', '/revision/', 'revision_id', ''].
+    """
+    __slots__ = ('name', 'fn', 'method', 'parts')
+
+    _mustache = re.compile(r'\{\{([a-zA-Z_]+)\}\}')
+
+    def __init__(self, name, fn):
+        self.name = name
+        self.fn = fn
+        self.method = fn['method']
+        self.parts = self._mustache.split(fn['url'])
+
+    def path(self, kwargs):
+        """
+        Fills in the mustaches from kwargs.
+
+        NOTE: We pop() here because we don't want the extra data included
+        and messing up our hash down the road.
+        """
+        parts = self.parts
+        if len(parts) == 1:
+            return parts[0]
+        url = []
+        for i, part in enumerate(parts):
+            if i % 2:
+                # In case of debugging needs
+                part = '{0}'.format(kwargs.pop(part, 'no_argument_specified'))
+            url.append(part)
+        return ''.join(url)
+
+
+def _compileEndpoint(cls, api_call):
+    endpoint = _Endpoint(api_call, apihash[api_call])
+
+    def call(self, **kwargs):
+        return self._call(endpoint, kwargs)
+
+    call.__name__ = str(api_call)
+    call.endpoint = endpoint
+    call.__doc__ = '{0} {1}'.format(endpoint.method, endpoint.fn['url'])
+    setattr(cls, api_call, call)
+
+
+def _compileEndpoints():
+    """
+    Rather than list out 9 million methods for this API, we just keep a
+    table (see mockdb.py) of every API endpoint and their corresponding
+    function id for this library, and turn each entry into a method here.
+    """
+    for api_call in apihash:
+        _compileEndpoint(Gengo, api_call)
+
+
+_compileEndpoints()
@@ -0,0 +1,151 @@
+# All code provided from the http://gengo.com site, such as API example code
+# and libraries, is provided under the New BSD license unless otherwise
+# noted. Details are below.
+#
+# New BSD License
+# Copyright (c) 2009-2020, Gengo, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# Neither the name of Gengo, Inc. nor the names of its contributors may
+# be used to endorse or promote products derived from this software
+# without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+# IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+# PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Request lifecycle hooks, for tracing and metrics:
+
+    def after(trace):
+        print(trace.endpoint, trace.status, trace.elapsed, trace.phases)
+
+    gengo.addHook('after', after)
+
+'before' hooks run when a call starts, 'after' hooks once it succeeded and
+'error' hooks when it raised; all of them get the call's RequestTrace. An
+exception in a hook is logged and does not affect the call.
+
+Without hooks, calls take the usual path and no trace is built.
+"""
+from __future__ import absolute_import
+
+from time import time
+try:
+    from time import perf_counter as _clock
+except ImportError:
+    from time import time as _clock
+try:
+    from urllib import urlencode
+except ImportError:
+    from urllib.parse import urlencode
+
+from .multipart import MultipartEncoder
+
+EVENTS = ('before', 'after', 'error')
+
+PHASES = ('build', 'sign', 'encode', 'network', 'decode')
+
+
+class RequestTrace(object):
+
+    """
+    Describes one API call:
+
+    endpoint - the endpoint name from mockdb.apihash, e.g.
+    'getTranslationJob'.
+    method, url - the HTTP method and URL template, e.g.
+    '/translate/job/{{id}}'.
+    request_bytes - size of the request body (0 for GET and DELETE).
+    response_bytes - size of the response body; None while unknown.
+    status - HTTP status of the last response; None while unknown.
+    retries - how often the request was sent again.
+    cached - True when the response came from the client's cache.
+    phases - seconds spent building the payload ('build'), signing
+    ('sign'), encoding it ('encode'), waiting for the server ('network')
+    and decoding and checking the response ('decode'), summed over
+    retries.
+    started - time.time() at the start of the call.
+    elapsed - seconds the call took, known in 'after' and 'error' hooks.
+    This also covers rate limit waits and retry backoff.
+    error - the exception the call raised, in 'error' hooks.
+    context - a dict for hooks to keep their own state in, e.g. a span.
+    """
+    def __init__(self, endpoint):
+        self.endpoint = endpoint.name
+        self.method = endpoint.method
+        self.url = endpoint.fn['url']
+        self.request_bytes = 0
+        self.response_bytes = None
+        self.status = None
+        self.retries = 0
+        self.cached = False
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.started = time()
+        self.elapsed = None
+        self.error = None
+        self.context = {}
+        self._start = _clock()
+        self._sent = None
+
+    def sending(self, start, signed, data):
+        """
+        Called right before a request goes out. `start` is when encoding
+        began and `signed` the 'sign' total at that point, so that signing
+        is not counted as encoding.
+        """
+        now = _clock()
+        self.phases['encode'] += \
+            now - start - (self.phases['sign'] - signed)
+        if isinstance(data, MultipartEncoder):
+            self.request_bytes = len(data)
+        elif data:
+            self.request_bytes = len(urlencode(data))
+        else:
+            self.request_bytes = 0
+        self._sent = now
+
+    def received(self, response, stream=False):
+        """
+        Called once a request returned, or failed with `response` None.
+        A streamed body is left unread; its size is taken from the
+        Content-Length header.
+        """
+        if self._sent is not None:
+            self.phases['network'] += _clock() - self._sent
+            self._sent = None
+        if response is None:
+            return
+        self.status = response.status_code
+        if stream:
+            length = response.headers.get('Content-Length')
+            self.response_bytes = int(length) if length else None
+        else:
+            content = getattr(response, 'content', None)
+            if isinstance(content, bytes):
+                self.response_bytes = len(content)
+
+    def finish(self, error=None):
+        self.elapsed = _clock() - self._start
+        self.error = error
+
+    def __repr__(self):
+        return '<RequestTrace {0} {1} status={2} elapsed={3}>'.format(
+            self.method, self.endpoint, self.status, self.elapsed)
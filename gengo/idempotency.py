@@ -0,0 +1,318 @@
+# All code provided from the http://gengo.com site, such as API example code
+# and libraries, is provided under the New BSD license unless otherwise
+# noted. Details are below.
+#
+# New BSD License
+# Copyright (c) 2009-2020, Gengo, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# Neither the name of Gengo, Inc. nor the names of its contributors may
+# be used to endorse or promote products derived from this software
+# without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+# IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+# PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Safe retries for calls that create things: postTranslationJobs and
+postOrderComment.
+
+When such a call times out the client cannot tell whether Gengo acted on
+it. SafeSubmitter records a deterministic key for every job (and comment)
+in a local ledger before sending it. When an earlier attempt ended
+ambiguously, it first looks for those keys on the server and only sends
+what is really missing:
+
+    ledger = IdempotencyLedger('/var/lib/myapp/gengo-ledger.sqlite')
+    submitter = SafeSubmitter(gengo, ledger)
+    try:
+        submitter.postTranslationJobs(jobs)
+    except requests.Timeout:
+        submitter.postTranslationJobs(jobs)   # safe: reconciles first
+
+Job keys travel in each job's `custom_data`. Jobs without custom_data get
+the derived key; when a job already carries custom_data, that value is
+used as its key and must be unique.
+
+Gengo creates the jobs of an accepted order asynchronously, so a retry
+issued right after a timeout may not see them yet; wait a little before
+retrying when the order was large.
+"""
+from __future__ import absolute_import
+
+from hashlib import sha1
+import json
+import sqlite3
+import threading
+from time import time
+
+import requests
+
+from .bulk import splitOrder
+from .gengo import GengoError
+from .paging import IncompleteListingError, JobPager
+
+PENDING = 'pending'
+SUBMITTED = 'submitted'
+
+# Seconds of clock skew tolerated when looking for jobs created by an
+# earlier attempt.
+CLOCK_SLACK = 300
+
+
+def jobKey(job, namespace=''):
+    """
+    Deterministic key for a job: a digest of its canonical JSON encoding,
+    so the same job built twice gets the same key.
+    """
+    if job.get('custom_data'):
+        return str(job['custom_data'])
+    payload = json.dumps(job, sort_keys=True, separators=(',', ':'))
+    digest = sha1((namespace + payload).encode('utf-8')).hexdigest()
+    return 'idem-' + digest[:32]
+
+
+def isAmbiguous(error):
+    """
+    True for failures after which the request may or may not have been
+    acted upon: transport errors, server side (5xx) errors and responses
+    that aren't JSON (code 1), such as a gateway's error page.
+    """
+    if isinstance(error, requests.RequestException):
+        return True
+    if isinstance(error, GengoError):
+        code = error.error_code
+        return code in (None, 1) or \
+            (isinstance(code, int) and 500 <= code < 600)
+    return False
+
+
+class IdempotencyLedger(object):
+
+    """
+    Keys this client has sent, stored in SQLite so that the ledger
+    survives restarts and stays cheap with millions of entries.
+    """
+    def __init__(self, path=':memory:'):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS idempotency ('
+            ' key TEXT PRIMARY KEY, state TEXT NOT NULL, ref TEXT,'
+            ' ts REAL NOT NULL)')
+        self._db.commit()
+
+    def get(self, key):
+        """
+        Returns (state, ref, ts) for a key, or None.
+        """
+        with self._lock:
+            return self._db.execute(
+                'SELECT state, ref, ts FROM idempotency WHERE key = ?',
+                (key,)).fetchone()
+
+    def states(self, keys):
+        """
+        Returns {key: (state, ref, ts)} for the known keys among `keys`.
+        """
+        found = {}
+        keys = list(keys)
+        with self._lock:
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                rows = self._db.execute(
+                    'SELECT key, state, ref, ts FROM idempotency WHERE key '
+                    'IN ({0})'.format(','.join('?' * len(chunk))), chunk)
+                for key, state, ref, ts in rows:
+                    found[key] = (state, ref, ts)
+        return found
+
+    def begin(self, keys, ts=None):
+        self._write(keys, PENDING, None, ts or time())
+
+    def commit(self, keys, ref=None):
+        self._write(keys, SUBMITTED, ref, time())
+
+    def discard(self, keys):
+        with self._lock:
+            self._db.executemany('DELETE FROM idempotency WHERE key = ?',
+                                 [(key,) for key in keys])
+            self._db.commit()
+
+    def _write(self, keys, state, ref, ts):
+        ref = None if ref is None else str(ref)
+        with self._lock:
+            self._db.executemany(
+                'INSERT OR REPLACE INTO idempotency (key, state, ref, ts) '
+                'VALUES (?, ?, ?, ?)',
+                [(key, state, ref, ts) for key in keys])
+            self._db.commit()
+
+
+class SafeSubmitter(object):
+
+    def __init__(self, gengo, ledger=None, namespace='', batch_size=50):
+        """
+        gengo - the client used to submit and reconcile.
+        ledger - an IdempotencyLedger; in-memory by default.
+        namespace - mixed into derived keys, e.g. a tenant or order name,
+        so identical jobs in unrelated orders are kept apart.
+        batch_size - job IDs per getTranslationJobBatch while reconciling.
+        """
+        self.gengo = gengo
+        self.ledger = ledger or IdempotencyLedger()
+        self.namespace = namespace
+        self.batch_size = batch_size
+
+    def postTranslationJobs(self, jobs):
+        """
+        Submits `jobs` (the postTranslationJobs `jobs` argument) unless
+        they were submitted before. Returns:
+
+        {
+            'response': postTranslationJobs response, or None when nothing
+            was left to send,
+            'skipped': {job_key: order or job id}  # sent earlier
+        }
+
+        Raises gengo.paging.IncompleteListingError, sending nothing, when
+        an earlier attempt ended ambiguously and its jobs can't be told
+        apart from the rest of a full getTranslationJobs listing.
+        """
+        jobs, options = splitOrder(jobs)
+        stamped = {}
+        keys = {}
+        for job_key, job in jobs.items():
+            key = jobKey(job, self.namespace)
+            if not job.get('custom_data'):
+                job = dict(job, custom_data=key)
+            stamped[job_key] = job
+            keys[job_key] = key
+
+        states = self.ledger.states(keys.values())
+        pending = [key for key, state in states.items()
+                   if state[0] == PENDING]
+        if pending:
+            since = min(states[key][2] for key in pending)
+            self._reconcileJobs(pending, since)
+            states = self.ledger.states(keys.values())
+
+        skipped = {}
+        for job_key, key in keys.items():
+            if key in states and states[key][0] == SUBMITTED:
+                skipped[job_key] = states[key][1]
+                del stamped[job_key]
+        if not stamped:
+            return {'response': None, 'skipped': skipped}
+
+        sending = [keys[job_key] for job_key in stamped]
+        order = dict(options)
+        order['jobs'] = stamped
+        response = self._send(sending, self.gengo.postTranslationJobs,
+                              jobs=order)
+        self.ledger.commit(sending, (response.get('response') or {})
+                           .get('order_id'))
+        return {'response': response, 'skipped': skipped}
+
+    def postOrderComment(self, id, comment):
+        """
+        Posts `comment` on order `id` unless an earlier attempt already
+        did. Returns the API response, or None when it was skipped.
+        """
+        body = comment['body'] if isinstance(comment, dict) else comment
+        key = 'comment-' + sha1(u'{0}\n{1}'.format(id, body)
+                                .encode('utf-8')).hexdigest()[:32]
+        state = self.ledger.get(key)
+        if state is not None and state[0] == PENDING:
+            thread = (self.gengo.getOrderComments(id=id).get('response')
+                      or {}).get('thread') or []
+            for entry in thread:
+                if entry.get('body') == body and \
+                        float(entry.get('ctime') or 0) >= \
+                        state[2] - CLOCK_SLACK:
+                    self.ledger.commit([key], id)
+                    state = self.ledger.get(key)
+                    break
+        if state is not None and state[0] == SUBMITTED:
+            return None
+
+        response = self._send([key], self.gengo.postOrderComment, id=id,
+                              comment=comment)
+        self.ledger.commit([key], id)
+        return response
+
+    def _send(self, keys, method, **kwargs):
+        self.ledger.begin(keys)
+        try:
+            return method(**kwargs)
+        except Exception as e:
+            if not isAmbiguous(e):
+                # Definitely rejected: nothing to reconcile later.
+                self.ledger.discard(keys)
+            raise
+
+    def _reconcileJobs(self, keys, since):
+        """
+        Looks for jobs carrying any of `keys` created since `since` and
+        marks the ones found as submitted, following the orders of the
+        jobs found to their other jobs. Keys not found are dropped from
+        the ledger so they get sent again, unless the listing was full:
+        then they stay pending and IncompleteListingError is raised.
+        """
+        wanted = set(keys)
+        try:
+            listed = list(JobPager(self.gengo, int(since - CLOCK_SLACK)))
+            complete = True
+        except IncompleteListingError as e:
+            listed, complete = e.jobs, False
+        seen = set()
+        orders = set()
+        ids = [str(job['job_id']) for job in listed]
+        while ids and wanted:
+            seen.update(ids)
+            for job in self._fetchJobs(ids):
+                key = job.get('custom_data')
+                if key in wanted:
+                    self.ledger.commit([key], job.get('job_id'))
+                    wanted.discard(key)
+                    if job.get('order_id') is not None:
+                        orders.add(str(job['order_id']))
+            ids = []
+            while orders and not ids:
+                ids = [job_id for job_id in self._orderJobs(orders.pop())
+                       if job_id not in seen]
+        if wanted and not complete:
+            raise IncompleteListingError(int(since - CLOCK_SLACK),
+                                         len(listed), listed)
+        self.ledger.discard(wanted)
+
+    def _fetchJobs(self, ids):
+        for i in range(0, len(ids), self.batch_size):
+            batch = self.gengo.getTranslationJobBatch(
+                id=','.join(ids[i:i + self.batch_size]))
+            for job in (batch.get('response') or {}).get('jobs') or []:
+                yield job
+
+    def _orderJobs(self, order_id):
+        order = (self.gengo.getTranslationOrderJobs(id=order_id)
+                 .get('response') or {}).get('order') or {}
+        return [str(job_id) for name, ids in sorted(order.items())
+                if name.startswith('jobs_') for job_id in ids or ()]
@@ -0,0 +1,274 @@
+# All code provided from the http://gengo.com site, such as API example code
+# and libraries, is provided under the New BSD license unless otherwise
+# noted. Details are below.
+#
+# New BSD License
+# Copyright (c) 2009-2020, Gengo, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# Neither the name of Gengo, Inc. nor the names of its contributors may
+# be used to endorse or promote products derived from this software
+# without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+# IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+# PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Prometheus metrics for API calls: request counts, latency histograms,
+errors by Gengo error code and calls in flight, per endpoint.
+
+    metrics = ClientMetrics()
+    metrics.attach(gengo)           # any number of Gengo/AsyncGengo
+    server = startServer(metrics, port=9464)
+
+GET http://127.0.0.1:9464/metrics then returns the Prometheus text
+format; metrics.render() returns the same text for use with an existing
+web app, and `metrics` itself is a WSGI app serving it.
+
+Recording happens in the client's request hooks (see gengo/hooks.py)
+and takes no locks: every thread counts into its own shard, and shards
+are only summed up when the metrics are collected.
+"""
+from __future__ import absolute_import
+
+from bisect import bisect_left
+import threading
+
+# Latency buckets in seconds, upper bounds.
+DEFAULT_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+                   30.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_HELP = (
+    ('requests_total', 'counter',
+     'API calls made, by endpoint, method and HTTP status.'),
+    ('errors_total', 'counter',
+     'API calls that raised, by endpoint and Gengo error code (or '
+     'exception name).'),
+    ('retries_total', 'counter',
+     'Requests sent again after a retryable failure, by endpoint.'),
+    ('in_flight', 'gauge', 'API calls in progress, by endpoint.'),
+    ('request_duration_seconds', 'histogram',
+     'Time API calls took, including retries, by endpoint.'),
+)
+
+
+class _Shard(object):
+
+    __slots__ = ('values', 'histograms')
+
+    def __init__(self):
+        # (metric, labels) -> number
+        self.values = {}
+        # labels -> [count per bucket..., count above the last bucket,
+        # sum of observations]
+        self.histograms = {}
+
+
+class ClientMetrics(object):
+
+    """
+    Collects call metrics from the clients it is attached to.
+    """
+    def __init__(self, prefix='gengo_client', buckets=DEFAULT_BUCKETS):
+        """
+        prefix - prepended to every metric name.
+        buckets - upper bounds of the latency histogram, in seconds.
+        """
+        self.prefix = prefix
+        self.buckets = tuple(sorted(buckets))
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards = []
+        # Totals of threads that have exited.
+        self._retired = _Shard()
+
+    def attach(self, gengo):
+        """
+        Starts recording the calls made by `gengo`.
+        """
+        gengo.addHook('before', self._before)
+        gengo.addHook('after', self._after)
+        gengo.addHook('error', self._after)
+
+    def detach(self, gengo):
+        gengo.removeHook('before', self._before)
+        gengo.removeHook('after', self._after)
+        gengo.removeHook('error', self._after)
+
+    def _shard(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = _Shard()
+            with self._lock:
+                self._shards.append((threading.current_thread(), shard))
+            return shard
+
+    def _before(self, trace):
+        values = self._shard().values
+        key = ('in_flight', (('endpoint', trace.endpoint),))
+        values[key] = values.get(key, 0) + 1
+
+    def _after(self, trace):
+        # Only this thread writes to its shard, so plain updates are safe.
+        shard = self._shard()
+        values = shard.values
+        endpoint = (('endpoint', trace.endpoint),)
+
+        key = ('in_flight', endpoint)
+        values[key] = values.get(key, 0) - 1
+        if trace.cached:
+            status = 'cached'
+        elif trace.status is None:
+            status = 'none'
+        else:
+            status = str(trace.status)
+        key = ('requests_total', endpoint + (('method', trace.method),
+                                             ('status', status)))
+        values[key] = values.get(key, 0) + 1
+        if trace.retries:
+            key = ('retries_total', endpoint)
+            values[key] = values.get(key, 0) + trace.retries
+        if trace.error is not None:
+            code = getattr(trace.error, 'error_code', None)
+            code = type(trace.error).__name__ if code is None else str(code)
+            key = ('errors_total', endpoint + (('error_code', code),))
+            values[key] = values.get(key, 0) + 1
+
+        counts = shard.histograms.get(endpoint)
+        if counts is None:
+            counts = shard.histograms[endpoint] = \
+                [0] * (len(self.buckets) + 2)
+        counts[bisect_left(self.buckets, trace.elapsed)] += 1
+        counts[-1] += trace.elapsed
+
+    def collect(self):
+        """
+        Returns (values, histograms) summed over all threads: values maps
+        (metric, labels) to a number, histograms maps labels to the count
+        per bucket, the count above the last bucket and the sum.
+        """
+        values = {}
+        histograms = {}
+        with self._lock:
+            live = []
+            for thread, shard in self._shards:
+                if thread.is_alive():
+                    # Copying a dict is atomic under the GIL, so the
+                    # owning thread may keep counting meanwhile.
+                    _merge(values, histograms, dict(shard.values),
+                           dict(shard.histograms))
+                    live.append((thread, shard))
+                else:
+                    _merge(self._retired.values, self._retired.histograms,
+                           shard.values, shard.histograms)
+            self._shards = live
+            _merge(values, histograms, self._retired.values,
+                   self._retired.histograms)
+        return values, histograms
+
+    def render(self):
+        """
+        Returns the metrics in the Prometheus text exposition format.
+        """
+        values, histograms = self.collect()
+        by_metric = {}
+        for (metric, labels), value in values.items():
+            by_metric.setdefault(metric, []).append((labels, value))
+
+        lines = []
+        for metric, kind, text in _HELP:
+            name = '{0}_{1}'.format(self.prefix, metric)
+            lines.append('# HELP {0} {1}'.format(name, text))
+            lines.append('# TYPE {0} {1}'.format(name, kind))
+            if kind != 'histogram':
+                for labels, value in sorted(by_metric.get(metric, ())):
+                    lines.append('{0}{1} {2}'.format(
+                        name, _labels(labels), _number(value)))
+                continue
+            for labels, counts in sorted(histograms.items()):
+                total = 0
+                bounds = [_number(b) for b in self.buckets] + ['+Inf']
+                for bound, count in zip(bounds, counts):
+                    total += count
+                    lines.append('{0}_bucket{1} {2}'.format(
+                        name, _labels(labels + (('le', bound),)), total))
+                lines.append('{0}_sum{1} {2}'.format(
+                    name, _labels(labels), _number(counts[-1])))
+                lines.append('{0}_count{1} {2}'.format(
+                    name, _labels(labels), total))
+        return '\n'.join(lines) + '\n'
+
+    def __call__(self, environ, start_response):
+        """
+        WSGI app serving render() on every path.
+        """
+        body = self.render().encode('utf-8')
+        start_response('200 OK', [('Content-Type', CONTENT_TYPE),
+                                  ('Content-Length', str(len(body)))])
+        return [body]
+
+
+def _merge(values, histograms, more_values, more_histograms):
+    for key, value in more_values.items():
+        values[key] = values.get(key, 0) + value
+    for labels, counts in more_histograms.items():
+        counts = list(counts)
+        merged = histograms.get(labels)
+        if merged is None:
+            histograms[labels] = counts
+        else:
+            for i, count in enumerate(counts):
+                merged[i] += count
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join('{0}="{1}"'.format(name, _escape(value))
+                          for name, value in labels) + '}'
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('\n', '\\n') \
+        .replace('"', '\\"')
+
+
+def _number(value):
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+def startServer(metrics, host='127.0.0.1', port=9464):
+    """
+    Serves `metrics` from a background thread and returns the server;
+    call shutdown() on it to stop. Pass port=0 to pick a free port (see
+    server.server_port).
+    """
+    from .callbacks import makeServer
+    server = makeServer(metrics, host, port)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return server
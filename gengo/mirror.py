@@ -0,0 +1,347 @@
+# All code provided from the http://gengo.com site, such as API example code
+# and libraries, is provided under the New BSD license unless otherwise
+# noted. Details are below.
+#
+# New BSD License
+# Copyright (c) 2009-2020, Gengo, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# Neither the name of Gengo, Inc. nor the names of its contributors may
+# be used to endorse or promote products derived from this software
+# without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+# IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+# PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+A local SQLite mirror of jobs, orders and comments, fed by the responses
+the client already receives.
+
+    mirror = JobMirror('/var/lib/myapp/gengo-mirror.sqlite')
+    gengo = Gengo(public_key, private_key, mirror=mirror)
+    gengo.getTranslationOrderJobs(id=order_id)    # mirrored as it passes
+
+    two_days_ago = time.time() - 2 * 86400
+    mirror.jobs(status='reviewable', lc_src='ja', lc_tgt='en',
+                created_before=two_days_ago)
+
+Job details come from getTranslationJob and getTranslationJobBatch;
+getTranslationJobs and getTranslationOrderJobs only carry IDs, creation
+times and statuses, which are merged into what is already known. To keep
+the mirror current without re-listing everything, feed it from a
+gengo.sync.JobSync:
+
+    sync.addListener(mirror.applyEvent)
+"""
+from __future__ import absolute_import
+
+import json
+import sqlite3
+import threading
+
+_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS jobs ('
+    ' job_id TEXT PRIMARY KEY, order_id TEXT, status TEXT, lc_src TEXT,'
+    ' lc_tgt TEXT, tier TEXT, ctime INTEGER, unit_count INTEGER,'
+    ' credits REAL, currency TEXT, custom_data TEXT, body TEXT NOT NULL)',
+    # Also serves status-only queries, being its leftmost column.
+    'CREATE INDEX IF NOT EXISTS jobs_status ON jobs'
+    ' (status, lc_src, lc_tgt, ctime)',
+    'CREATE INDEX IF NOT EXISTS jobs_pair ON jobs (lc_src, lc_tgt, ctime)',
+    'CREATE INDEX IF NOT EXISTS jobs_tier ON jobs (tier)',
+    'CREATE INDEX IF NOT EXISTS jobs_order ON jobs (order_id)',
+    'CREATE INDEX IF NOT EXISTS jobs_ctime ON jobs (ctime)',
+    'CREATE TABLE IF NOT EXISTS orders ('
+    ' order_id TEXT PRIMARY KEY, body TEXT NOT NULL)',
+    'CREATE TABLE IF NOT EXISTS comments ('
+    ' job_id TEXT, order_id TEXT, author TEXT, body TEXT, ctime INTEGER)',
+    'CREATE INDEX IF NOT EXISTS comments_job ON comments (job_id)',
+    'CREATE INDEX IF NOT EXISTS comments_order ON comments (order_id)',
+)
+
+# Job fields kept in their own columns; everything else stays in `body`.
+_COLUMNS = ('order_id', 'status', 'lc_src', 'lc_tgt', 'tier', 'ctime',
+            'unit_count', 'credits', 'currency', 'custom_data')
+
+# Filters accepted by JobMirror.jobs() and count(), as SQL conditions.
+_FILTERS = {
+    'status': 'status = ?',
+    'lc_src': 'lc_src = ?',
+    'lc_tgt': 'lc_tgt = ?',
+    'tier': 'tier = ?',
+    'order_id': 'order_id = ?',
+    'created_after': 'ctime > ?',
+    'created_before': 'ctime < ?',
+}
+
+
+class JobMirror(object):
+
+    def __init__(self, path=':memory:'):
+        """
+        path - SQLite database file; in memory by default.
+        """
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        for statement in _SCHEMA:
+            self._db.execute(statement)
+        self._db.commit()
+
+    def ingest(self, api_call, kwargs, results):
+        """
+        Stores what a successful API response says about jobs, orders
+        and comments. Responses of other endpoints are ignored.
+
+        api_call - the endpoint name, e.g. 'getTranslationJob'.
+        kwargs - the arguments the endpoint was called with.
+        results - the decoded response.
+        """
+        response = results.get('response') if isinstance(results, dict) \
+            else None
+        if not response:
+            return
+        if api_call == 'getTranslationJob':
+            self.putJobs([response.get('job') or {}])
+        elif api_call == 'getTranslationJobBatch':
+            self.putJobs(response.get('jobs') or [])
+        elif api_call == 'getTranslationJobs':
+            self.putJobs(response)
+        elif api_call == 'getTranslationOrderJobs':
+            self._putOrderJobs(response.get('order') or {})
+        elif api_call == 'postTranslationJobs':
+            if response.get('order_id') is not None:
+                self._putOrder(response)
+        elif api_call == 'getTranslationJobComments':
+            self._putComments(response.get('thread') or [],
+                              job_id=str(kwargs['id']))
+        elif api_call == 'getOrderComments':
+            self._putComments(response.get('thread') or [],
+                              order_id=str(kwargs['id']))
+        elif api_call == 'deleteTranslationJob':
+            self.putJobs([{'job_id': kwargs['id'], 'status': 'deleted'}])
+
+    def applyEvent(self, event):
+        """
+        JobSync listener: stores created and updated jobs and drops
+        removed ones.
+        """
+        if event['type'] == 'removed':
+            with self._lock:
+                self._db.execute('DELETE FROM jobs WHERE job_id = ?',
+                                 (event['job_id'],))
+                self._db.commit()
+        elif event['job'] is not None:
+            self.putJobs([event['job']])
+
+    def putJobs(self, jobs):
+        """
+        Merges job dicts into the mirror; fields missing from a job keep
+        their stored values.
+        """
+        jobs = [job for job in jobs if job.get('job_id') is not None]
+        if not jobs:
+            return
+        with self._lock:
+            known = self._bodies('jobs', 'job_id',
+                                 [str(job['job_id']) for job in jobs])
+            rows = []
+            for job in jobs:
+                job_id = str(job['job_id'])
+                merged = known.get(job_id, {})
+                merged.update(job)
+                merged['job_id'] = job_id
+                known[job_id] = merged
+                rows.append(_jobRow(merged))
+            self._db.executemany(
+                'INSERT OR REPLACE INTO jobs (job_id, {0}, body) VALUES '
+                '(?, {1}, ?)'.format(', '.join(_COLUMNS),
+                                     ', '.join('?' * len(_COLUMNS))),
+                rows)
+            self._db.commit()
+
+    def job(self, job_id):
+        """
+        Returns the mirrored job dict, or None.
+        """
+        with self._lock:
+            row = self._db.execute('SELECT body FROM jobs WHERE job_id = ?',
+                                   (str(job_id),)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def jobs(self, limit=None, offset=0, newest_first=False, **filters):
+        """
+        Returns mirrored job dicts ordered by creation time.
+
+        filters - any of status, lc_src, lc_tgt, tier, order_id,
+        created_after and created_before (epoch seconds, exclusive).
+        """
+        where, params = _where(filters)
+        sql = 'SELECT body FROM jobs{0} ORDER BY ctime {1}, job_id'.format(
+            where, 'DESC' if newest_first else 'ASC')
+        if limit is not None:
+            sql += ' LIMIT ? OFFSET ?'
+            params += [limit, offset]
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def count(self, **filters):
+        """
+        Returns the number of mirrored jobs matching `filters` (see
+        jobs()).
+        """
+        where, params = _where(filters)
+        with self._lock:
+            return self._db.execute('SELECT COUNT(*) FROM jobs' + where,
+                                    params).fetchone()[0]
+
+    def countBy(self, column, **filters):
+        """
+        Returns {value: number of jobs} grouped by one of the job
+        columns, e.g. countBy('status', lc_tgt='ja').
+        """
+        if column not in _COLUMNS:
+            raise ValueError('Cannot group by {0!r}'.format(column))
+        where, params = _where(filters)
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT {0}, COUNT(*) FROM jobs{1} GROUP BY {0}'.format(
+                    column, where), params).fetchall()
+        return dict(rows)
+
+    def order(self, order_id):
+        """
+        Returns the mirrored order dict, or None.
+        """
+        with self._lock:
+            row = self._db.execute(
+                'SELECT body FROM orders WHERE order_id = ?',
+                (str(order_id),)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def comments(self, job_id=None, order_id=None):
+        """
+        Returns the mirrored comment thread of a job or an order, oldest
+        first.
+        """
+        column, value = ('job_id', job_id) if job_id is not None else \
+            ('order_id', order_id)
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT author, body, ctime FROM comments WHERE {0} = ? '
+                'ORDER BY ctime, rowid'.format(column),
+                (str(value),)).fetchall()
+        return [{'author': author, 'body': body, 'ctime': ctime}
+                for author, body, ctime in rows]
+
+    def close(self):
+        self._db.close()
+
+    def _bodies(self, table, key, ids):
+        found = {}
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            rows = self._db.execute(
+                'SELECT {0}, body FROM {1} WHERE {0} IN ({2})'.format(
+                    key, table, ','.join('?' * len(chunk))), chunk)
+            for row_id, body in rows:
+                found[row_id] = json.loads(body)
+        return found
+
+    def _putOrder(self, order):
+        order_id = str(order['order_id'])
+        with self._lock:
+            merged = self._bodies('orders', 'order_id', [order_id]).get(
+                order_id, {})
+            merged.update(order)
+            merged['order_id'] = order_id
+            self._db.execute(
+                'INSERT OR REPLACE INTO orders (order_id, body) VALUES '
+                '(?, ?)', (order_id, json.dumps(merged)))
+            self._db.commit()
+
+    def _putOrderJobs(self, order):
+        if order.get('order_id') is None:
+            return
+        self._putOrder(order)
+        jobs = []
+        for key, ids in order.items():
+            if key.startswith('jobs_') and isinstance(ids, list):
+                status = key[len('jobs_'):]
+                jobs.extend({'job_id': job_id, 'status': status,
+                             'order_id': str(order['order_id'])}
+                            for job_id in ids)
+        self.putJobs(jobs)
+
+    def _putComments(self, thread, job_id=None, order_id=None):
+        column, value = ('job_id', job_id) if job_id is not None else \
+            ('order_id', order_id)
+        with self._lock:
+            # A thread always comes back whole, so it replaces what was
+            # stored before.
+            self._db.execute(
+                'DELETE FROM comments WHERE {0} = ?'.format(column),
+                (value,))
+            self._db.executemany(
+                'INSERT INTO comments (job_id, order_id, author, body, ctime)'
+                ' VALUES (?, ?, ?, ?, ?)',
+                [(job_id, order_id, entry.get('author'), entry.get('body'),
+                  _int(entry.get('ctime'))) for entry in thread])
+            self._db.commit()
+
+
+def _jobRow(job):
+    row = [job['job_id']]
+    for column in _COLUMNS:
+        value = job.get(column)
+        if column == 'ctime':
+            value = _int(value)
+        elif column == 'order_id' and value is not None:
+            value = str(value)
+        elif isinstance(value, (dict, list)):
+            value = json.dumps(value)
+        row.append(value)
+    row.append(json.dumps(job))
+    return row
+
+
+def _where(filters):
+    conditions = []
+    params = []
+    for name, value in sorted(filters.items()):
+        if name not in _FILTERS:
+            raise TypeError('Unknown filter {0!r}'.format(name))
+        if value is None:
+            continue
+        if name == 'order_id':
+            value = str(value)
+        conditions.append(_FILTERS[name])
+        params.append(value)
+    if not conditions:
+        return '', params
+    return ' WHERE ' + ' AND '.join(conditions), params
+
+
+def _int(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
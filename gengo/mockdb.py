@@ -47,6 +47,10 @@ function at call time.
 i.e, in this case, if I pass bert = 47 to any function, {{bert}} will be
 replaced with 47, instead of defaulting to 1 (said defaulting takes place
 at conversion time).
+
+Endpoints returning slow-changing reference data carry a 'cache_ttl' (in
+seconds): when a Gengo instance is given a ResponseCache, their responses
+are kept that long. See gengo/cache.py.
 """
 
 # Gengo API urls. {version} gets replaced with v1/etc at run time.
@@ -111,8 +115,8 @@ apihash = {
         'method': 'POST',
         'upload': True,  # with this being set the payload will be checked
         # for file_path args and - if found - modified in a way so that
-        # opened file descriptors are passed to requests to do a multi part
-        # file upload. for now this is tied to jobs data only.
+        # the files are streamed as a multi part upload (see
+        # gengo.multipart). for now this is tied to jobs data only.
     },
 
     # Deal with comments and other metadata about a TranslationJob in
@@ -149,25 +153,30 @@ apihash = {
     'getServiceLanguagePairs': {
         'url': '/translate/service/language_pairs',
         'method': 'GET',
+        'cache_ttl': 86400,
     },
     'getServiceLanguages': {
         'url': '/translate/service/languages',
         'method': 'GET',
+        'cache_ttl': 86400,
     },
     'getServiceLanguageMatrix': {
         'url': '/translate/service/language_matrix',
         'method': 'GET',
+        'cache_ttl': 86400,
     },
 
     # glossary stuff
     'getGlossaryList': {
         'url': '/translate/glossary',
         'method': 'GET',
+        'cache_ttl': 3600,
     },
 
     'getGlossary': {
         'url': '/translate/glossary/{{id}}',
         'method': 'GET',
+        'cache_ttl': 3600,
     },
 
     # order information
@@ -197,5 +206,6 @@ apihash = {
     'getPreferredTranslators': {
         'url': '/account/preferred_translators',
         'method': 'GET',
+        'cache_ttl': 3600,
     }
 }
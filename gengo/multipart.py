@@ -0,0 +1,200 @@
+# All code provided from the http://gengo.com site, such as API example code
+# and libraries, is provided under the New BSD license unless otherwise
+# noted. Details are below.
+#
+# New BSD License
+# Copyright (c) 2009-2020, Gengo, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# Neither the name of Gengo, Inc. nor the names of its contributors may
+# be used to endorse or promote products derived from this software
+# without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+# IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+# PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Streaming multipart/form-data encoder for file uploads.
+
+Handing requests a dict of open file objects keeps every file open at
+once and builds the whole body in memory. MultipartEncoder instead knows
+the body length up front (from file sizes), opens one file at a time when
+the stream reaches it, reads it in fixed-size chunks (memory-mapping large
+files) and closes it as soon as its part has been sent.
+"""
+from __future__ import absolute_import
+
+import binascii
+import mmap
+import os
+
+
+class MultipartEncoder(object):
+
+    def __init__(self, fields, files, boundary=None, chunk_size=64 * 1024,
+                 mmap_threshold=1024 * 1024):
+        """
+        fields - dict or list of (name, value) plain form fields.
+        files - list of (name, filename, source, content_type) parts,
+        where source is ('path', file path) or ('data', the part's
+        contents as bytes) and content_type may be None.
+        chunk_size - bytes read from a file at a time.
+        mmap_threshold - files at least this large are memory-mapped
+        instead of read.
+        """
+        self.boundary = boundary or \
+            binascii.hexlify(os.urandom(16)).decode('ascii')
+        self.chunk_size = chunk_size
+        self.mmap_threshold = mmap_threshold
+        items = fields.items() if isinstance(fields, dict) else fields
+        self._parts = [(self._fieldHeader(name), ('data', _bytes(value)))
+                       for name, value in items]
+        for name, filename, source, content_type in files:
+            if source[0] not in ('path', 'data'):
+                raise ValueError('Unknown multipart source {0!r}'.format(
+                    source[0]))
+            header = self._fileHeader(name, filename, content_type)
+            self._parts.append((header, source))
+        self._closing = '--{0}--\r\n'.format(self.boundary).encode('utf-8')
+        self._length = len(self._closing) + sum(
+            len(header) + _size(source) + 2 for header, source in self._parts)
+
+        self._iter = self._chunks()
+        self._buffer = b''
+        self._pos = 0
+        self._file = None
+        self._map = None
+
+    @property
+    def content_type(self):
+        return 'multipart/form-data; boundary={0}'.format(self.boundary)
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(self.chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def read(self, size=-1):
+        """
+        File-like read; returns b'' once the body is exhausted.
+        """
+        if size is None or size < 0:
+            data = [self._buffer[self._pos:]]
+            data.extend(self._iter)
+            self._buffer, self._pos = b'', 0
+            return b''.join(data)
+        while len(self._buffer) - self._pos < size:
+            chunk = next(self._iter, None)
+            if chunk is None:
+                break
+            self._buffer = self._buffer[self._pos:] + chunk
+            self._pos = 0
+        data = self._buffer[self._pos:self._pos + size]
+        self._pos += len(data)
+        return data
+
+    def close(self):
+        """
+        Stops the stream and closes the file currently being read, if any.
+        Safe to call more than once.
+        """
+        self._iter.close()
+        self._closeFile()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _chunks(self):
+        for header, (kind, source) in self._parts:
+            yield header
+            if kind == 'data':
+                yield source
+            else:
+                for chunk in self._fileChunks(source):
+                    yield chunk
+            yield b'\r\n'
+        yield self._closing
+
+    def _fileChunks(self, path):
+        self._file = open(path, 'rb')
+        try:
+            size = os.fstat(self._file.fileno()).st_size
+            if size >= self.mmap_threshold:
+                self._map = mmap.mmap(self._file.fileno(), 0,
+                                      access=mmap.ACCESS_READ)
+                for offset in range(0, size, self.chunk_size):
+                    yield self._map[offset:offset + self.chunk_size]
+            else:
+                while True:
+                    chunk = self._file.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+        finally:
+            self._closeFile()
+
+    def _closeFile(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _fieldHeader(self, name):
+        return ('--{0}\r\nContent-Disposition: form-data; name="{1}"'
+                '\r\n\r\n').format(self.boundary, _quote(name)).encode('utf-8')
+
+    def _fileHeader(self, name, filename, content_type):
+        header = ('--{0}\r\nContent-Disposition: form-data; name="{1}"; '
+                  'filename="{2}"\r\n').format(self.boundary, _quote(name),
+                                               _quote(filename))
+        if content_type:
+            header += 'Content-Type: {0}\r\n'.format(content_type)
+        return (header + '\r\n').encode('utf-8')
+
+
+def _bytes(value):
+    if isinstance(value, bytes):
+        return value
+    if not isinstance(value, type(u'')):
+        value = u'{0}'.format(value)
+    return value.encode('utf-8')
+
+
+def _size(source):
+    kind, source = source
+    if kind == 'data':
+        return len(source)
+    return os.path.getsize(source)
+
+
+def _quote(value):
+    return u'{0}'.format(value).replace('"', '%22').replace('\r', '%0D') \
+        .replace('\n', '%0A')
@@ -0,0 +1,163 @@
+# All code provided from the http://gengo.com site, such as API example code
+# and libraries, is provided under the New BSD license unless otherwise
+# noted. Details are below.
+#
+# New BSD License
+# Copyright (c) 2009-2020, Gengo, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# Neither the name of Gengo, Inc. nor the names of its contributors may
+# be used to endorse or promote products derived from this software
+# without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+# IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+# PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Lazy iteration over list endpoints.
+
+getTranslationJobs is documented as listing the most recent jobs created
+after `timestamp_after`, newest first, at most `count` (200) of them. It
+takes no upper bound, so the jobs behind a full listing cannot be reached
+by moving `timestamp_after`: a listing is only known to be complete when
+it comes back short. iterTranslationJobs yields the jobs of such a
+listing and raises IncompleteListingError for a full one rather than
+quietly returning part of the history:
+
+    for job in gengo.iterTranslationJobs(timestamp_after=last_sync,
+                                         status='reviewable'):
+        ...
+
+Comment threads come back whole, so iterTranslationJobComments and
+iterOrderComments simply yield their entries one by one.
+"""
+from __future__ import absolute_import
+
+from .gengo import GengoError
+
+# getTranslationJobs returns at most this many jobs per call.
+MAX_COUNT = 200
+
+
+class IncompleteListingError(GengoError):
+
+    """
+    Raised when getTranslationJobs returns a full listing: more jobs were
+    created after `timestamp_after` than one call lists, and the older
+    ones cannot be reached. `jobs` holds the listed ones.
+    """
+    def __init__(self, timestamp_after, count, jobs):
+        GengoError.__init__(
+            self, 'More than {0} jobs were created after {1}; narrow the '
+            'listing with a later timestamp_after or a status filter'
+            .format(count, timestamp_after))
+        self.timestamp_after = timestamp_after
+        self.jobs = jobs
+
+
+class JobPager(object):
+
+    """
+    Lists the jobs created since `timestamp_after`.
+
+    After (or during) iteration, `high_water` is the newest creation time
+    seen and `boundary` the IDs of the jobs created in that second; pass
+    both back in to resume where a previous pager stopped.
+    """
+    def __init__(self, gengo, timestamp_after=0, boundary=(),
+                 count=MAX_COUNT, **params):
+        """
+        gengo - the client used for getTranslationJobs.
+        timestamp_after - only jobs created at or after this time.
+        boundary - IDs created at `timestamp_after` that were already
+        seen and should be skipped.
+        count - jobs per request (at most 200).
+        params - further getTranslationJobs filters, e.g. status.
+        """
+        self.gengo = gengo
+        self.high_water = int(timestamp_after)
+        self.boundary = set(str(job_id) for job_id in boundary)
+        self.count = count
+        self.params = params
+        self.requests = 0
+
+    def pages(self):
+        """
+        Yields lists of {'job_id', 'ctime'} dicts with the jobs in
+        `boundary` left out. Raises IncompleteListingError, before
+        yielding anything, when the listing is full.
+        """
+        listed = self.gengo.getTranslationJobs(
+            timestamp_after=self.high_water, count=self.count,
+            **self.params)
+        self.requests += 1
+        listed = listed.get('response') or []
+        if len(listed) >= self.count:
+            raise IncompleteListingError(self.high_water, self.count,
+                                         listed)
+        page = []
+        for job in listed:
+            job_id = str(job['job_id'])
+            ctime = int(job.get('ctime') or 0)
+            if job_id in self.boundary:
+                continue
+            if ctime > self.high_water:
+                self.high_water = ctime
+                self.boundary = set()
+            if ctime == self.high_water:
+                self.boundary.add(job_id)
+            page.append(job)
+        if page:
+            yield page
+
+    def __iter__(self):
+        for page in self.pages():
+            for job in page:
+                yield job
+
+
+def iterTranslationJobs(gengo, timestamp_after=0, count=MAX_COUNT,
+                        **params):
+    """
+    Yields every job created after `timestamp_after`. See JobPager for
+    the arguments.
+    """
+    return iter(JobPager(gengo, timestamp_after, count=count, **params))
+
+
+def iterTranslationJobComments(gengo, id):
+    """
+    Yields the entries of a job's comment thread.
+    """
+    for entry in _thread(gengo.getTranslationJobComments(id=id)):
+        yield entry
+
+
+def iterOrderComments(gengo, id):
+    """
+    Yields the entries of an order's comment thread.
+    """
+    for entry in _thread(gengo.getOrderComments(id=id)):
+        yield entry
+
+
+def _thread(results):
+    return (results.get('response') or {}).get('thread') or []
@@ -0,0 +1,160 @@
+# All code provided from the http://gengo.com site, such as API example code
+# and libraries, is provided under the New BSD license unless otherwise
+# noted. Details are below.
+#
+# New BSD License
+# Copyright (c) 2009-2020, Gengo, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# Neither the name of Gengo, Inc. nor the names of its contributors may
+# be used to endorse or promote products derived from this software
+# without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+# IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+# PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Client side throttling and retries.
+
+RateLimiter keeps one token bucket per endpoint class. By default GET
+endpoints are 'read' and everything else 'write'; an apihash entry can
+name its own class with 'rate_class'. RetryPolicy decides whether a failed
+call may be retried and how long to back off, honouring Retry-After.
+
+Both are configured through the Gengo constructor:
+
+    Gengo(public_key, private_key,
+          rate_limits={'read': 10, 'write': (2, 5)},
+          max_retries=3, backoff_factor=0.5)
+"""
+from __future__ import absolute_import
+
+import random
+import threading
+from time import time
+
+
+class TokenBucket(object):
+
+    def __init__(self, rate, burst=None):
+        """
+        rate - tokens added per second.
+        burst - bucket size; defaults to one second worth of tokens.
+        """
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(rate, 1))
+        self._tokens = self.burst
+        self._updated = time()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """
+        Takes a token and returns how many seconds the caller has to wait
+        before using it (0 when one was available). Reservations queue up,
+        so concurrent callers are spaced out rather than woken together.
+        """
+        with self._lock:
+            now = time()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0
+            return -self._tokens / self.rate
+
+
+class RateLimiter(object):
+
+    def __init__(self, limits):
+        """
+        limits - {endpoint class: rate or (rate, burst)}, rates in calls
+        per second. Classes missing from the dict are not limited.
+        """
+        self.buckets = {}
+        for name, limit in limits.items():
+            if not isinstance(limit, (tuple, list)):
+                limit = (limit,)
+            self.buckets[name] = TokenBucket(*limit)
+
+    @staticmethod
+    def classify(endpoint):
+        if 'rate_class' in endpoint.fn:
+            return endpoint.fn['rate_class']
+        return 'read' if endpoint.method == 'GET' else 'write'
+
+    def reserve(self, endpoint):
+        bucket = self.buckets.get(self.classify(endpoint))
+        return bucket.reserve() if bucket is not None else 0
+
+
+class RetryPolicy(object):
+
+    def __init__(self, max_retries=0, backoff_factor=0.5, backoff_max=30,
+                 statuses=(429, 500, 502, 503, 504),
+                 methods=('GET', 'DELETE')):
+        """
+        max_retries - retries after the first attempt; 0 disables retries.
+        backoff_factor - base of the exponential backoff in seconds: the
+        n-th retry waits a random time up to backoff_factor * 2 ** n
+        ("full jitter"), capped at backoff_max. A Retry-After sent by the
+        server is honoured up to backoff_max as well.
+        statuses - HTTP statuses worth retrying.
+        methods - only these (idempotent) methods are ever retried.
+        """
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.statuses = frozenset(statuses)
+        self.methods = frozenset(methods)
+
+    def delay(self, method, attempt, response=None, error=None):
+        """
+        Returns the seconds to wait before retrying, or None when the call
+        must not be retried. `attempt` counts from 0 for the first try;
+        pass either the response or the connection error it ended with.
+        """
+        if attempt >= self.max_retries or method not in self.methods:
+            return None
+        if error is None and response.status_code not in self.statuses:
+            return None
+        retry_after = self._retryAfter(response)
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return random.uniform(
+            0, min(self.backoff_max, self.backoff_factor * 2 ** attempt))
+
+    @staticmethod
+    def _retryAfter(response):
+        if response is None:
+            return None
+        value = (response.headers or {}).get('Retry-After')
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        from email.utils import mktime_tz, parsedate_tz
+        parsed = parsedate_tz(value)
+        if parsed is None:
+            return None
+        return max(0.0, mktime_tz(parsed) - time())
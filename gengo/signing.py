@@ -0,0 +1,84 @@
+# All code provided from the http://gengo.com site, such as API example code
+# and libraries, is provided under the New BSD license unless otherwise
+# noted. Details are below.
+#
+# New BSD License
+# Copyright (c) 2009-2020, Gengo, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# Neither the name of Gengo, Inc. nor the names of its contributors may
+# be used to endorse or promote products derived from this software
+# without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+# IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+# PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Request signing.
+
+API v2 signatures are HMAC-SHA1 of the request timestamp (in whole
+seconds) keyed with the private key. Signer keys an HMAC once and copies
+that state for every signature instead of re-keying, and remembers the
+signature of the current second, which every other request sent within
+that second shares.
+"""
+from __future__ import absolute_import
+
+from hashlib import sha1
+import hmac
+
+
+class Signer(object):
+
+    def __init__(self, private_key, stats=None):
+        """
+        private_key - the private key, as bytes.
+        stats - optional gengo.gengo.ClientStats; 'signed' and
+        'signature_memo_hits' are counted in it.
+        """
+        self.private_key = private_key
+        self.stats = stats
+        self._keyed = hmac.new(private_key, digestmod=sha1)
+        # (timestamp, signature), replaced as a whole so that concurrent
+        # readers never see a signature paired with the wrong timestamp.
+        self._memo = (None, None)
+
+    def sign(self, ts):
+        """
+        Returns the hex signature for a timestamp (str, bytes or int).
+        Safe to call from several threads.
+        """
+        if not isinstance(ts, bytes):
+            ts = u'{0}'.format(ts).encode('utf-8')
+        memo = self._memo
+        if memo[0] == ts:
+            if self.stats is not None:
+                self.stats.incr('signature_memo_hits')
+            return memo[1]
+        # _keyed is never updated, so copying it from several threads
+        # at once is safe.
+        mac = self._keyed.copy()
+        mac.update(ts)
+        signature = mac.hexdigest()
+        self._memo = (ts, signature)
+        if self.stats is not None:
+            self.stats.incr('signed')
+        return signature
@@ -0,0 +1,326 @@
+# All code provided from the http://gengo.com site, such as API example code
+# and libraries, is provided under the New BSD license unless otherwise
+# noted. Details are below.
+#
+# New BSD License
+# Copyright (c) 2009-2020, Gengo, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# Neither the name of Gengo, Inc. nor the names of its contributors may
+# be used to endorse or promote products derived from this software
+# without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+# IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+# PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Incremental parsing of large JSON responses.
+
+A getTranslationJobs or getTranslationOrderJobs response for a big
+account can be many megabytes; decoding it whole delays the first job
+until the last byte arrived and holds everything in memory. The stream*
+methods of Gengo instead read the body in chunks and yield entries as
+soon as each one is complete:
+
+    for job in gengo.streamTranslationJobs(status='reviewable'):
+        ...
+
+`opstat` and `err` are still checked: an error response raises the
+usual GengoError, as soon as it is seen.
+
+Only the entry being parsed is held in memory. Entries are decoded with
+the standard library's raw_decode, whatever json_codec the client uses.
+"""
+from __future__ import absolute_import
+
+import codecs
+import json
+
+from .gengo import Gengo, GengoError, _clock
+
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = ' \t\n\r'
+# Characters that can follow a complete number.
+_DELIMITERS = _WHITESPACE + ',]}'
+
+try:
+    # NOQA because "unicode" is undefined in Python3
+    _string_types = (str, unicode)  # NOQA
+except NameError:
+    _string_types = (str,)
+
+try:
+    # NOQA because "long" is undefined in Python3
+    _number_types = (int, long, float)  # NOQA
+except NameError:
+    _number_types = (int, float)
+
+
+class _Reader(object):
+
+    """
+    JSON tokens and values read from an iterable of byte chunks.
+    """
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._json = json.JSONDecoder()
+        self._buffer = u''
+        self._pos = 0
+        self._eof = False
+
+    def _more(self, size=0):
+        """
+        Appends at least one more chunk to the buffer, and more until
+        `size` characters were added, dropping what was consumed. Returns
+        False at the end of the stream.
+        """
+        texts = []
+        added = 0
+        while not self._eof and (not texts or added < size):
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self._eof = True
+                text = self._decoder.decode(b'', True)
+            else:
+                text = self._decoder.decode(chunk)
+            if text:
+                texts.append(text)
+                added += len(text)
+        if not texts:
+            return False
+        texts.insert(0, self._buffer[self._pos:])
+        self._buffer = u''.join(texts)
+        self._pos = 0
+        return True
+
+    def peek(self):
+        """
+        Returns the next non-whitespace character, or '' at the end.
+        """
+        while True:
+            buffer = self._buffer
+            pos = self._pos
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < len(buffer):
+                return buffer[pos]
+            if not self._more():
+                return ''
+
+    def take(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError('Expected {0!r}, found {1!r}'.format(
+                char, found))
+        self._pos += 1
+
+    def value(self):
+        """
+        Decodes the next complete JSON value.
+        """
+        self.peek()
+        while True:
+            # Each retry decodes the value from its start, so wait until
+            # what is buffered of it has doubled: a value spread over
+            # many chunks then costs linear rather than quadratic time.
+            pending = len(self._buffer) - self._pos
+            try:
+                value, end = self._json.raw_decode(self._buffer, self._pos)
+            except ValueError:
+                # Most likely the value continues in the next chunk.
+                if not self._more(pending):
+                    raise
+                continue
+            # A number cut by the end of the buffer may go on in the next
+            # chunk, even past a '.' or an 'e' ("1." decodes as 1).
+            if isinstance(value, _number_types) and \
+                    not isinstance(value, bool) and \
+                    (end == len(self._buffer) or
+                     self._buffer[end] not in _DELIMITERS) and \
+                    self._more(pending):
+                continue
+            self._pos = end
+            return value
+
+    def members(self):
+        """
+        Yields the keys of an object. Each value has to be consumed
+        before asking for the next key.
+        """
+        self.take('{')
+        if self.peek() == '}':
+            self.take('}')
+            return
+        while True:
+            key = self.value()
+            if not isinstance(key, _string_types):
+                raise ValueError('Expected an object key')
+            self.take(':')
+            yield key
+            if self.peek() != ',':
+                self.take('}')
+                return
+            self.take(',')
+
+    def elements(self):
+        """
+        Yields once per array element, which has to be consumed before
+        resuming.
+        """
+        self.take('[')
+        if self.peek() == ']':
+            self.take(']')
+            return
+        while True:
+            yield
+            if self.peek() != ',':
+                self.take(']')
+                return
+            self.take(',')
+
+
+def _walk(reader, path, keys):
+    if not path:
+        if reader.peek() == '[':
+            for _ in reader.elements():
+                yield keys, reader.value()
+        else:
+            yield keys, reader.value()
+        return
+    if reader.peek() != '{':
+        # Not the expected shape; nothing to yield from here.
+        reader.value()
+        return
+    step = path[0]
+    for key in reader.members():
+        if step == '*':
+            for item in _walk(reader, path[1:], keys + (key,)):
+                yield item
+        elif key == step:
+            for item in _walk(reader, path[1:], keys):
+                yield item
+        else:
+            reader.value()
+
+
+def iterResponse(chunks, path, check):
+    """
+    Yields (keys, item) for the entries found at `path` inside the
+    `response` of a Gengo response body read from `chunks` (bytes).
+
+    path - keys leading to the interesting value inside `response`; '*'
+    matches every key of an object, and the matched keys are returned
+    in `keys`. When the value is an array its elements are yielded one
+    by one, otherwise the value itself.
+    check - called with the other top level members (opstat, err) once
+    an `err` has been read, and at the end; raises for errors.
+
+    Raises ValueError when the body is not valid JSON.
+    """
+    reader = _Reader(chunks)
+    top = {}
+    for key in reader.members():
+        if key == 'response':
+            for item in _walk(reader, tuple(path), ()):
+                yield item
+        else:
+            top[key] = reader.value()
+            if 'err' in top:
+                check(top)
+    if reader.peek() != '':
+        raise ValueError('Extra data after the response')
+    check(top)
+
+
+def streamCall(gengo, api_call, path=(), **kwargs):
+    """
+    Calls `api_call` and yields (keys, item) pairs from its response as
+    they are parsed; see iterResponse for `path`.
+
+    Request hooks see the call like any other. The body is read while it
+    is parsed, so its 'decode' phase includes receiving it.
+    """
+    endpoint = getattr(Gengo, api_call).endpoint
+    trace = gengo._startTrace(endpoint) if gengo._hooks else None
+    error = None
+    try:
+        for item in _stream(gengo, endpoint, kwargs, path, trace):
+            yield item
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        if trace is not None:
+            gengo._finishTrace(trace, error)
+
+
+def _stream(gengo, endpoint, kwargs, path, trace):
+    response = gengo._request(endpoint, kwargs, stream=True, trace=trace)
+    size = [0]
+
+    def chunks():
+        for chunk in response.iter_content(CHUNK_SIZE):
+            size[0] += len(chunk)
+            yield chunk
+
+    def check(results):
+        gengo._raiseForErrorResponse(results, response.status_code)
+    items = iterResponse(chunks(), path, check)
+    try:
+        while True:
+            start = _clock()
+            try:
+                item = next(items)
+            except StopIteration:
+                break
+            except ValueError as e:
+                msg = "Internal Server Error"
+                if gengo.debug:
+                    msg = "Invalid JSON response: {0}".format(e)
+                raise GengoError(msg, 1)
+            finally:
+                if trace is not None:
+                    trace.phases['decode'] += _clock() - start
+                    trace.response_bytes = size[0]
+            yield item
+    finally:
+        response.close()
+
+
+def streamTranslationJobs(gengo, **params):
+    for _, job in streamCall(gengo, 'getTranslationJobs', **params):
+        yield job
+
+
+def streamTranslationJobBatch(gengo, id):
+    for _, job in streamCall(gengo, 'getTranslationJobBatch', ('jobs',),
+                             id=id):
+        yield job
+
+
+def streamTranslationOrderJobs(gengo, id):
+    for keys, value in streamCall(gengo, 'getTranslationOrderJobs',
+                                  ('order', '*'), id=id):
+        if keys[0].startswith('jobs_') and not isinstance(value, dict):
+            yield {'job_id': value, 'status': keys[0][len('jobs_'):]}
@@ -0,0 +1,222 @@
+# All code provided from the http://gengo.com site, such as API example code
+# and libraries, is provided under the New BSD license unless otherwise
+# noted. Details are below.
+#
+# New BSD License
+# Copyright (c) 2009-2020, Gengo, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# Neither the name of Gengo, Inc. nor the names of its contributors may
+# be used to endorse or promote products derived from this software
+# without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+# IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+# PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Incremental job sync: reports jobs that appeared or changed status since
+the last poll.
+
+    sync = JobSync(gengo, path='/var/lib/myapp/gengo-sync.json')
+    sync.addListener(lambda event: print(event['type'], event['job_id']))
+    while True:
+        sync.poll()
+        time.sleep(60)
+
+getTranslationJobs only filters by creation time, so a poll asks it for
+jobs created after the cursor's high-water mark, then re-reads those new
+jobs together with the tracked jobs that are still in progress through
+getTranslationJobBatch. Jobs in a final status are dropped from the
+cursor, so steady-state polling costs grow with new and in-progress jobs
+rather than with the size of the account.
+
+The cursor is saved after the listeners have run, so an event may be
+delivered again if the process dies mid-poll, but never lost. A listing
+returns at most 200 jobs, newest first; when more than that were created
+since the last poll the older ones cannot be listed, and poll() raises
+gengo.paging.IncompleteListingError without moving the cursor. Poll often
+enough to stay below that. A new cursor therefore starts at the current
+time unless told otherwise, and skipTo() moves a stuck cursor forward,
+giving up on the jobs created in between.
+"""
+from __future__ import absolute_import
+
+import json
+import os
+import tempfile
+from time import time
+
+from .paging import JobPager
+
+# Statuses after which a job no longer changes.
+FINAL_STATUSES = frozenset(['approved', 'cancelled', 'deleted'])
+
+CREATED = 'created'
+UPDATED = 'updated'
+REMOVED = 'removed'
+
+
+class JobSync(object):
+
+    def __init__(self, gengo, path=None, batch_size=50,
+                 final_statuses=FINAL_STATUSES, timestamp_after=None):
+        """
+        gengo - the client used for getTranslationJobs and
+        getTranslationJobBatch.
+        path - JSON file the cursor is kept in; None keeps it in memory.
+        batch_size - job IDs per getTranslationJobBatch.
+        final_statuses - statuses after which a job stops being tracked.
+        timestamp_after - where a new cursor starts: jobs created before
+        it are never reported. Defaults to now; ignored when `path`
+        already holds a cursor.
+        """
+        self.gengo = gengo
+        self.path = path
+        self.batch_size = batch_size
+        self.final_statuses = frozenset(final_statuses)
+        self.requests = 0
+        self._listeners = []
+        self.cursor = self._load(timestamp_after)
+
+    def addListener(self, fn):
+        """
+        Calls fn(event) for every change found by poll().
+        """
+        self._listeners.append(fn)
+
+    def removeListener(self, fn):
+        self._listeners.remove(fn)
+
+    def poll(self):
+        """
+        Looks for new and changed jobs, notifies the listeners and saves
+        the cursor. Returns the list of events, each one a dict:
+
+        {
+            'type': 'created', 'updated' or 'removed',
+            'job_id': str,
+            'status': current status (None when removed),
+            'previous': status at the last poll (None when created),
+            'job': the job from getTranslationJobBatch (None when removed)
+        }
+        """
+        cursor = self.cursor
+        active = dict(cursor['active'])
+        new_ids, high_water, boundary = self._listNew(
+            cursor['timestamp_after'], set(cursor['boundary']))
+
+        new = set(new_ids)
+        ids = new_ids + [job_id for job_id in active if job_id not in new]
+        jobs = self._fetch(ids)
+
+        events = []
+        for job_id in ids:
+            job = jobs.get(job_id)
+            previous = active.get(job_id)
+            if job is None:
+                if job_id in new:
+                    continue
+                active.pop(job_id)
+                events.append(_event(REMOVED, job_id, None, previous, None))
+                continue
+            status = job.get('status')
+            if job_id in new:
+                events.append(_event(CREATED, job_id, status, None, job))
+            elif status != previous:
+                events.append(_event(UPDATED, job_id, status, previous, job))
+            if status in self.final_statuses:
+                active.pop(job_id, None)
+            else:
+                active[job_id] = status
+
+        for event in events:
+            for fn in self._listeners:
+                fn(event)
+
+        cursor['active'] = active
+        cursor['timestamp_after'] = high_water
+        cursor['boundary'] = sorted(boundary)
+        self._save()
+        return events
+
+    def skipTo(self, timestamp_after=None):
+        """
+        Moves the cursor forward to `timestamp_after` (default: now), for
+        instance after poll() raised IncompleteListingError. Jobs created
+        before that are never reported; the jobs already tracked still
+        are.
+        """
+        if timestamp_after is None:
+            timestamp_after = time()
+        if int(timestamp_after) > self.cursor['timestamp_after']:
+            self.cursor['timestamp_after'] = int(timestamp_after)
+            self.cursor['boundary'] = []
+            self._save()
+
+    def _listNew(self, timestamp_after, boundary):
+        """
+        Returns (IDs of jobs created since the cursor, new high-water
+        mark, IDs created at the high-water mark).
+        """
+        pager = JobPager(self.gengo, timestamp_after, boundary)
+        new_ids = [str(job['job_id']) for job in pager]
+        self.requests += pager.requests
+        return new_ids, pager.high_water, pager.boundary
+
+    def _fetch(self, ids):
+        """
+        Returns {job_id: job} for `ids`, read in batches. Jobs the API no
+        longer returns are left out.
+        """
+        jobs = {}
+        for i in range(0, len(ids), self.batch_size):
+            batch = self.gengo.getTranslationJobBatch(
+                id=','.join(ids[i:i + self.batch_size]))
+            self.requests += 1
+            for job in (batch.get('response') or {}).get('jobs') or []:
+                jobs[str(job['job_id'])] = job
+        return jobs
+
+    def _load(self, timestamp_after):
+        if timestamp_after is None:
+            timestamp_after = time()
+        cursor = {'timestamp_after': int(timestamp_after), 'boundary': [],
+                  'active': {}}
+        if self.path is not None and os.path.exists(self.path):
+            with open(self.path) as f:
+                cursor.update(json.load(f))
+        return cursor
+
+    def _save(self):
+        if self.path is None:
+            return
+        # Write to a temporary file first so that a crash never leaves a
+        # half written cursor behind.
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(dir=directory)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self.cursor, f)
+        getattr(os, 'replace', os.rename)(tmp, self.path)
+
+
+def _event(type, job_id, status, previous, job):
+    return {'type': type, 'job_id': job_id, 'status': status,
+            'previous': previous, 'job': job}
@@ -40,6 +40,12 @@ __version__ = 'This value will be overridden by exec.'
 exec(open('gengo/_version.py').read())
 
 extras_require = {
+    'async': [
+        'aiohttp',
+    ],
+    'fastjson': [
+        'orjson; python_version >= "3.6"',
+    ],
     'test': [
         'coverage',
         'docutils',
@@ -60,7 +66,10 @@ setup(
     include_package_data=True,
 
     # Package dependencies.
-    install_requires=["requests >= 2.2.1"],
+    install_requires=[
+        "requests >= 2.2.1",
+        'futures; python_version < "3.0"',
+    ],
     extras_require=extras_require,
 
     # Metadata for PyPI.
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+# All code provided from the http://gengo.com site, such as API example code
+# and libraries, is provided under the New BSD license unless otherwise
+# noted. Details are below.
+#
+# New BSD License
+# Copyright (c) 2009-2020, Gengo, Inc.
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are
+# met:
+#
+# Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+# Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation
+# and/or other materials provided with the distribution.
+# Neither the name of Gengo, Inc. nor the names of its contributors may
+# be used to endorse or promote products derived from this software
+# without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS
+# IS" AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO,
+# THE IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR
+# PURPOSE ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT OWNER OR
+# CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL,
+# EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR
+# PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF
+# LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING
+# NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""
+Tests for AsyncGengo against a local aiohttp server. Uses async/await
+syntax, so test_aio.py only imports it on Python 3.7+.
+"""
+import asyncio
+import hmac
+import json
+import unittest
+from hashlib import sha1
+
+try:
+    from aiohttp import web
+    from aiohttp.test_utils import TestServer
+except ImportError:
+    web = None
+
+from gengo import GengoAuthError, GengoError
+
+API_PUBKEY = 'dummypublickey'
+API_PRIVKEY = 'dummyprivatekey'
+
+
+@unittest.skipIf(web is None, 'aiohttp is not installed')
+class TestAsyncGengo(unittest.TestCase):
+
+    def setUp(self):
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def _handler(self, request):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            params = dict(request.query)
+            for key, value in (await request.post()).items():
+                if hasattr(value, 'file'):
+                    value = (value.filename, value.file.read())
+                params[key] = value
+            self.requests.append((request.method, request.path, params))
+            expected = hmac.new(API_PRIVKEY.encode('utf-8'),
+                                params['ts'].encode('utf-8'),
+                                sha1).hexdigest()
+            if params.get('api_sig') != expected:
+                body = {'opstat': 'error',
+                        'err': {'code': 1000, 'msg': 'bad signature'}}
+            elif request.path.endswith('/missing'):
+                body = {'opstat': 'error',
+                        'err': {'code': 404, 'msg': 'Not Found'}}
+            else:
+                body = {'opstat': 'ok', 'response': {'path': request.path}}
+            return web.json_response(body)
+        finally:
+            self.in_flight -= 1
+
+    def _run(self, scenario, **kwargs):
+        from gengo import AsyncGengo
+
+        async def main():
+            app = web.Application()
+            app.router.add_route('*', '/{tail:.*}', self._handler)
+            server = TestServer(app)
+            await server.start_server()
+            try:
+                api_url = 'http://{0}:{1}/{{version}}'.format(
+                    server.host, server.port)
+                async with AsyncGengo(public_key=API_PUBKEY,
+                                      private_key=kwargs.pop(
+                                          'private_key', API_PRIVKEY),
+                                      api_url=api_url, **kwargs) as gengo:
+                    return await scenario(gengo)
+            finally:
+                await server.close()
+        return asyncio.run(main())
+
+    def test_getRequestIsSigned(self):
+        async def scenario(gengo):
+            return await gengo.getTranslationJob(id=42)
+        resp = self._run(scenario)
+        self.assertEqual(resp['response']['path'], '/v2/translate/job/42')
+        method, path, params = self.requests[0]
+        self.assertEqual(method, 'GET')
+        self.assertEqual(params['api_key'], API_PUBKEY)
+
+    def test_postSendsJsonData(self):
+        async def scenario(gengo):
+            return await gengo.postTranslationJobComment(
+                id=7, comment={'body': 'hello'})
+        self._run(scenario)
+        method, path, params = self.requests[0]
+        self.assertEqual(method, 'POST')
+        self.assertEqual(json.loads(params['data']), {'body': 'hello'})
+
+    def test_fileAttachmentsAreStreamed(self):
+        async def scenario(gengo):
+            return await gengo.postTranslationJobComment(
+                id=7, comment={'body': 'hello'},
+                file_attachments=['./examples/testfiles/test_file1.txt'])
+        self._run(scenario)
+        method, path, params = self.requests[0]
+        self.assertEqual(params['body'], ('body', b'hello'))
+        with open('./examples/testfiles/test_file1.txt', 'rb') as f:
+            self.assertEqual(params['file_attachments'],
+                             ('test_file1.txt', f.read()))
+
+    def test_errorMapping(self):
+        async def scenario(gengo):
+            await gengo.getTranslationJob(id='missing')
+        self.assertRaises(GengoError, self._run, scenario)
+        self.assertRaises(GengoAuthError, self._run, scenario,
+                          private_key='wrong')
+
+    def test_boundedConcurrency(self):
+        async def scenario(gengo):
+            return await asyncio.gather(*[
+                gengo.getTranslationJob(id=i) for i in range(30)
+            ])
+        results = self._run(scenario, max_concurrency=5)
+        self.assertEqual(len(results), 30)
+        self.assertLessEqual(self.max_in_flight, 5)
+        self.assertGreater(self.max_in_flight, 1)
+
+
+class TestAsgiCallbackApp(unittest.TestCase):
+
+    def test_callbackDelivery(self):
+        from gengo.aio import asgiCallbackApp
+        from gengo.callbacks import CallbackApp
+        events = []
+        callback_app = CallbackApp(events.append)
+        app = asgiCallbackApp(callback_app)
+
+        async def request(method, body):
+            messages = [{'type': 'http.request', 'body': body[:5],
+                         'more_body': True},
+                        {'type': 'http.request', 'body': body[5:]}]
+            sent = []
+
+            async def receive():
+                return messages.pop(0)
+
+            async def send(message):
+                sent.append(message)
+            await app({'type': 'http', 'method': method, 'headers': [
+                (b'content-type', b'application/x-www-form-urlencoded')]},
+                receive, send)
+            return sent[0]['status']
+
+        body = b'job=%7B%22job_id%22%3A+1%2C%22status%22%3A%22pending%22%7D'
+        self.assertEqual(asyncio.run(request('POST', body)), 200)
+        self.assertEqual(asyncio.run(request('POST', body)), 200)
+        self.assertEqual(asyncio.run(request('PUT', body)), 405)
+        callback_app.close()
+        self.assertEqual([(e['job_id'], e['status']) for e in events],
+                         [('1', 'pending')])
+
+
+class TestSyncOnlyHelpers(unittest.TestCase):
+
+    def test_raiseTypeError(self):
+        from gengo import AsyncGengo
+        client = AsyncGengo(public_key=API_PUBKEY, private_key=API_PRIVKEY)
+        with self.assertRaises(TypeError) as cm:
+            client.postTranslationJobsBulk(jobs={'jobs': {}})
+        self.assertIn('postTranslationJobsBulk', str(cm.exception))
+        for name, args in [('updateTranslationJobsBulk', ({},)),
+                           ('iterTranslationJobs', ()),
+                           ('iterTranslationJobComments', (1,)),
+                           ('iterOrderComments', (1,)),
+                           ('streamTranslationJobs', ()),
+                           ('streamTranslationJobBatch', ('1',)),
+                           ('streamTranslationOrderJobs', (1,))]:
+            self.assertRaises(TypeError, getattr(client, name), *args)
+
+
+if __name__ == '__main__':
+    unittest.main()
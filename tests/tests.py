@@ -37,6 +37,16 @@ A set of tests for the Gengo API. They all require an internet connection.
 """
 from __future__ import absolute_import, print_function
 
+from hashlib import sha1
+import hmac
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
 import unittest
 try:
     import mock
@@ -45,7 +55,25 @@ except ImportError:
 
 import requests
 
+import gengo.batching
+import gengo.bulk
+import gengo.cache
+import gengo.callbacks
+import gengo.catalog
+import gengo.codec
+import gengo.estimate
+import gengo.fakeserver
+import gengo.hooks
+import gengo.idempotency
+import gengo.metrics
+import gengo.ratelimit
+import gengo.signing
+import gengo.streaming
+import gengo.sync
+import gengo.mirror
 import gengo.mockdb
+import gengo.paging
+import gengo.multipart
 from gengo import Gengo, GengoError, GengoAuthError
 
 API_PUBKEY = 'dummypublickey'
@@ -77,6 +105,144 @@ class TestGengoCore(unittest.TestCase):
         self.assertRaises(GengoAuthError, gengo.getAccountStats)
 
 
+class TestEndpointMethods(unittest.TestCase):
+
+    """
+    Tests that apihash entries are compiled into methods with pre-parsed
+    URL templates.
+    """
+    def setUp(self):
+        self.gengo = Gengo(public_key=API_PUBKEY, private_key=API_PRIVKEY)
+        self.response = mock.Mock()
+        self.response.json.return_value = {'opstat': 'ok'}
+        self.send = mock.Mock(return_value=self.response)
+        self.gengo._send = self.send
+
+    def test_endpointsAreClassMethods(self):
+        for api_call in gengo.mockdb.apihash:
+            self.assertIn(api_call, Gengo.__dict__)
+        self.assertEqual(Gengo.getTranslationJob.__name__,
+                         'getTranslationJob')
+
+    def test_urlTemplate(self):
+        self.gengo.getTranslationJobRevision(id=12, revision_id=3,
+                                             pre_mt=1)
+        url = self.send.call_args[0][1]
+        self.assertTrue(url.startswith(
+            'https://api.gengo.com/v2/translate/job/12/revision/3?'))
+        self.assertIn('pre_mt=1', url)
+        self.assertNotIn('revision_id', url)
+
+    def test_baseURLFollowsApiUrl(self):
+        self.gengo.getAccountBalance()
+        self.gengo.api_url = 'http://localhost/{version}'
+        self.gengo.getAccountBalance()
+        self.assertTrue(self.send.call_args[0][1].startswith(
+            'http://localhost/v2/account/balance?'))
+
+    def test_lateAddedEndpoint(self):
+        with mock.patch.dict(gengo.mockdb.apihash, {
+                'getThing': {'url': '/thing/{{id}}', 'method': 'GET'}}):
+            try:
+                self.gengo.getThing(id=5)
+            finally:
+                delattr(Gengo, 'getThing')
+        self.assertIn('/v2/thing/5?', self.send.call_args[0][1])
+
+
+class TestPayloadCopying(unittest.TestCase):
+
+    """
+    Tests that building a request never modifies the caller's payload and
+    only copies what it rewrites.
+    """
+    def setUp(self):
+        self.gengo = Gengo(public_key=API_PUBKEY, private_key=API_PRIVKEY)
+
+    def test_callerPayloadUnchanged(self):
+        jobs = {
+            'job_1': {'type': 'text', 'body_src': 'one',
+                      'url_attachments': [{'url': 'http://a'}]},
+            'job_2': {'type': 'file', 'file_path':
+                      './examples/testfiles/test_file1.txt'},
+            'job_3': {'type': 'text', 'body_src': 'three'},
+            'comment': 'order comment',
+            'url_attachments': [{'url': 'http://b'}],
+        }
+        snapshot = repr(sorted(jobs.items()))
+        fn, base, query_params, post_data, file_data = \
+            self.gengo._prepareRequest(
+                Gengo.determineTranslationCost.endpoint, {'jobs': jobs})
+        self.assertEqual(file_data, [
+            ('file_job_2', './examples/testfiles/test_file1.txt',
+             ('path', './examples/testfiles/test_file1.txt'), 'text/plain')
+        ])
+        self.assertEqual(repr(sorted(jobs.items())), snapshot)
+
+        sent = post_data['jobs']['jobs']
+        self.assertEqual(post_data['jobs']['comment'], 'order comment')
+        self.assertIn('attachments', post_data['jobs'])
+        self.assertIn('attachments', sent['job_1'])
+        self.assertNotIn('url_attachments', sent['job_1'])
+        self.assertEqual(sent['job_2']['file_key'], 'file_job_2')
+        self.assertNotIn('file_path', sent['job_2'])
+        # Jobs that need no rewriting are passed through as they are.
+        self.assertIs(sent['job_3'], jobs['job_3'])
+
+    def test_untouchedJobsAreNotCopied(self):
+        inner = {'job_1': {'type': 'text', 'body_src': 'one'}}
+        post_data = self.gengo._prepareRequest(
+            Gengo.postTranslationJobs.endpoint,
+            {'jobs': {'jobs': inner, 'as_group': 1}})[3]
+        self.assertIs(post_data['jobs']['jobs'], inner)
+        self.assertEqual(post_data['jobs']['as_group'], 1)
+
+    def test_commentAttachmentsCopied(self):
+        comment = {'body': 'hi', 'url_attachments': [{'url': 'http://a'}]}
+        post_data = self.gengo._prepareRequest(
+            Gengo.postTranslationJobComment.endpoint,
+            {'id': 1, 'comment': comment})[3]
+        self.assertIn('url_attachments', comment)
+        self.assertIn('attachments', post_data['comment'])
+
+
+class TestSession(unittest.TestCase):
+
+    """
+    Tests the pooled HTTP session owned by each Gengo instance.
+    """
+    def test_poolConfiguration(self):
+        gengo = Gengo(public_key=API_PUBKEY, private_key=API_PRIVKEY,
+                      pool_connections=3, pool_maxsize=7)
+        adapter = gengo.session.get_adapter('https://api.gengo.com')
+        self.assertEqual(adapter._pool_connections, 3)
+        self.assertEqual(adapter._pool_maxsize, 7)
+        self.assertNotIn('Connection', gengo.headers)
+
+    def test_keepAliveDisabled(self):
+        gengo = Gengo(public_key=API_PUBKEY, private_key=API_PRIVKEY,
+                      keep_alive=False)
+        self.assertEqual(gengo.headers['Connection'], 'close')
+
+    def test_contextManagerClosesSession(self):
+        with mock.patch.object(requests.Session, 'close') as close:
+            with Gengo(public_key=API_PUBKEY,
+                       private_key=API_PRIVKEY) as gengo:
+                self.assertIsInstance(gengo.session, requests.Session)
+            close.assert_called_once_with()
+
+    def test_sessionIsReused(self):
+        json_mock = mock.Mock()
+        json_mock.json.return_value = {'opstat': 'ok'}
+        gengo = Gengo(public_key=API_PUBKEY, private_key=API_PRIVKEY)
+        with mock.patch.object(requests.Session, 'get',
+                               return_value=json_mock) as get:
+            gengo.getAccountStats()
+            gengo.getAccountBalance()
+        self.assertEqual(get.call_count, 2)
+        self.assertFalse(json_mock.connection.close.called)
+
+
 class TestAccountMethods(unittest.TestCase):
 
     """
@@ -92,7 +258,8 @@ class TestAccountMethods(unittest.TestCase):
         self.json_mock = mock.Mock()
         self.json_mock.json.return_value = {'opstat': 'ok'}
         self.getMock = RequestsMock(return_value=self.json_mock)
-        self.requestsPatch = mock.patch.object(requests, 'get', self.getMock)
+        self.requestsPatch = mock.patch.object(
+            requests.Session, 'get', self.getMock)
         self.requestsPatch.start()
 
     def tearDown(self):
@@ -125,7 +292,8 @@ class TestLanguageServiceMethods(unittest.TestCase):
         self.json_mock = mock.Mock()
         self.json_mock.json.return_value = {'opstat': 'ok'}
         self.getMock = RequestsMock(return_value=self.json_mock)
-        self.requestsPatch = mock.patch.object(requests, 'get', self.getMock)
+        self.requestsPatch = mock.patch.object(
+            requests.Session, 'get', self.getMock)
         self.requestsPatch.start()
 
     def tearDown(self):
@@ -168,7 +336,8 @@ class TestPostTranslationJobComment(unittest.TestCase):
         self.json_mock = mock.Mock()
         self.json_mock.json.return_value = {'opstat': 'ok'}
         self.getMock = RequestsMock(return_value=self.json_mock)
-        self.requestsPatch = mock.patch.object(requests, 'post', self.getMock)
+        self.requestsPatch = mock.patch.object(
+            requests.Session, 'post', self.getMock)
         self.requestsPatch.start()
 
     def tearDown(self):
@@ -204,7 +373,8 @@ class TestPostTranslationJobCommentWithAttachments(unittest.TestCase):
         self.json_mock = mock.Mock()
         self.json_mock.json.return_value = {'opstat': 'ok'}
         self.getMock = RequestsMock(return_value=self.json_mock)
-        self.requestsPatch = mock.patch.object(requests, 'post', self.getMock)
+        self.requestsPatch = mock.patch.object(
+            requests.Session, 'post', self.getMock)
         self.requestsPatch.start()
 
     def tearDown(self):
@@ -248,7 +418,8 @@ class TestTranslationJobFlowFileUpload(unittest.TestCase):
         self.json_mock = mock.Mock()
         self.json_mock.json.return_value = {'opstat': 'ok'}
         self.getMock = RequestsMock(return_value=self.json_mock)
-        self.requestsPatch = mock.patch.object(requests, 'get', self.getMock)
+        self.requestsPatch = mock.patch.object(
+            requests.Session, 'get', self.getMock)
         self.requestsPatch.start()
 
     def tearDown(self):
@@ -326,7 +497,8 @@ class TestTranslationJobFlowGroupJob(unittest.TestCase):
         self.json_mock = mock.Mock()
         self.json_mock.json.return_value = {'opstat': 'ok'}
         self.getMock = RequestsMock(return_value=self.json_mock)
-        self.requestsPatch = mock.patch.object(requests, 'get', self.getMock)
+        self.requestsPatch = mock.patch.object(
+            requests.Session, 'get', self.getMock)
         self.requestsPatch.start()
 
     def tearDown(self):
@@ -365,7 +537,8 @@ class TestTranslationJobFlowMixedOrder(unittest.TestCase):
         self.json_mock = mock.Mock()
         self.json_mock.json.return_value = {'opstat': 'ok'}
         self.getMock = RequestsMock(return_value=self.json_mock)
-        self.requestsPatch = mock.patch.object(requests, 'get', self.getMock)
+        self.requestsPatch = mock.patch.object(
+            requests.Session, 'get', self.getMock)
         self.requestsPatch.start()
 
     def tearDown(self):
@@ -445,7 +618,8 @@ class TestGlossaryFunctions(unittest.TestCase):
         self.json_mock = mock.Mock()
         self.json_mock.json.return_value = {'opstat': 'ok'}
         self.getMock = RequestsMock(return_value=self.json_mock)
-        self.requestsPatch = mock.patch.object(requests, 'get', self.getMock)
+        self.requestsPatch = mock.patch.object(
+            requests.Session, 'get', self.getMock)
         self.requestsPatch.start()
 
     def tearDown(self):
@@ -486,7 +660,8 @@ class TestPreferredTranslatorsFunction(unittest.TestCase):
         self.json_mock = mock.Mock()
         self.json_mock.json.return_value = {'opstat': 'ok'}
         self.getMock = RequestsMock(return_value=self.json_mock)
-        self.requestsPatch = mock.patch.object(requests, 'get', self.getMock)
+        self.requestsPatch = mock.patch.object(
+            requests.Session, 'get', self.getMock)
         self.requestsPatch.start()
 
     def tearDown(self):
@@ -587,5 +762,1685 @@ class TestResponseHandling(unittest.TestCase):
             lambda: self.gengo._handleResponse(self.response)
         )
 
+
+def jsonResponse(body, status_code=200):
+    response = mock.Mock()
+    response.status_code = status_code
+    response.json.return_value = body
+    return response
+
+
+class TestBulkSubmission(unittest.TestCase):
+
+    """
+    Tests splitting large orders into batches for postTranslationJobs.
+    """
+    def setUp(self):
+        self.gengo = Gengo(public_key=API_PUBKEY, private_key=API_PRIVKEY)
+        self.orders = []
+        self.lock = threading.Lock()
+        self.gengo._send = self._send
+
+    def _send(self, method, url, **kwargs):
+        order = json.loads(kwargs['data']['data'])
+        with self.lock:
+            self.orders.append(order)
+            order_id = len(self.orders)
+        if 'bad' in order['jobs']:
+            return jsonResponse({'opstat': 'error', 'err': {
+                'bad': [{'code': 1350, 'msg': 'body_src is required'}],
+            }})
+        return jsonResponse({'opstat': 'ok', 'response': {
+            'order_id': order_id, 'job_count': len(order['jobs']),
+            'credits_used': 1.5, 'currency': 'USD'}})
+
+    def _jobs(self, count, size=10):
+        return dict(('job_{0}'.format(i), {'body_src': 'x' * size})
+                    for i in range(count))
+
+    def test_chunkJobsByCount(self):
+        batches = list(gengo.bulk.chunkJobs(self._jobs(120), max_jobs=50))
+        self.assertEqual([len(b) for b in batches], [50, 50, 20])
+        self.assertEqual(list(batches[0])[0], 'job_0')
+
+    def test_chunkJobsBySize(self):
+        jobs = self._jobs(10, size=1000)
+        for batch in gengo.bulk.chunkJobs(jobs, max_bytes=3500):
+            self.assertLessEqual(
+                len(json.dumps(batch, separators=(',', ':'))), 3500)
+        # Oversized jobs still go out, one per batch.
+        self.assertEqual(
+            len(list(gengo.bulk.chunkJobs(jobs, max_bytes=10))), 10)
+
+    def test_mergedResult(self):
+        result = self.gengo.postTranslationJobsBulk(
+            {'jobs': self._jobs(120), 'comment': 'hi', 'as_group': 1,
+             'reference_id': 'ref'}, max_jobs=50, max_workers=3)
+        self.assertEqual(sorted(result['order_ids']), [1, 2, 3])
+        self.assertEqual(result['job_count'], 120)
+        self.assertEqual(result['credits_used'], 4.5)
+        self.assertEqual(result['currency'], 'USD')
+        self.assertEqual(result['errors'], {})
+        for order in self.orders:
+            self.assertEqual(order['comment'], 'hi')
+            self.assertEqual(order['as_group'], 1)
+            self.assertEqual(order['reference_id'], 'ref')
+
+    def test_flatOrderAndErrors(self):
+        jobs = self._jobs(3)
+        jobs['bad'] = {}
+        jobs['comment'] = 'flat'
+        result = self.gengo.postTranslationJobsBulk(jobs, max_jobs=2)
+        self.assertEqual(result['job_count'], 2)
+        self.assertEqual(len(result['order_ids']), 1)
+        self.assertEqual(sorted(result['errors']), ['bad', 'job_2'])
+        self.assertEqual(result['errors']['bad'].error_code, 1350)
+        self.assertTrue(all(o['comment'] == 'flat' for o in self.orders))
+
+
+class TestJobLoader(unittest.TestCase):
+
+    """
+    Tests coalescing getTranslationJob lookups into batch calls.
+    """
+    def setUp(self):
+        self.gengo = Gengo(public_key=API_PUBKEY, private_key=API_PRIVKEY)
+        self.urls = []
+        self.gengo._send = self._send
+
+    def _send(self, method, url, **kwargs):
+        self.urls.append(url)
+        ids = url.split('/translate/jobs/')[1].split('?')[0].split(',')
+        return jsonResponse({'opstat': 'ok', 'response': {'jobs': [
+            {'job_id': job_id, 'status': 'available'}
+            for job_id in ids if job_id != '404']}})
+
+    def test_concurrentLoadsShareOneRequest(self):
+        loader = gengo.batching.JobLoader(self.gengo, wait=0.05)
+        results = {}
+
+        def lookup(job_id):
+            results[job_id] = loader.get(job_id, timeout=5)
+
+        threads = [threading.Thread(target=lookup, args=(i,))
+                   for i in range(1, 21)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        loader.close()
+        self.assertEqual(len(self.urls), 1)
+        self.assertEqual(results[7]['job_id'], '7')
+        self.assertEqual(loader.loads, 20)
+
+    def test_maxBatchSizeAndDuplicates(self):
+        with gengo.batching.JobLoader(self.gengo, max_batch_size=3,
+                                      wait=10) as loader:
+            futures = loader.loadMany([1, 2, 2, 3, 4])
+        self.assertEqual(len(self.urls), 2)
+        self.assertTrue(any('/translate/jobs/1,2,3?' in url
+                            for url in self.urls))
+        self.assertEqual(futures[1].result(), futures[2].result())
+        self.assertEqual(futures[4].result()['job_id'], '4')
+        self.assertEqual(loader.batches, 2)
+
+    def test_missingJob(self):
+        with gengo.batching.JobLoader(self.gengo) as loader:
+            missing = loader.load(404)
+            found = loader.load(1)
+        self.assertRaises(GengoError, missing.result)
+        self.assertEqual(found.result()['job_id'], '1')
+
+    def test_loadAfterClose(self):
+        loader = gengo.batching.JobLoader(self.gengo)
+        loader.close()
+        with self.assertRaises(RuntimeError) as cm:
+            loader.load(1)
+        self.assertEqual(str(cm.exception), 'JobLoader is closed')
+        self.assertEqual(loader.loads, 0)
+
+
+class TestResponseCache(unittest.TestCase):
+
+    """
+    Tests the opt-in response cache for reference endpoints.
+    """
+    def setUp(self):
+        self.cache = gengo.cache.ResponseCache()
+        self.gengo = Gengo(public_key=API_PUBKEY, private_key=API_PRIVKEY,
+                           cache=self.cache)
+        self.send = mock.Mock(side_effect=lambda *a, **k: jsonResponse(
+            {'opstat': 'ok', 'response': [{'lc': 'en'}]}))
+        self.gengo._send = self.send
+
+    def test_hitsAndMisses(self):
+        first = self.gengo.getServiceLanguages()
+        first['response'].append('mutated by caller')
+        second = self.gengo.getServiceLanguages()
+        self.assertEqual(second['response'], [{'lc': 'en'}])
+        self.assertEqual(self.send.call_count, 1)
+        self.gengo.getGlossary(id=1)
+        self.gengo.getGlossary(id=2)
+        self.assertEqual(self.send.call_count, 3)
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 3))
+
+    def test_uncachedEndpoint(self):
+        self.gengo.getAccountBalance()
+        self.gengo.getAccountBalance()
+        self.assertEqual(self.send.call_count, 2)
+
+    def test_ttlAndInvalidation(self):
+        self.cache.ttls['getGlossaryList'] = 10
+        with mock.patch('gengo.cache.time', return_value=1000):
+            self.gengo.getGlossaryList()
+            self.gengo.getServiceLanguages()
+        with mock.patch('gengo.cache.time', return_value=1011):
+            self.gengo.getGlossaryList()
+            self.gengo.getServiceLanguages()
+            self.assertEqual(self.send.call_count, 3)
+            self.cache.invalidate('getServiceLanguages')
+            self.gengo.getServiceLanguages()
+            self.gengo.getGlossaryList()
+        self.assertEqual(self.send.call_count, 4)
+
+    def test_lruEviction(self):
+        # Room for two entries.
+        self.cache.max_bytes = 100
+        for glossary_id in (0, 1, 0, 2, 0):
+            self.gengo.getGlossary(id=glossary_id)
+        self.assertEqual(self.cache.stats()['evictions'], 1)
+        self.assertEqual(self.send.call_count, 3)
+        self.gengo.getGlossary(id=1)
+        self.assertEqual(self.send.call_count, 4)
+
+    def test_diskBackend(self):
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        self.gengo.cache = gengo.cache.ResponseCache(
+            backend=gengo.cache.DiskCache(path))
+        self.gengo.getServiceLanguagePairs()
+        # A fresh worker with an empty memory cache.
+        self.gengo.cache = gengo.cache.ResponseCache(
+            backend=gengo.cache.DiskCache(path))
+        self.gengo.getServiceLanguagePairs()
+        self.assertEqual(self.send.call_count, 1)
+        self.gengo.cache.invalidate()
+        self.gengo.getServiceLanguagePairs()
+        self.assertEqual(self.send.call_count, 2)
+
+    def test_diskInvalidateOnlyTouchesItsOwnFiles(self):
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        backend = gengo.cache.DiskCache(path)
+        backend.set('key', (time.time() + 60, '{}'))
+        with open(os.path.join(path, 'notes.json'), 'w') as f:
+            f.write('{"key": "[0, 0, \\"getGlossary\\"]"}')
+        stale = os.path.join(path, gengo.cache._TMP_PREFIX + 'stale')
+        fresh = os.path.join(path, gengo.cache._TMP_PREFIX + 'fresh')
+        for name in (stale, fresh):
+            open(name, 'w').close()
+        os.utime(stale, (0, 0))
+        backend.invalidate('getGlossary')
+        self.assertEqual(len(os.listdir(path)), 3)
+        backend.invalidate()
+        self.assertEqual(sorted(os.listdir(path)),
+                         sorted(['notes.json', os.path.basename(fresh)]))
+
+
+LANGUAGE_PAIRS = [
+    {'lc_src': 'en', 'lc_tgt': 'ja', 'tier': 'standard',
+     'unit_price': 0.05, 'currency': 'USD'},
+    {'lc_src': 'en', 'lc_tgt': 'ja', 'tier': 'pro',
+     'unit_price': 0.1, 'currency': 'USD'},
+    {'lc_src': 'ja', 'lc_tgt': 'en', 'tier': 'standard',
+     'unit_price': 0.03, 'currency': 'USD'},
+]
+LANGUAGES = [
+    {'language': 'English', 'lc': 'en', 'unit_type': 'word'},
+    {'language': 'Japanese', 'lc': 'ja', 'unit_type': 'character'},
+]
+
+
+class TestLanguageCatalog(unittest.TestCase):
+
+    """
+    Tests the indexed language pair catalog.
+    """
+    def setUp(self):
+        self.catalog = gengo.catalog.LanguageCatalog(LANGUAGE_PAIRS,
+                                                     LANGUAGES)
+
+    def test_lookups(self):
+        self.assertEqual(len(self.catalog), 3)
+        self.assertEqual(self.catalog.price('en', 'ja', 'pro'),
+                         (0.1, 'USD'))
+        self.assertIsNone(self.catalog.price('en', 'de', 'pro'))
+        self.assertIn(('ja', 'en', 'standard'), self.catalog)
+        self.assertEqual(self.catalog.targetsFor('en'), frozenset(['ja']))
+        self.assertEqual(self.catalog.tiersFor('en', 'ja'),
+                         frozenset(['standard', 'pro']))
+        self.assertEqual(self.catalog.unitType('ja'), 'character')
+
+    def test_validateJobs(self):
+        problems = self.catalog.validateJobs({
+            'ok': {'lc_src': 'en', 'lc_tgt': 'ja', 'tier': 'pro'},
+            'pair': {'lc_src': 'en', 'lc_tgt': 'de', 'tier': 'pro'},
+            'tier': {'lc_src': 'ja', 'lc_tgt': 'en', 'tier': 'pro'},
+            'missing': {'lc_src': 'ja'},
+            'comment': 'order level options are skipped',
+        })
+        self.assertEqual(sorted(problems), ['missing', 'pair', 'tier'])
+
+    def test_refreshFromClient(self):
+        client = Gengo(public_key=API_PUBKEY, private_key=API_PRIVKEY)
+        pairs = LANGUAGE_PAIRS[1:] + [
+            {'lc_src': 'en', 'lc_tgt': 'de', 'tier': 'standard',
+             'unit_price': 0.05, 'currency': 'USD'}]
+        pairs[1] = dict(pairs[1], unit_price=0.04)
+
+        def send(method, url, **kwargs):
+            if 'language_pairs' in url:
+                return jsonResponse({'opstat': 'ok', 'response': pairs})
+            return jsonResponse({'opstat': 'ok', 'response': LANGUAGES})
+        client._send = send
+
+        changes = self.catalog.refresh(client)
+        self.assertEqual(changes, {'added': 1, 'removed': 1, 'changed': 1})
+        self.assertEqual(self.catalog.tiersFor('en', 'ja'),
+                         frozenset(['pro']))
+        self.assertEqual(self.catalog.targetsFor('en'),
+                         frozenset(['ja', 'de']))
+        self.assertEqual(self.catalog.price('ja', 'en', 'standard'),
+                         (0.04, 'USD'))
+
+
+class TestCostEstimator(unittest.TestCase):
+
+    """
+    Tests local cost estimates from cached pricing.
+    """
+    def setUp(self):
+        self.estimator = gengo.estimate.CostEstimator(
+            gengo.catalog.LanguageCatalog(LANGUAGE_PAIRS, LANGUAGES))
+
+    def test_wordAndCharacterCounts(self):
+        result = self.estimator.estimate({'jobs': {
+            'en': {'type': 'text', 'body_src': 'one two  three\nfour',
+                   'lc_src': 'en', 'lc_tgt': 'ja', 'tier': 'standard'},
+            'ja': {'type': 'text', 'body_src': u'\u3053\u3093 \u306b',
+                   'lc_src': 'ja', 'lc_tgt': 'en', 'tier': 'standard'},
+            'bad': {'type': 'text', 'body_src': 'x',
+                    'lc_src': 'en', 'lc_tgt': 'fr', 'tier': 'standard'},
+            'file': {'type': 'file', 'file_path': 'a.docx',
+                     'lc_src': 'en', 'lc_tgt': 'ja', 'tier': 'standard'},
+        }})
+        self.assertEqual(result['jobs']['en']['unit_count'], 4)
+        self.assertEqual(result['jobs']['ja']['unit_count'], 3)
+        self.assertEqual(result['unit_count'], 7)
+        self.assertEqual(result['credits'], 0.29)
+        self.assertEqual(result['currency'], 'USD')
+        self.assertEqual(list(result['unpriced']), ['bad'])
+        self.assertEqual(result['needs_quote'], ['file'])
+
+    def test_fileJobsQuotedByServer(self):
+        client = Gengo(public_key=API_PUBKEY, private_key=API_PRIVKEY)
+        client.determineTranslationCost = mock.Mock(return_value={
+            'opstat': 'ok', 'response': {'jobs': {'file': {
+                'unit_count': 100, 'credits': 5.0, 'currency': 'USD'}}}})
+        result = self.estimator.estimate({
+            'text': {'type': 'text', 'body_src': 'a b',
+                     'lc_src': 'en', 'lc_tgt': 'ja', 'tier': 'pro'},
+            'file': {'type': 'file', 'file_path': 'a.docx',
+                     'lc_src': 'en', 'lc_tgt': 'ja', 'tier': 'pro'},
+        }, gengo=client)
+        quoted = client.determineTranslationCost.call_args[1]['jobs']
+        self.assertEqual(list(quoted['jobs']), ['file'])
+        self.assertEqual(result['needs_quote'], [])
+        self.assertEqual(result['credits'], 5.2)
+        self.assertEqual(result['unit_count'], 102)
+
+
+class TestRetriesAndRateLimits(unittest.TestCase):
+
+    """
+    Tests client side throttling and retries of idempotent calls.
+    """
+    def setUp(self):
+        self.gengo = Gengo(public_key=API_PUBKEY, private_key=API_PRIVKEY,
+                           max_retries=2, backoff_factor=1)
+        self.sleepPatch = mock.patch('gengo.gengo.sleep')
+        self.sleep = self.sleepPatch.start()
+        self.ok = jsonResponse({'opstat': 'ok'})
+        self.unavailable = jsonResponse(
+            {'opstat': 'error', 'err': {'code': 503, 'msg': 'Busy'}}, 503)
+        self.unavailable.headers = {}
+
+    def tearDown(self):
+        self.sleepPatch.stop()
+
+    def test_retryIdempotentCalls(self):
+        self.gengo._send = mock.Mock(side_effect=[
+            self.unavailable, requests.ConnectionError('reset'), self.ok])
+        self.assertEqual(self.gengo.getAccountBalance(), {'opstat': 'ok'})
+        self.assertEqual(self.gengo._send.call_count, 3)
+        self.assertEqual(self.gengo.stats['retried'], 2)
+        for call in self.sleep.call_args_list:
+            self.assertLessEqual(call[0][0], 2)
+
+    def test_givesUpAfterMaxRetries(self):
+        self.gengo._send = mock.Mock(return_value=self.unavailable)
+        self.assertRaises(GengoError, self.gengo.getAccountBalance)
+        self.assertEqual(self.gengo._send.call_count, 3)
+
+    def test_noRetryForPost(self):
+        self.gengo._send = mock.Mock(return_value=self.unavailable)
+        self.assertRaises(GengoError, self.gengo.postTranslationJobs,
+                          jobs={})
+        self.assertEqual(self.gengo._send.call_count, 1)
+
+    def test_retryAfter(self):
+        self.unavailable.headers = {'Retry-After': '7'}
+        self.gengo._send = mock.Mock(side_effect=[self.unavailable,
+                                                  self.ok])
+        self.gengo.getAccountBalance()
+        self.sleep.assert_called_once_with(7.0)
+
+    def test_retryAfterIsCapped(self):
+        self.unavailable.headers = {'Retry-After': '86400'}
+        self.gengo._send = mock.Mock(side_effect=[self.unavailable,
+                                                  self.ok])
+        self.gengo.getAccountBalance()
+        self.sleep.assert_called_once_with(self.gengo.retry.backoff_max)
+
+    def test_tokenBucketThrottles(self):
+        with mock.patch('gengo.ratelimit.time', return_value=100.0):
+            gengo_client = Gengo(public_key=API_PUBKEY,
+                                 private_key=API_PRIVKEY,
+                                 rate_limits={'read': (1, 2)})
+            gengo_client._send = mock.Mock(return_value=self.ok)
+            for _ in range(4):
+                gengo_client.getAccountBalance()
+            # Writes are not limited.
+            gengo_client.postTranslationJobs(jobs={})
+        waits = [call[0][0] for call in self.sleep.call_args_list]
+        self.assertEqual(waits, [1.0, 2.0])
+        self.assertEqual(gengo_client.stats['throttled'], 2)
+        self.assertEqual(gengo_client.stats['throttled_seconds'], 3.0)
+
+
+class TestSafeSubmitter(unittest.TestCase):
+
+    """
+    Tests idempotent retries of postTranslationJobs and postOrderComment.
+    """
+    def setUp(self):
+        self.client = Gengo(public_key=API_PUBKEY, private_key=API_PRIVKEY)
+        self.submitter = gengo.idempotency.SafeSubmitter(self.client)
+        self.jobs = {
+            'job_1': {'type': 'text', 'body_src': 'one', 'lc_src': 'en',
+                      'lc_tgt': 'ja', 'tier': 'standard'},
+            'job_2': {'type': 'text', 'body_src': 'two', 'lc_src': 'en',
+                      'lc_tgt': 'ja', 'tier': 'standard',
+                      'custom_data': 'my-own-id'},
+            'comment': 'order comment',
+        }
+        self.accepted = {'opstat': 'ok', 'response': {'order_id': 99}}
+
+    def _sentJobs(self, call):
+        return call[1]['jobs']['jobs']
+
+    def test_keysAreStamped(self):
+        self.client.postTranslationJobs = mock.Mock(
+            return_value=self.accepted)
+        result = self.submitter.postTranslationJobs(self.jobs)
+        self.assertEqual(result['skipped'], {})
+        call = self.client.postTranslationJobs.call_args
+        sent = self._sentJobs(call)
+        self.assertTrue(sent['job_1']['custom_data'].startswith('idem-'))
+        self.assertEqual(sent['job_2']['custom_data'], 'my-own-id')
+        self.assertNotIn('custom_data', self.jobs['job_1'])
+        self.assertEqual(call[1]['jobs']['comment'], 'order comment')
+
+        # A second submission of the same jobs is a no-op.
+        result = self.submitter.postTranslationJobs(self.jobs)
+        self.assertIsNone(result['response'])
+        self.assertEqual(result['skipped'], {'job_1': '99', 'job_2': '99'})
+        self.assertEqual(self.client.postTranslationJobs.call_count, 1)
+
+    def test_reconcileAfterTimeout(self):
+        self.client.postTranslationJobs = mock.Mock(
+            side_effect=requests.Timeout('timed out'))
+        self.assertRaises(requests.Timeout,
+                          self.submitter.postTranslationJobs, self.jobs)
+
+        # The server did create job_2 before the connection dropped.
+        self.client.getTranslationJobs = mock.Mock(return_value={
+            'opstat': 'ok', 'response': [{'job_id': 5, 'ctime': 1}]})
+        self.client.getTranslationJobBatch = mock.Mock(return_value={
+            'opstat': 'ok', 'response': {'jobs': [
+                {'job_id': 5, 'custom_data': 'my-own-id'}]}})
+        self.client.postTranslationJobs = mock.Mock(
+            return_value=self.accepted)
+        result = self.submitter.postTranslationJobs(self.jobs)
+        self.assertEqual(result['skipped'], {'job_2': '5'})
+        self.assertEqual(list(self._sentJobs(
+            self.client.postTranslationJobs.call_args)), ['job_1'])
+
+    def test_gatewayErrorPageIsAmbiguous(self):
+        page = mock.Mock(status_code=504, content=b'<html>Gateway Timeout',
+                         headers={})
+        with mock.patch.object(requests.Session, 'post', return_value=page):
+            self.assertRaises(GengoError, self.submitter.postTranslationJobs,
+                              self.jobs)
+        keys = [gengo.idempotency.jobKey(job)
+                for key, job in self.jobs.items() if key != 'comment']
+        states = self.submitter.ledger.states(keys)
+        self.assertEqual(len(states), 2)
+        self.assertEqual(set(state[0] for state in states.values()),
+                         set([gengo.idempotency.PENDING]))
+
+    def test_rejectionIsNotRecorded(self):
+        self.client.postTranslationJobs = mock.Mock(
+            side_effect=GengoError('body_src is required', 1350))
+        self.assertRaises(GengoError, self.submitter.postTranslationJobs,
+                          self.jobs)
+        self.client.postTranslationJobs = mock.Mock(
+            return_value=self.accepted)
+        self.client.getTranslationJobs = mock.Mock()
+        self.submitter.postTranslationJobs(self.jobs)
+        self.assertFalse(self.client.getTranslationJobs.called)
+        self.assertEqual(len(self._sentJobs(
+            self.client.postTranslationJobs.call_args)), 2)
+
+    def test_orderCommentReconciled(self):
+        self.client.postOrderComment = mock.Mock(
+            side_effect=requests.ConnectionError('reset'))
+        self.assertRaises(requests.ConnectionError,
+                          self.submitter.postOrderComment, 7,
+                          {'body': 'please hurry'})
+        self.client.getOrderComments = mock.Mock(return_value={
+            'opstat': 'ok', 'response': {'thread': [
+                {'body': 'please hurry', 'ctime': 9999999999}]}})
+        self.client.postOrderComment = mock.Mock()
+        self.assertIsNone(self.submitter.postOrderComment(
+            7, {'body': 'please hurry'}))
+        self.assertFalse(self.client.postOrderComment.called)
+
+    def _fakeOrder(self, jobs):
+        self.now = [int(time.time())]
+        fake = gengo.fakeserver.FakeGengo(clock=lambda: self.now[0]).start()
+        self.addCleanup(fake.stop)
+        self.client = Gengo(public_key='pub', private_key='priv',
+                            api_url=fake.api_url)
+        self.addCleanup(self.client.close)
+        self.submitter = gengo.idempotency.SafeSubmitter(self.client)
+        post = self.client.postTranslationJobs
+
+        def timeout(**kwargs):
+            post(**kwargs)
+            raise requests.Timeout('timed out')
+        self.client.postTranslationJobs = timeout
+        self.assertRaises(requests.Timeout,
+                          self.submitter.postTranslationJobs, jobs)
+        self.client.postTranslationJobs = post
+        return fake
+
+    def _texts(self, count, prefix='text'):
+        return dict(('job_{0}'.format(i), {
+            'type': 'text', 'body_src': '{0} {1}'.format(prefix, i),
+            'lc_src': 'en', 'lc_tgt': 'ja', 'tier': 'standard'})
+            for i in range(count))
+
+    def test_orderLargerThanOneListingIsReconciled(self):
+        jobs = self._texts(450)
+        fake = self._fakeOrder(jobs)
+        result = self.submitter.postTranslationJobs(jobs)
+        self.assertIsNone(result['response'])
+        self.assertEqual(len(result['skipped']), 450)
+        self.assertEqual(len(fake.jobs), 450)
+
+    def test_unlistableKeysStayPending(self):
+        jobs = self._texts(3)
+        fake = self._fakeOrder(jobs)
+        self.now[0] += 1
+        self.client.postTranslationJobs(jobs={'jobs': self._texts(
+            200, 'other')})
+        self.assertRaises(gengo.paging.IncompleteListingError,
+                          self.submitter.postTranslationJobs, jobs)
+        self.assertEqual(len(fake.jobs), 203)
+        keys = [gengo.idempotency.jobKey(job) for job in jobs.values()]
+        states = self.submitter.ledger.states(keys)
+        self.assertEqual(set(state[0] for state in states.values()),
+                         set([gengo.idempotency.PENDING]))
+        self.assertEqual(len(states), 3)
+
+
+class TestMultipartUpload(unittest.TestCase):
+
+    """
+    Tests the streaming multipart encoder used for file uploads.
+    """
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.path = os.path.join(self.tmp, 'source.txt')
+        with open(self.path, 'wb') as f:
+            f.write(b'0123456789' * 1000)
+
+    def _encoder(self, **kwargs):
+        return gengo.multipart.MultipartEncoder(
+            [('api_key', 'pub'), ('data', u'{"a":"\u3042"}')],
+            [('file_job_1', 'source.txt', ('path', self.path), 'text/plain'),
+             ('body', 'body', ('data', b'inline'), None)],
+            boundary='xyz', chunk_size=100, **kwargs)
+
+    def test_body(self):
+        body = self._encoder().read()
+        self.assertEqual(len(body), len(self._encoder()))
+        self.assertTrue(body.startswith(
+            b'--xyz\r\nContent-Disposition: form-data; name="api_key"'
+            b'\r\n\r\npub\r\n'))
+        self.assertTrue(body.endswith(b'\r\n--xyz--\r\n'))
+        self.assertIn(u'{"a":"\u3042"}'.encode('utf-8'), body)
+        self.assertIn(
+            b'name="file_job_1"; filename="source.txt"\r\n'
+            b'Content-Type: text/plain\r\n\r\n' + b'0123456789' * 1000 +
+            b'\r\n', body)
+        self.assertEqual(body.count(b'--xyz\r\n'), 4)
+
+    def test_partsAreTaggedNotTyped(self):
+        # On Python 2 a path is bytes too, so only the tag tells the two
+        # kinds of source apart.
+        path = self.path.encode('utf-8')
+        body = gengo.multipart.MultipartEncoder(
+            [], [('body', 'body', ('data', path), None)]).read()
+        self.assertIn(b'\r\n\r\n' + path + b'\r\n', body)
+        self.assertNotIn(b'0123456789', body)
+        self.assertRaises(ValueError, gengo.multipart.MultipartEncoder,
+                          [], [('body', 'body', ('url', path), None)])
+
+    def test_memoryMappedFilesStreamTheSameBody(self):
+        self.assertEqual(self._encoder(mmap_threshold=1).read(),
+                         self._encoder().read())
+
+    def test_chunkedReads(self):
+        encoder = self._encoder()
+        chunks = []
+        while True:
+            chunk = encoder.read(37)
+            if not chunk:
+                break
+            self.assertLessEqual(len(chunk), 37)
+            chunks.append(chunk)
+        self.assertEqual(b''.join(chunks), self._encoder().read())
+
+    def test_filesOpenLazilyAndClose(self):
+        encoder = self._encoder()
+        self.assertIsNone(encoder._file)
+        encoder.read(500)
+        f = encoder._file
+        self.assertFalse(f.closed)
+        encoder.close()
+        self.assertTrue(f.closed)
+        self.assertIsNone(encoder._file)
+
+        encoder = self._encoder()
+        encoder.read()
+        self.assertIsNone(encoder._file)
+
+    def test_uploadStreamsEncoder(self):
+        client = Gengo(public_key=API_PUBKEY, private_key=API_PRIVKEY)
+        response = mock.Mock(status_code=200)
+        response.json.return_value = {'opstat': 'ok', 'response': {}}
+        jobs = {'job_1': {'type': 'file', 'file_path': self.path,
+                          'lc_src': 'en', 'lc_tgt': 'ja'}}
+        sent = {}
+
+        def post(url, headers, data):
+            sent.update(headers=headers, encoder=data, body=data.read(100))
+            return response
+
+        with mock.patch.object(requests.Session, 'post', side_effect=post):
+            client.determineTranslationCost(jobs=jobs)
+        encoder = sent['encoder']
+        self.assertIsInstance(encoder, gengo.multipart.MultipartEncoder)
+        self.assertEqual(sent['headers']['Content-Type'],
+                         encoder.content_type)
+        self.assertIn('file_path', jobs['job_1'])
+        self.assertTrue(sent['body'].startswith(b'--'))
+        # The request body is closed once the request is done.
+        self.assertEqual(encoder.read(), b'')
+        self.assertIsNone(encoder._file)
+
+
+class TestJobSync(unittest.TestCase):
+
+    """
+    Tests incremental job sync against an in-memory job list.
+    """
+    def setUp(self):
+        self.jobs = {
+            '1': {'job_id': '1', 'ctime': 100, 'status': 'available'},
+            '2': {'job_id': '2', 'ctime': 100, 'status': 'approved'},
+            '3': {'job_id': '3', 'ctime': 200, 'status': 'pending'},
+        }
+        self.client = mock.Mock()
+        self.client.getTranslationJobs.side_effect = self._list
+        self.client.getTranslationJobBatch.side_effect = self._batch
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.path = os.path.join(self.tmp, 'cursor.json')
+
+    def _list(self, timestamp_after, count):
+        # Inclusive, to check that jobs at the high-water mark are not
+        # reported twice.
+        listed = [{'job_id': job['job_id'], 'ctime': job['ctime']}
+                  for job in self.jobs.values()
+                  if job['ctime'] >= timestamp_after]
+        return {'opstat': 'ok', 'response': listed[:count]}
+
+    def _batch(self, id):
+        return {'opstat': 'ok', 'response': {'jobs': [
+            dict(self.jobs[job_id]) for job_id in id.split(',')
+            if job_id in self.jobs]}}
+
+    def _types(self, events):
+        return sorted((e['type'], e['job_id']) for e in events)
+
+    def test_initialSyncAndDeltas(self):
+        sync = gengo.sync.JobSync(self.client, path=self.path,
+                                  timestamp_after=0)
+        events = sync.poll()
+        self.assertEqual(self._types(events), [
+            ('created', '1'), ('created', '2'), ('created', '3')])
+        self.assertEqual(sorted(sync.cursor['active']), ['1', '3'])
+
+        self.client.reset_mock()
+        self.assertEqual(sync.poll(), [])
+        self.client.getTranslationJobs.assert_called_once_with(
+            timestamp_after=200, count=200)
+        self.client.getTranslationJobBatch.assert_called_once_with(id='1,3')
+
+        self.jobs['1']['status'] = 'approved'
+        self.jobs['4'] = {'job_id': '4', 'ctime': 200, 'status': 'available'}
+        del self.jobs['3']
+        events = sync.poll()
+        self.assertEqual(self._types(events), [
+            ('created', '4'), ('removed', '3'), ('updated', '1')])
+        updated = [e for e in events if e['type'] == 'updated'][0]
+        self.assertEqual((updated['previous'], updated['status']),
+                         ('available', 'approved'))
+        self.assertEqual(list(sync.cursor['active']), ['4'])
+
+    def test_cursorIsPersisted(self):
+        gengo.sync.JobSync(self.client, path=self.path,
+                           timestamp_after=0).poll()
+        sync = gengo.sync.JobSync(self.client, path=self.path)
+        self.assertEqual(sync.cursor['timestamp_after'], 200)
+        self.assertEqual(sync.poll(), [])
+
+    def test_listeners(self):
+        seen = []
+        sync = gengo.sync.JobSync(self.client, batch_size=2,
+                                  timestamp_after=0)
+        sync.addListener(seen.append)
+        sync.poll()
+        self.assertEqual(len(seen), 3)
+        self.assertEqual(self.client.getTranslationJobBatch.call_count, 2)
+
+    def test_fullListingIsNeverSkipped(self):
+        self.jobs = dict(
+            (str(i), {'job_id': str(i), 'ctime': 300, 'status': 'available'})
+            for i in range(1, 451))
+        seen = []
+        sync = gengo.sync.JobSync(self.client, path=self.path,
+                                  timestamp_after=0)
+        sync.addListener(seen.append)
+        for _ in range(3):
+            self.assertRaises(gengo.paging.IncompleteListingError,
+                              sync.poll)
+        self.assertEqual(seen, [])
+        self.assertEqual(sync.cursor['timestamp_after'], 0)
+        self.assertFalse(os.path.exists(self.path))
+
+        # Skipping past them gets polling going again, also for a sync
+        # started later from the saved cursor.
+        sync.skipTo(301)
+        sync = gengo.sync.JobSync(self.client, path=self.path)
+        self.assertEqual(sync.cursor['timestamp_after'], 301)
+        self.jobs['451'] = {'job_id': '451', 'ctime': 301,
+                            'status': 'available'}
+        self.assertEqual(self._types(sync.poll()), [('created', '451')])
+
+    def test_newCursorStartsNow(self):
+        self.jobs['4'] = {'job_id': '4', 'ctime': 250, 'status': 'pending'}
+        with mock.patch('gengo.sync.time', return_value=250.5):
+            sync = gengo.sync.JobSync(self.client)
+        self.assertEqual(self._types(sync.poll()), [('created', '4')])
+        self.client.getTranslationJobs.assert_called_once_with(
+            timestamp_after=250, count=200)
+        with mock.patch('gengo.sync.time', return_value=400.0):
+            sync.skipTo()
+        self.assertEqual(sync.cursor, {'timestamp_after': 400,
+                                       'boundary': [],
+                                       'active': {'4': 'pending'}})
+
+
+class TestPaging(unittest.TestCase):
+
+    """
+    Tests lazy iteration over getTranslationJobs and comment threads.
+    """
+    def setUp(self):
+        self.client = Gengo(public_key=API_PUBKEY, private_key=API_PRIVKEY)
+        self.jobs = [{'job_id': str(i), 'ctime': i // 2}
+                     for i in range(1, 451)]
+        self.calls = []
+        self.client.getTranslationJobs = mock.Mock(side_effect=self._list)
+
+    def _list(self, timestamp_after, count, **params):
+        self.calls.append(timestamp_after)
+        listed = [job for job in self.jobs
+                  if job['ctime'] >= timestamp_after]
+        return {'opstat': 'ok', 'response': listed[:count]}
+
+    def test_listsJobsSinceTimestamp(self):
+        jobs = self.client.iterTranslationJobs(timestamp_after=150,
+                                               status='approved')
+        self.assertEqual(self.calls, [])
+        ids = [job['job_id'] for job in jobs]
+        self.assertEqual(ids, [str(i) for i in range(300, 451)])
+        self.assertEqual(self.calls, [150])
+        self.assertEqual(
+            self.client.getTranslationJobs.call_args[1]['status'],
+            'approved')
+
+    def test_fullListingRaises(self):
+        seen = []
+        with self.assertRaises(gengo.paging.IncompleteListingError) as cm:
+            for job in self.client.iterTranslationJobs(count=100):
+                seen.append(job)
+        self.assertEqual(seen, [])
+        self.assertEqual(cm.exception.timestamp_after, 0)
+        self.assertEqual(len(cm.exception.jobs), 100)
+
+    def test_moreJobsInOneSecondThanOneListing(self):
+        fake = gengo.fakeserver.FakeGengo(clock=lambda: 1500000000).start()
+        self.addCleanup(fake.stop)
+        client = Gengo(public_key='pub', private_key='priv',
+                       api_url=fake.api_url)
+        self.addCleanup(client.close)
+        client.postTranslationJobs(jobs={'jobs': dict(
+            ('job_{0}'.format(i), {'type': 'text', 'body_src': 'one',
+                                   'lc_src': 'en', 'lc_tgt': 'ja',
+                                   'tier': 'standard'})
+            for i in range(450))})
+        for timestamp_after in (0, 1500000000):
+            with self.assertRaises(gengo.paging.IncompleteListingError) as cm:
+                list(client.iterTranslationJobs(
+                    timestamp_after=timestamp_after))
+            self.assertEqual(len(cm.exception.jobs), 200)
+        self.assertEqual(
+            list(client.iterTranslationJobs(timestamp_after=1500000001)), [])
+
+    def test_errorsReachTheCaller(self):
+        self.client.getTranslationJobs = mock.Mock(
+            side_effect=GengoError('Unauthorized', 1100))
+        self.assertRaises(GengoError, list,
+                          self.client.iterTranslationJobs())
+
+    def test_commentThreads(self):
+        thread = {'opstat': 'ok', 'response': {'thread': [
+            {'body': 'one'}, {'body': 'two'}]}}
+        self.client.getTranslationJobComments = mock.Mock(
+            return_value=thread)
+        self.client.getOrderComments = mock.Mock(return_value=thread)
+        self.assertEqual(
+            [c['body'] for c in self.client.iterTranslationJobComments(1)],
+            ['one', 'two'])
+        self.assertEqual(len(list(self.client.iterOrderComments(2))), 2)
+        self.client.getOrderComments.assert_called_once_with(id=2)
+
+
+class TestJobMirror(unittest.TestCase):
+
+    """
+    Tests the SQLite mirror of jobs, orders and comments.
+    """
+    def setUp(self):
+        self.mirror = gengo.mirror.JobMirror()
+        self.addCleanup(self.mirror.close)
+        self.mirror.ingest('getTranslationJobBatch', {'id': '1,2,3'}, {
+            'opstat': 'ok', 'response': {'jobs': [
+                {'job_id': 1, 'order_id': 9, 'status': 'reviewable',
+                 'lc_src': 'ja', 'lc_tgt': 'en', 'tier': 'standard',
+                 'ctime': 1000, 'body_src': 'one'},
+                {'job_id': 2, 'order_id': 9, 'status': 'reviewable',
+                 'lc_src': 'ja', 'lc_tgt': 'en', 'tier': 'pro',
+                 'ctime': 5000},
+                {'job_id': 3, 'order_id': 10, 'status': 'available',
+                 'lc_src': 'en', 'lc_tgt': 'ja', 'tier': 'standard',
+                 'ctime': 2000},
+            ]}})
+
+    def test_queries(self):
+        old = self.mirror.jobs(status='reviewable', lc_src='ja',
+                               lc_tgt='en', created_before=3000)
+        self.assertEqual([job['job_id'] for job in old], ['1'])
+        self.assertEqual(old[0]['body_src'], 'one')
+        self.assertEqual(self.mirror.count(order_id=9), 2)
+        self.assertEqual(self.mirror.countBy('tier'),
+                         {'standard': 2, 'pro': 1})
+        newest = self.mirror.jobs(newest_first=True, limit=2)
+        self.assertEqual([job['job_id'] for job in newest], ['2', '3'])
+        self.assertRaises(TypeError, self.mirror.jobs, colour='red')
+        self.assertRaises(ValueError, self.mirror.countBy, 'body')
+
+    def test_partialResponsesAreMerged(self):
+        self.mirror.ingest('getTranslationJobs', {}, {
+            'opstat': 'ok', 'response': [{'job_id': '1', 'ctime': 1000}]})
+        self.mirror.ingest('getTranslationOrderJobs', {'id': 9}, {
+            'opstat': 'ok', 'response': {'order': {
+                'order_id': 9, 'total_jobs': 2,
+                'jobs_approved': ['1'], 'jobs_reviewable': ['2']}}})
+        job = self.mirror.job(1)
+        self.assertEqual(job['status'], 'approved')
+        self.assertEqual(job['tier'], 'standard')
+        self.assertEqual(self.mirror.order(9)['total_jobs'], 2)
+        self.assertEqual(self.mirror.count(status='reviewable'), 1)
+
+    def test_commentsAndSyncEvents(self):
+        thread = {'opstat': 'ok', 'response': {'thread': [
+            {'author': 'customer', 'body': 'hi', 'ctime': 10}]}}
+        self.mirror.ingest('getTranslationJobComments', {'id': 1}, thread)
+        self.mirror.ingest('getTranslationJobComments', {'id': 1}, thread)
+        self.assertEqual(self.mirror.comments(job_id=1), [
+            {'author': 'customer', 'body': 'hi', 'ctime': 10}])
+        self.assertEqual(self.mirror.comments(order_id=9), [])
+
+        self.mirror.applyEvent({'type': 'removed', 'job_id': '3',
+                                'job': None})
+        self.mirror.applyEvent({'type': 'updated', 'job_id': '2',
+                                'job': {'job_id': '2',
+                                        'status': 'approved'}})
+        self.assertIsNone(self.mirror.job(3))
+        self.assertEqual(self.mirror.job(2)['status'], 'approved')
+
+    def test_clientFeedsMirror(self):
+        client = Gengo(public_key=API_PUBKEY, private_key=API_PRIVKEY,
+                       mirror=self.mirror)
+        response = jsonResponse({'opstat': 'ok', 'response': {'job': {
+            'job_id': '4', 'status': 'pending', 'ctime': 3000}}})
+        with mock.patch.object(requests.Session, 'get',
+                               return_value=response):
+            client.getTranslationJob(id=4)
+        self.assertEqual(self.mirror.job(4)['status'], 'pending')
+
+        # A mirror failure is logged, not raised from the API call.
+        self.mirror.close()
+        with mock.patch.object(requests.Session, 'get',
+                               return_value=response), \
+                mock.patch.object(gengo.gengo.logger, 'exception') as log:
+            result = client.getTranslationJob(id=4)
+        self.assertEqual(result['response']['job']['job_id'], '4')
+        self.assertEqual(log.call_count, 1)
+
+
+class TestCallbackReceiver(unittest.TestCase):
+
+    """
+    Tests the callback receiver end to end through a local server.
+    """
+    def setUp(self):
+        self.events = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def _handler(self, event):
+        self.started.set()
+        self.release.wait(5)
+        self.events.append(event)
+
+    def _serve(self, **kwargs):
+        app = gengo.callbacks.CallbackApp(self._handler, **kwargs)
+        server = gengo.callbacks.makeServer(app, port=0)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+        def stop():
+            self.release.set()
+            server.shutdown()
+            server.server_close()
+            app.close()
+        self.addCleanup(stop)
+        return app, 'http://127.0.0.1:{0}/'.format(server.server_port)
+
+    def _post(self, url, kind, payload):
+        return requests.post(url, data={kind: json.dumps(payload)})
+
+    def test_deliveriesAreDispatchedOnce(self):
+        app, url = self._serve()
+        job = {'job_id': '42', 'status': 'reviewable', 'body_tgt': 'hi'}
+        self.assertEqual(self._post(url, 'job', job).status_code, 200)
+        self.assertEqual(self._post(url, 'job', job).status_code, 200)
+        comment = {'job_id': 42, 'body': 'Question', 'ctime': 1}
+        self.assertEqual(self._post(url, 'comment', comment).status_code,
+                         200)
+        app.join()
+        self.assertEqual(
+            [(e['type'], e['job_id'], e['status']) for e in self.events],
+            [('job', '42', 'reviewable'), ('comment', '42', None)])
+        self.assertEqual(app.stats['duplicates'], 1)
+
+        self.assertEqual(requests.post(url, data={'x': 1}).status_code, 400)
+        self.assertEqual(requests.get(url).status_code, 405)
+        response = requests.post(url, json={'job': job})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(app.stats['duplicates'], 2)
+
+    def test_fullQueueIsRefused(self):
+        app, url = self._serve(workers=1, max_queue=1)
+        self.release.clear()
+        self._post(url, 'job', {'job_id': 1, 'status': 'pending'})
+        self.assertTrue(self.started.wait(5))
+        self._post(url, 'job', {'job_id': 2, 'status': 'pending'})
+        response = self._post(url, 'job', {'job_id': 3, 'status': 'pending'})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers['Retry-After'], '30')
+
+        # Refused deliveries are accepted once there is room again.
+        self.release.set()
+        app.join()
+        response = self._post(url, 'job', {'job_id': 3, 'status': 'pending'})
+        self.assertEqual(response.status_code, 200)
+        app.join()
+        self.assertEqual(sorted(e['job_id'] for e in self.events),
+                         ['1', '2', '3'])
+
+    def test_parseCallback(self):
+        self.assertEqual(gengo.callbacks.parseCallback(
+            b'job=%7B%22job_id%22%3A+1%7D'), ('job', {'job_id': 1}))
+        self.assertRaises(ValueError, gengo.callbacks.parseCallback,
+                          b'job=not+json')
+        self.assertRaises(ValueError, gengo.callbacks.parseCallback,
+                          b'[1]', 'application/json')
+
+
+class TestJSONCodec(unittest.TestCase):
+
+    """
+    Tests the pluggable JSON backends.
+    """
+    payload = {
+        'jobs': {
+            'job_1': {'type': 'text', 'body_src': u'\u3042 \u00e9 "q" /',
+                      'lc_src': 'en', 'lc_tgt': 'ja', 'tier': 'standard',
+                      'auto_approve': 1, 'custom_data': None},
+        },
+        'comment': 'order',
+    }
+
+    def _codecs(self):
+        codecs = []
+        for name in gengo.codec.BACKENDS:
+            try:
+                codecs.append(gengo.codec.getCodec(name))
+            except ImportError:
+                pass
+        return codecs
+
+    def test_backendsAgree(self):
+        for codec in self._codecs():
+            encoded = codec.dumps(self.payload)
+            self.assertNotIn(', ', encoded)
+            self.assertEqual(json.loads(encoded), self.payload, codec)
+            self.assertEqual(codec.loads(encoded.encode('utf-8')),
+                             self.payload)
+            self.assertEqual(codec.loads(encoded), self.payload)
+            self.assertRaises(ValueError, codec.loads, b'{"opstat":')
+
+    def test_selection(self):
+        self.assertIsInstance(gengo.codec.getCodec('json'),
+                              gengo.codec.JSONCodec)
+        self.assertIn(gengo.codec.getCodec().name, gengo.codec.BACKENDS)
+        codec = gengo.codec.JSONCodec()
+        self.assertIs(gengo.codec.getCodec(codec), codec)
+        self.assertRaises(ValueError, gengo.codec.getCodec, 'yaml')
+
+    def test_signingDoesNotDependOnCodec(self):
+        sent = []
+        for codec in self._codecs():
+            client = Gengo(public_key=API_PUBKEY, private_key=API_PRIVKEY,
+                           json_codec=codec)
+            client._send = mock.Mock(return_value=jsonResponse(
+                {'opstat': 'ok', 'response': {}}))
+            with mock.patch('gengo.gengo.time', return_value=1500000000):
+                client.postTranslationJobs(jobs=self.payload)
+            data = client._send.call_args[1]['data']
+            sent.append((data['api_sig'], data['ts'],
+                         json.loads(data['data'])))
+        self.assertEqual(len(set(repr(s) for s in sent)), 1)
+
+    def test_responsesAreDecodedByCodec(self):
+        client = Gengo(public_key=API_PUBKEY, private_key=API_PRIVKEY)
+        response = mock.Mock(status_code=200,
+                             content=b'{"opstat":"ok","response":{"a":1}}')
+        self.assertEqual(client._handleResponse(response)['response'],
+                         {'a': 1})
+        self.assertFalse(response.json.called)
+        response.content = b'<html>'
+        self.assertRaises(GengoError, client._handleResponse, response)
+
+
+class TestStreamingResponses(unittest.TestCase):
+
+    """
+    Tests incremental parsing of large list responses.
+    """
+    def setUp(self):
+        self.client = Gengo(public_key=API_PUBKEY, private_key=API_PRIVKEY)
+
+    def _chunks(self, body, size=7):
+        body = json.dumps(body).encode('utf-8')
+        return [body[i:i + size] for i in range(0, len(body), size)]
+
+    def _respond(self, body, size=7):
+        response = mock.Mock(status_code=200)
+        response.iter_content.return_value = iter(self._chunks(body, size))
+        return response
+
+    def test_entriesSplitAcrossChunks(self):
+        jobs = [{'job_id': 123456789, 'body': u'\u3042\u3044' * i,
+                 'credits': 1.25e-3}
+                for i in range(20)]
+        for size in (1, 3, 1000):
+            items = gengo.streaming.iterResponse(
+                self._chunks({'opstat': 'ok', 'response': jobs}, size),
+                (), lambda top: None)
+            self.assertEqual([job for _, job in items], jobs)
+
+    def test_bareNumbersSplitAcrossChunks(self):
+        body = b'{"opstat": "ok", "response": [123,1.5e2,456,-7.25E-1,0]}'
+        for split in range(len(body)):
+            items = gengo.streaming.iterResponse(
+                [body[:split], body[split:]], (), lambda top: None)
+            self.assertEqual([value for _, value in items],
+                             [123, 150.0, 456, -0.725, 0], split)
+
+    def test_largeValueInLinearTime(self):
+        body = json.dumps({'opstat': 'ok', 'response': [
+            {'job_id': 1, 'body_src': 'x' * (16 << 20)}]}).encode('utf-8')
+        chunks = [body[i:i + 65536] for i in range(0, len(body), 65536)]
+        start = time.time()
+        json.loads(body.decode('utf-8'))
+        whole = time.time() - start
+        start = time.time()
+        items = list(gengo.streaming.iterResponse(chunks, (),
+                                                  lambda top: None))
+        streamed = time.time() - start
+        self.assertEqual(len(items[0][1]['body_src']), 16 << 20)
+        # Re-decoding the value from its start for every chunk took about
+        # 60 times as long as decoding the whole body.
+        self.assertLess(streamed, whole * 10 + 0.25)
+
+    def test_firstEntryBeforeWholeBody(self):
+        read = []
+
+        def chunks():
+            for chunk in self._chunks({'opstat': 'ok', 'response': [
+                    {'job_id': i} for i in range(1000)]}, 50):
+                read.append(chunk)
+                yield chunk
+        items = gengo.streaming.iterResponse(chunks(), (), lambda top: None)
+        self.assertEqual(next(items), ((), {'job_id': 0}))
+        self.assertLess(len(read), 3)
+
+    def test_clientStreamsJobs(self):
+        response = self._respond({'opstat': 'ok', 'response': [
+            {'job_id': '1', 'ctime': 1}, {'job_id': '2', 'ctime': 2}]})
+        with mock.patch.object(requests.Session, 'get',
+                               return_value=response) as get:
+            jobs = list(self.client.streamTranslationJobs(status='pending'))
+        self.assertEqual([job['job_id'] for job in jobs], ['1', '2'])
+        self.assertTrue(get.call_args[1]['stream'])
+        self.assertIn('status=pending', get.call_args[0][0])
+        self.assertTrue(response.close.called)
+
+    def test_orderJobsAndBatch(self):
+        response = self._respond({'opstat': 'ok', 'response': {'order': {
+            'order_id': 5, 'total_jobs': 3, 'jobs_available': ['1', '2'],
+            'jobs_approved': ['3'], 'jobs_pending': []}}})
+        with mock.patch.object(requests.Session, 'get',
+                               return_value=response):
+            jobs = list(self.client.streamTranslationOrderJobs(5))
+        self.assertEqual(jobs, [
+            {'job_id': '1', 'status': 'available'},
+            {'job_id': '2', 'status': 'available'},
+            {'job_id': '3', 'status': 'approved'}])
+
+        response = self._respond({'opstat': 'ok', 'response': {
+            'jobs': [{'job_id': '1'}, {'job_id': '2'}]}})
+        with mock.patch.object(requests.Session, 'get',
+                               return_value=response):
+            self.assertEqual(
+                len(list(self.client.streamTranslationJobBatch('1,2'))), 2)
+
+    def test_errors(self):
+        response = self._respond({'opstat': 'error', 'err': {
+            'code': 2850, 'msg': 'Order not found'}})
+        with mock.patch.object(requests.Session, 'get',
+                               return_value=response):
+            try:
+                list(self.client.streamTranslationOrderJobs(5))
+                self.fail('Expected a GengoError')
+            except GengoError as e:
+                self.assertEqual(e.error_code, 2850)
+        self.assertTrue(response.close.called)
+
+        response = mock.Mock(status_code=502)
+        response.iter_content.return_value = iter([b'<html>Bad gateway'])
+        with mock.patch.object(requests.Session, 'get',
+                               return_value=response):
+            self.assertRaises(GengoError, list,
+                              self.client.streamTranslationJobs())
+
+
+class TestSigning(unittest.TestCase):
+
+    """
+    Tests the pre-keyed, memoizing request signer.
+    """
+    def _expected(self, key, ts):
+        return hmac.new(key, str(ts).encode('utf-8'), sha1).hexdigest()
+
+    def test_signaturesMatchHmac(self):
+        stats = gengo.gengo.ClientStats()
+        signer = gengo.signing.Signer(b'secret', stats)
+        for ts in ('1500000000', 1500000000, b'1500000000', '1500000001'):
+            self.assertEqual(signer.sign(ts),
+                             self._expected(b'secret', int(ts)))
+        self.assertEqual(stats['signed'], 2)
+        self.assertEqual(stats['signature_memo_hits'], 2)
+
+    def test_concurrentSigning(self):
+        signer = gengo.signing.Signer(b'secret')
+        expected = dict((ts, self._expected(b'secret', ts))
+                        for ts in range(100, 110))
+        wrong = []
+
+        def sign():
+            for i in range(2000):
+                ts = 100 + i % 10
+                if signer.sign(ts) != expected[ts]:
+                    wrong.append(ts)
+        threads = [threading.Thread(target=sign) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(wrong, [])
+
+    def test_clientSigning(self):
+        client = Gengo(public_key=API_PUBKEY, private_key=API_PRIVKEY)
+        client._send = mock.Mock(return_value=jsonResponse(
+            {'opstat': 'ok', 'response': {}}))
+        with mock.patch('gengo.gengo.time', return_value=1500000000):
+            client.getAccountBalance()
+            client.getAccountStats()
+        self.assertIn('api_sig=' + self._expected(
+            API_PRIVKEY.encode('utf-8'), 1500000000),
+            client._send.call_args[0][1])
+        self.assertEqual(client.stats['signed'], 1)
+        self.assertEqual(client.stats['signature_memo_hits'], 1)
+        self.assertGreater(client.stats['signing_seconds'], 0)
+
+        client.private_key = b'rotated'
+        with mock.patch('gengo.gengo.time', return_value=1500000000):
+            client.getAccountBalance()
+        self.assertIn('api_sig=' + self._expected(b'rotated', 1500000000),
+                      client._send.call_args[0][1])
+
+
+class TestImport(unittest.TestCase):
+
+    """
+    Tests that importing the package is cheap and has no side effects.
+    """
+    # Cumulative `import gengo` time allowed, in microseconds. Generous,
+    # since it includes compiling the sources when no .pyc is written.
+    BUDGET_US = int(os.environ.get('GENGO_IMPORT_BUDGET_US', 100000))
+
+    def _run(self, code):
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        return subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', code], cwd=root,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            universal_newlines=True, check=True)
+
+    @unittest.skipIf(sys.version_info < (3, 7), '-X importtime needs 3.7')
+    def test_importIsLazyAndWithinBudget(self):
+        result = self._run(
+            'import logging, sys; import gengo; '
+            'print(sorted(m for m in ("requests", "urllib3", "asyncio", '
+            '"mimetypes", "email.utils", "aiohttp") if m in sys.modules)); '
+            'print(len(logging.getLogger().handlers))')
+        loaded, root_handlers = result.stdout.split('\n')[:2]
+        self.assertEqual(loaded, '[]')
+        self.assertEqual(root_handlers, '0')
+
+        cumulative = [int(line.split('|')[1])
+                      for line in result.stderr.splitlines()
+                      if line.split('|')[-1].strip() == 'gengo']
+        self.assertEqual(len(cumulative), 1)
+        self.assertLess(cumulative[0], self.BUDGET_US)
+
+    @unittest.skipIf(sys.version_info < (3, 7), '-X importtime needs 3.7')
+    def test_asyncGengoOnDemand(self):
+        result = self._run('import sys; from gengo import AsyncGengo; '
+                           'print("asyncio" in sys.modules)')
+        self.assertEqual(result.stdout.strip(), 'True')
+
+
+class TestFakeServer(unittest.TestCase):
+
+    """
+    Drives the real client against the local fake API.
+    """
+    def setUp(self):
+        self.now = [1500000000.0]
+        self.fake = gengo.fakeserver.FakeGengo(
+            auto_advance=60, clock=lambda: self.now[0]).start()
+        self.gengo = Gengo(public_key='pub', private_key='priv',
+                           api_url=self.fake.api_url)
+
+    def tearDown(self):
+        self.gengo.close()
+        self.fake.stop()
+
+    def _order(self, jobs=2):
+        order = self.gengo.postTranslationJobs(jobs={'jobs': dict(
+            ('job_{0}'.format(i), {'type': 'text', 'body_src': 'one two',
+                                   'lc_src': 'en', 'lc_tgt': 'ja',
+                                   'tier': 'standard'})
+            for i in range(jobs))})
+        return order['response']['order_id']
+
+    def test_everyEndpointIsRouted(self):
+        for name, fn in gengo.mockdb.apihash.items():
+            regex = [r for m, r, n in self.fake._routes if n == name][0]
+            path = '/v2' + fn['url'].replace('{{id}}', '1').replace(
+                '{{revision_id}}', '1')
+            self.assertTrue(regex.match(path), name)
+        self.assertEqual(self.fake.handle('GET', '/v2/nope')[0], 404)
+
+    def test_badSignatureIsRejected(self):
+        client = Gengo(public_key='pub', private_key='wrong',
+                       api_url=self.fake.api_url)
+        self.assertRaises(GengoAuthError, client.getAccountBalance)
+        client = Gengo(public_key='other', private_key='priv',
+                       api_url=self.fake.api_url)
+        self.assertRaises(GengoAuthError, client.getAccountBalance)
+        self.assertEqual(self.fake.calls['getAccountBalance'], 2)
+
+    def test_jobLifecycle(self):
+        order_id = self._order()
+        order = self.gengo.getTranslationOrderJobs(id=order_id)['response']
+        job_id, other_id = order['order']['jobs_available']
+        self.assertEqual(self.fake.advance(job_id), [job_id])
+        job = self.gengo.getTranslationJob(id=job_id)['response']['job']
+        self.assertEqual(job['status'], 'pending')
+
+        self.now[0] += 120
+        jobs = self.gengo.getTranslationJobBatch(
+            id=','.join([job_id, other_id]))['response']['jobs']
+        self.assertEqual([j['status'] for j in jobs],
+                         ['reviewable', 'reviewable'])
+        self.assertEqual(jobs[0]['body_tgt'], '[ja] one two')
+
+        self.gengo.updateTranslationJob(id=job_id, action={
+            'action': 'approve', 'rating': 5})
+        self.gengo.updateTranslationJobs(action={
+            'action': 'revise', 'job_ids': [{'job_id': other_id,
+                                             'comment': 'again'}]})
+        order = self.gengo.getTranslationOrderJobs(id=order_id)['response']
+        self.assertEqual(order['order']['jobs_approved'], [job_id])
+        self.assertEqual(order['order']['jobs_revising'], [other_id])
+        thread = self.gengo.getTranslationJobComments(id=other_id)
+        self.assertEqual(thread['response']['thread'][0]['body'], 'again')
+
+        with self.assertRaises(GengoError) as cm:
+            self.gengo.updateTranslationJob(id=job_id, action={
+                'action': 'reject'})
+        self.assertEqual(cm.exception.error_code, 400)
+        self.assertRaises(GengoError, self.gengo.getTranslationJob, id=999)
+
+    def test_listingAndCancelling(self):
+        first = self._order(jobs=1)
+        self.now[0] += 1
+        second = self._order(jobs=1)
+        listed = self.gengo.getTranslationJobs(timestamp_after=0)
+        self.assertEqual([job['ctime'] for job in listed['response']],
+                         [1500000001, 1500000000])
+        self.gengo.deleteTranslationOrder(id=second)
+        jobs = self.gengo.getTranslationJobs(status='cancelled')
+        self.assertEqual(len(jobs['response']), 1)
+        self.gengo.postOrderComment(id=first, comment={'body': 'hello'})
+        thread = self.gengo.getOrderComments(id=first)['response']['thread']
+        self.assertEqual([c['body'] for c in thread], ['hello'])
+
+    def test_invalidJobsAreReportedPerJob(self):
+        with self.assertRaises(GengoError) as cm:
+            self.gengo.postTranslationJobs(jobs={'jobs': {
+                'job_1': {'type': 'text', 'lc_src': 'en', 'lc_tgt': 'ja',
+                          'tier': 'standard'}}})
+        self.assertEqual(list(cm.exception.errors), ['job_1'])
+        self.assertEqual(self.fake.orders, {})
+
+    def test_fileQuotes(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'words.txt')
+        with open(path, 'w') as f:
+            f.write('one two three')
+        quote = self.gengo.determineTranslationCost(jobs={'jobs': {
+            'job_1': {'type': 'file', 'file_path': path, 'lc_src': 'en',
+                      'lc_tgt': 'ja', 'tier': 'standard'}}})
+        self.assertEqual(quote['response']['jobs']['job_1']['unit_count'], 3)
+
+
+class TestHooks(unittest.TestCase):
+
+    """
+    Tests the before/after/error request hooks.
+    """
+    def setUp(self):
+        self.gengo = Gengo(public_key=API_PUBKEY, private_key=API_PRIVKEY,
+                           max_retries=1, backoff_factor=0)
+        self.events = []
+        for event in gengo.hooks.EVENTS:
+            self.gengo.addHook(event, lambda trace, event=event:
+                               self.events.append((event, trace)))
+
+    def test_successfulCall(self):
+        response = jsonResponse(None)
+        response.content = b'{"opstat": "ok", "response": {}}'
+        self.gengo._send = mock.Mock(return_value=response)
+        self.gengo.postTranslationJobComment(id=42,
+                                             comment={'body': 'hello'})
+        self.assertEqual([event for event, _ in self.events],
+                         ['before', 'after'])
+        trace = self.events[0][1]
+        self.assertIs(trace, self.events[1][1])
+        self.assertEqual(trace.endpoint, 'postTranslationJobComment')
+        self.assertEqual(trace.method, 'POST')
+        self.assertEqual(trace.url, '/translate/job/{{id}}/comment')
+        self.assertEqual(trace.status, 200)
+        self.assertEqual(trace.retries, 0)
+        self.assertGreater(trace.request_bytes, len('hello'))
+        self.assertEqual(trace.response_bytes, len(response.content))
+        self.assertEqual(sorted(trace.phases), sorted(gengo.hooks.PHASES))
+        self.assertGreater(trace.phases['sign'], 0)
+        self.assertGreaterEqual(trace.elapsed, sum(trace.phases.values()))
+
+    def test_failedCallAfterRetry(self):
+        unavailable = jsonResponse({}, status_code=503)
+        unavailable.headers = {}
+        self.gengo._send = mock.Mock(side_effect=[
+            unavailable,
+            jsonResponse({'opstat': 'error',
+                          'err': {'code': 2400, 'msg': 'Nope'}})])
+        self.assertRaises(GengoError, self.gengo.getTranslationJob, id=42)
+        self.assertEqual([event for event, _ in self.events],
+                         ['before', 'error'])
+        trace = self.events[1][1]
+        self.assertEqual(trace.retries, 1)
+        self.assertEqual(trace.error.error_code, 2400)
+        self.assertEqual(trace.request_bytes, 0)
+
+    def test_streamedCalls(self):
+        body = b'{"opstat": "ok", "response": [{"job_id": 1}, {"job_id": 2}]}'
+        response = mock.Mock(status_code=200, headers={})
+        response.iter_content.return_value = iter([body[:20], body[20:]])
+        self.gengo._send = mock.Mock(return_value=response)
+        jobs = list(self.gengo.streamTranslationJobs())
+        self.assertEqual(len(jobs), 2)
+        self.assertEqual([event for event, _ in self.events],
+                         ['before', 'after'])
+        trace = self.events[1][1]
+        self.assertEqual(trace.endpoint, 'getTranslationJobs')
+        self.assertEqual(trace.status, 200)
+        self.assertEqual(trace.response_bytes, len(body))
+        self.assertGreater(trace.phases['decode'], 0)
+
+        del self.events[:]
+        response.iter_content.return_value = iter([
+            b'{"opstat": "error", "err": {"code": 2400, "msg": "Nope"}}'])
+        self.assertRaises(GengoError, list,
+                          self.gengo.streamTranslationJobs())
+        self.assertEqual([event for event, _ in self.events],
+                         ['before', 'error'])
+        self.assertEqual(self.events[1][1].error.error_code, 2400)
+
+    def test_brokenHooksDontBreakCalls(self):
+        self.gengo._send = mock.Mock(return_value=jsonResponse(
+            {'opstat': 'ok', 'response': {}}))
+        broken = mock.Mock(side_effect=RuntimeError('boom'))
+        self.gengo.addHook('after', broken)
+        with mock.patch('gengo.gengo.logger') as logger:
+            self.gengo.getAccountBalance()
+        self.assertEqual(broken.call_count, 1)
+        self.assertEqual(logger.exception.call_count, 1)
+
+    def test_removingHooks(self):
+        self.assertRaises(ValueError, self.gengo.addHook, 'later', id)
+        for event, fn in list(self.gengo._hooks.items()):
+            self.gengo.removeHook(event, fn[0])
+        self.assertEqual(self.gengo._hooks, {})
+        self.gengo._send = mock.Mock(return_value=jsonResponse(
+            {'opstat': 'ok', 'response': {}}))
+        with mock.patch('gengo.hooks.RequestTrace') as trace:
+            self.gengo.getAccountBalance()
+        self.assertFalse(trace.called)
+        self.assertEqual(self.events, [])
+
+
+class TestClientMetrics(unittest.TestCase):
+
+    """
+    Tests the Prometheus call metrics.
+    """
+    def setUp(self):
+        self.metrics = gengo.metrics.ClientMetrics(buckets=(0.1, 1))
+        self.gengo = Gengo(public_key=API_PUBKEY, private_key=API_PRIVKEY)
+        self.metrics.attach(self.gengo)
+
+    def _values(self):
+        return dict(((metric,) + tuple(v for _, v in labels), value)
+                    for (metric, labels), value
+                    in self.metrics.collect()[0].items())
+
+    def test_callsAndErrorsAreCounted(self):
+        self.gengo._send = mock.Mock(side_effect=[
+            jsonResponse({'opstat': 'ok', 'response': {}}),
+            jsonResponse({'opstat': 'error',
+                          'err': {'code': 2400, 'msg': 'Nope'}}, 400),
+            requests.ConnectionError('reset')])
+        self.gengo.getTranslationJob(id=1)
+        self.assertRaises(GengoError, self.gengo.getTranslationJob, id=2)
+        self.assertRaises(requests.ConnectionError,
+                          self.gengo.getTranslationJob, id=3)
+        values = self._values()
+        self.assertEqual(values[('requests_total', 'getTranslationJob',
+                                 'GET', '200')], 1)
+        self.assertEqual(values[('requests_total', 'getTranslationJob',
+                                 'GET', 'none')], 1)
+        self.assertEqual(values[('errors_total', 'getTranslationJob',
+                                 '2400')], 1)
+        self.assertEqual(values[('errors_total', 'getTranslationJob',
+                                 'ConnectionError')], 1)
+        self.assertEqual(values[('in_flight', 'getTranslationJob')], 0)
+
+        self.metrics.detach(self.gengo)
+        self.assertEqual(self.gengo._hooks, {})
+
+    def test_threadsAreSummed(self):
+        self.gengo._send = mock.Mock(return_value=jsonResponse(
+            {'opstat': 'ok', 'response': {}}))
+
+        def calls():
+            for _ in range(50):
+                self.gengo.getAccountBalance()
+        threads = [threading.Thread(target=calls) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        calls()
+        key = ('requests_total', 'getAccountBalance', 'GET', '200')
+        self.assertEqual(self._values()[key], 250)
+        # Shards of finished threads are folded in, and not twice.
+        self.assertEqual(len(self.metrics._shards), 1)
+        self.assertEqual(self._values()[key], 250)
+
+    def test_render(self):
+        trace = gengo.hooks.RequestTrace(Gengo.getAccountBalance.endpoint)
+        trace.status = 200
+        for elapsed in (0.05, 0.1, 0.5, 2):
+            trace.elapsed = elapsed
+            self.metrics._before(trace)
+            self.metrics._after(trace)
+        trace.endpoint = 'say "hi"\n'
+        self.metrics._after(trace)
+        text = self.metrics.render()
+        for line in (
+                '# TYPE gengo_client_requests_total counter',
+                'gengo_client_requests_total{endpoint="getAccountBalance",'
+                'method="GET",status="200"} 4',
+                'gengo_client_request_duration_seconds_bucket'
+                '{endpoint="getAccountBalance",le="0.1"} 2',
+                'gengo_client_request_duration_seconds_bucket'
+                '{endpoint="getAccountBalance",le="1"} 3',
+                'gengo_client_request_duration_seconds_bucket'
+                '{endpoint="getAccountBalance",le="+Inf"} 4',
+                'gengo_client_request_duration_seconds_sum'
+                '{endpoint="getAccountBalance"} 2.65',
+                'gengo_client_request_duration_seconds_count'
+                '{endpoint="getAccountBalance"} 4',
+                'gengo_client_in_flight{endpoint="say \\"hi\\"\\n"} -1'):
+            self.assertIn(line, text.splitlines())
+
+    def test_httpEndpoint(self):
+        server = gengo.metrics.startServer(self.metrics, port=0)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        response = requests.get('http://127.0.0.1:{0}/metrics'.format(
+            server.server_port))
+        self.assertEqual(response.headers['Content-Type'],
+                         gengo.metrics.CONTENT_TYPE)
+        self.assertIn('# TYPE gengo_client_in_flight gauge', response.text)
+
+
+class TestBulkActions(unittest.TestCase):
+
+    """
+    Tests applying updateTranslationJobs actions in batches.
+    """
+    def setUp(self):
+        self.gengo = Gengo(public_key=API_PUBKEY, private_key=API_PRIVKEY)
+        self.sleepPatch = mock.patch('gengo.bulk.sleep')
+        self.sleep = self.sleepPatch.start()
+        self.sent = []
+
+    def tearDown(self):
+        self.sleepPatch.stop()
+
+    def _send(self, *responses):
+        responses = list(responses)
+
+        def send(method, url, **kwargs):
+            self.sent.append(json.loads(kwargs['data']['data']))
+            return responses.pop(0)
+        self.gengo._send = send
+
+    def test_chunkJobIds(self):
+        ids = list(range(250))
+        batches = list(gengo.bulk.chunkJobIds(ids, max_jobs=100))
+        self.assertEqual([len(b) for b in batches], [100, 100, 50])
+        self.assertEqual(sum(batches, []), ids)
+        entries = [{'job_id': i, 'comment': 'x' * 100} for i in range(10)]
+        for batch in gengo.bulk.chunkJobIds(entries, max_bytes=400):
+            self.assertLessEqual(
+                len(json.dumps(batch, separators=(',', ':'))), 400)
+
+    def test_onlyTemporaryFailuresAreRetried(self):
+        ok = jsonResponse({'opstat': 'ok', 'response': {}})
+        unavailable = jsonResponse({'opstat': 'error'}, 503)
+        rejected = jsonResponse({'opstat': 'error', 'err': {
+            '5': [{'code': 2701, 'msg': 'Job is not reviewable'}]}}, 400)
+        self._send(ok, unavailable, rejected, ok)
+        result = self.gengo.updateTranslationJobsBulk(
+            {'action': 'reject', 'reason': 'quality',
+             'job_ids': [1, 2, 3, {'job_id': 4, 'comment': 'no'}, 5, 6]},
+            max_jobs=2, max_workers=1)
+        self.assertEqual(self.sent[0], {'action': 'reject',
+                                        'reason': 'quality',
+                                        'job_ids': [1, 2]})
+        self.assertEqual(self.sent[3]['job_ids'],
+                         [3, {'job_id': 4, 'comment': 'no'}])
+        self.assertEqual(result['batches'], 3)
+        self.assertEqual(result['retried'], 1)
+        self.assertEqual(self.sleep.call_count, 1)
+        self.assertEqual(result['succeeded'], [1, 2, 3, 4])
+        self.assertEqual(list(result['failed']), [5])
+        self.assertEqual(result['failed'][5].error_code, 2701)
+        self.assertEqual(result['unknown'], [6])
+
+    def test_retriesRunOut(self):
+        self._send(*[jsonResponse({'opstat': 'error'}, 502)] * 3)
+        result = self.gengo.updateTranslationJobsBulk(
+            {'action': 'approve', 'job_ids': [1]}, max_retries=2)
+        self.assertEqual(len(self.sent), 3)
+        self.assertEqual(result['failed'][1].error_code, 502)
+
+    def test_connectionErrorsAreRetried(self):
+        self.gengo.updateTranslationJobs = mock.Mock(side_effect=[
+            requests.ConnectionError('reset'), {'response': {}}])
+        result = self.gengo.updateTranslationJobsBulk(
+            {'action': 'approve', 'job_ids': [1]})
+        self.assertEqual(result['succeeded'], [1])
+        self.assertEqual(result['retried'], 1)
+
+    def test_programmingErrorsPropagate(self):
+        self.gengo.updateTranslationJobs = mock.Mock(
+            side_effect=KeyError('job_id'))
+        for max_workers in (1, 4):
+            self.assertRaises(KeyError, self.gengo.updateTranslationJobsBulk,
+                              {'action': 'approve', 'job_ids': [1, 2, 3]},
+                              max_jobs=1, max_workers=max_workers)
+        self.assertFalse(self.sleep.called)
+
+    def test_againstFakeServer(self):
+        with gengo.fakeserver.FakeGengo() as fake:
+            client = Gengo(public_key='pub', private_key='priv',
+                           api_url=fake.api_url)
+            client.postTranslationJobs(jobs={'jobs': dict(
+                ('job_{0}'.format(i), {'body_src': 'one', 'lc_src': 'en',
+                                       'lc_tgt': 'ja', 'tier': 'standard'})
+                for i in range(45))})
+            fake.advance()
+            fake.advance()
+            job_ids = sorted(fake.jobs, key=int)
+            result = client.updateTranslationJobsBulk(
+                {'action': 'approve', 'job_ids': job_ids}, max_jobs=10)
+            client.close()
+        self.assertEqual(result['batches'], 5)
+        self.assertEqual(sorted(result['succeeded'], key=int), job_ids)
+        self.assertEqual(set(job['status'] for job in fake.jobs.values()),
+                         set(['approved']))
+
+
 if __name__ == '__main__':
     unittest.main()